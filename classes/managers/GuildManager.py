@@ -4,8 +4,11 @@ from typing import Any, List, Dict
 from classes.structs.Guild import Guild
 from settings.Setting import Setting
 from shared.types import ExtendedClient
+from utils.Metrics import record_cache_access
 import logging
 
+DEFAULT_PREFIX = "j!"
+
 
 class GuildManager:
     """
@@ -15,8 +18,18 @@ class GuildManager:
     def __init__(self, client: ExtendedClient, logger: logging.Logger):
         self.client = client
         self.setting_cache: Dict[str, Dict[str, Setting]] = {}
+        # Custom text command prefixes by guild ID; guilds without one use DEFAULT_PREFIX
+        self.prefixes: Dict[int, str] = {}
+        # Version of each loaded guild document (bumped by every guild write) and the raw settings
+        # the cached settings were built from; both are persisted by the warm cache snapshot
+        self.versions: Dict[str, int] = {}
+        self.raw_settings: Dict[str, Dict[str, Any]] = {}
         self.logger = logger
 
+        # find_by_kv filters on these; legacy documents are keyed by guild_id instead of _id
+        client.db.indexes.declare("guilds", [("id", 1)], source="GuildManager", partial={"id": {"$exists": True}})
+        client.db.indexes.declare("guilds", [("guild_id", 1)], source="GuildManager", partial={"guild_id": {"$exists": True}})
+
     async def fetch_or_create(self, guild_id: str, force: bool = False) -> Guild:
         """
         Fetches an existing guild profile or creates a new one.
@@ -26,7 +39,10 @@ class GuildManager:
             await self.client.wait_until_ready()
 
         # Fetch or load the guild
-        guild = self.client.get_guild(int(guild_id)) or await self.client.fetch_guild(int(guild_id))
+        guild = self.client.get_guild(int(guild_id))
+        record_cache_access("guild", guild is not None)
+        if guild is None:
+            guild = await self.client.fetch_guild(int(guild_id))
         if not guild:
             raise ValueError(f"Guild with ID {guild_id} not found.")
 
@@ -34,11 +50,16 @@ class GuildManager:
         # Fetch or initialize guild data from database
         guild_data = await self.fetch_guild_data(guild_id)
         if not guild_data:
-            guild_data = {"_id": guild_id, "settings": {}, "permissionsOverrides": {}}
+            guild_data = {"_id": guild_id, "settings": {}, "permissionsOverrides": {}, "version": 0}
             await self.create_guild_data(guild_data)
 
         # Fetch settings
-        settings = self.client.setting_cache.get(guild_id) or await self._get_all_settings(guild_data, guild)
+        settings = self.client.setting_cache.get(guild_id)
+        record_cache_access("settings", bool(settings))
+        if not settings:
+            self.versions[guild_id] = guild_data.get("version", 0)
+            self.raw_settings[guild_id] = guild_data.setdefault("settings", {})
+            settings = await self._get_all_settings(guild_data, guild)
         self.client.setting_cache[guild_id] = settings
 
         return Guild(self.client, guild, guild_data, settings)
@@ -81,7 +102,7 @@ class GuildManager:
         for module in self.client.modules.values():
             for default_setting in module.settings:
                 setting = default_setting.clone()
-                self.logger.info(f"Cloned setting: {setting}")
+                self.logger.debug(f"Cloned setting: {setting}")
 
                 db_value = db_settings.get(setting.id)
                 if db_value is not None:
@@ -104,9 +125,12 @@ class GuildManager:
                         await self.client.db.update_one(
                             "guilds",
                             {"_id": guild_data["_id"]},  # Filtro para encontrar o documento
-                            query,  # Atualização com $set
+                            {"$set": query, "$inc": {"version": 1}},
                             upsert=True  # Garantir que ele crie o documento se não existir
                         )
+                        # Keep the local stamp in step with the write, so the snapshot stays valid
+                        if self.record_setting_write(guild_data["_id"], setting.id, default_value):
+                            db_settings[setting.id] = default_value
                         setting.value = setting.value  # Valor padrão
                         self.logger.info(f"Created default setting '{setting.id}' for guild {guild.id}")
                     except Exception as e:
@@ -136,6 +160,79 @@ class GuildManager:
         self.logger.info(f"Found {len(guilds)} guilds matching filter {filter}.")
         return guilds
 
+    async def load_prefixes(self):
+        """
+        Loads every custom prefix in a single query, so resolving a prefix never touches the database.
+        """
+        try:
+            documents = await self.client.db.find(
+                "guilds", {"settings.prefix": {"$exists": True}}, {"settings.prefix": 1}
+            )
+        except Exception as e:
+            self.logger.error(f"Failed to load guild prefixes: {e}")
+            return
+
+        for document in documents:
+            prefix = document.get("settings", {}).get("prefix")
+            if isinstance(prefix, str) and prefix:
+                self.set_prefix(document["_id"], prefix)
+        self.logger.info(f"Loaded {len(self.prefixes)} custom prefixes.")
+
+    def get_prefix(self, guild_id: int) -> str:
+        """
+        Returns the text command prefix for a guild.
+        """
+        return self.prefixes.get(guild_id, DEFAULT_PREFIX)
+
+    def set_prefix(self, guild_id: int | str, prefix: str):
+        """
+        Updates the cached prefix for a guild, e.g. after the `prefix` setting is saved.
+        """
+        guild_id = int(guild_id)
+        if prefix == DEFAULT_PREFIX:
+            self.prefixes.pop(guild_id, None)
+        else:
+            self.prefixes[guild_id] = prefix
+
+    def record_write(self, guild_id: str) -> bool:
+        """
+        Mirrors a write that bumped the guild document's version once in the version stamp of a
+        loaded guild. Every write doing `$inc: {"version": 1}` must call this (or `record_setting_write`).
+
+        Returns:
+            bool: Whether the guild is loaded and its stamp was bumped.
+        """
+        guild_id = str(guild_id)
+        if guild_id not in self.versions:
+            return False
+        self.versions[guild_id] += 1
+        return True
+
+    def record_setting_write(self, guild_id: str, setting_id: str, value: Any) -> bool:
+        """
+        Mirrors a settings write (which bumped the document version once) in the version stamp
+        and raw settings of a loaded guild.
+
+        Returns:
+            bool: Whether the guild is loaded and was updated.
+        """
+        guild_id = str(guild_id)
+        if not self.record_write(guild_id):
+            return False
+        raw_settings = self.raw_settings.get(guild_id)
+        if raw_settings is not None:
+            raw_settings[setting_id] = value
+        return True
+
+    def forget(self, guild_id: str):
+        """
+        Drops everything cached for a guild, e.g. when its document changed elsewhere.
+        """
+        guild_id = str(guild_id)
+        self.client.setting_cache.pop(guild_id, None)
+        self.versions.pop(guild_id, None)
+        self.raw_settings.pop(guild_id, None)
+
     def invalidate_cache(self, guild_id: str):
         """
         Invalidates the settings cache for a specific guild.
@@ -48,6 +48,8 @@ class MemberManager:
         self.client = client
         self.logger = logger
 
+        client.db.indexes.declare("members", [("id", 1), ("guildId", 1)], source="MemberManager", unique=True)
+
     async def fetch(self, member_id: str, guild_id: str) -> Member:
         member_id = str(member_id)
         guild_id = str(guild_id)
@@ -1,12 +1,25 @@
 # classes/managers/PermissionsManager.py
 
-from typing import Dict, Optional, Any, Union
+import inspect
+from functools import lru_cache
+from typing import Dict, FrozenSet, Iterable, NamedTuple, Optional, Any, Tuple, Union
 from discord.ext.commands import Bot
-from discord import TextChannel
+from discord import Guild as DiscordGuild, Permissions as DiscordPermissions, Role, TextChannel
 from discord import Member as GuildMember
+from classes.structs.Permissions import ID_TARGETS, CompiledOverride, CompiledOverrides
 from shared.types import PermissionNode, RecursiveMap, OverrideNode
+from utils.Metrics import record_cache_access
+from utils.parsingRelated import parse_from_database
 import logging
 
+# Guild document field holding the override tree, and the list-encoded field older documents used
+OVERRIDES_KEY = "permissionsOverrides"
+LEGACY_OVERRIDES_KEY = "permissions_overrides"
+
+# Decisions cached per guild before the guild's cache is reset
+DECISION_CACHE_SIZE = 4096
+_MISSING = object()
+
 
 def is_end_node(node: Union[PermissionNode, RecursiveMap]) -> bool:
     """
@@ -14,13 +27,62 @@ def is_end_node(node: Union[PermissionNode, RecursiveMap]) -> bool:
     """
     return not isinstance(node, dict)
 
+
+@lru_cache(maxsize=4096)
+def split_node(node: str) -> Tuple[str, ...]:
+    """
+    Splits a permission node into its path once; nodes are a small, fixed vocabulary.
+    """
+    return tuple(node.split("."))
+
+
+class PermissionContext(NamedTuple):
+    """
+    What a permission decision depends on, computed once per member and channel.
+    """
+
+    member: GuildMember
+    channel: Optional[TextChannel]
+    role_ids: FrozenSet[int]  # Also the member's role fingerprint in the decision cache
+    channel_id: Optional[int]
+    guild_permissions: DiscordPermissions
+
+
 class PermissionsManager:
     def __init__(self, client: Bot, logger: logging.Logger):
         self.client = client
         self.logger = logger
         self.permissions: RecursiveMap = {}
+        self._resolved: Dict[str, Optional[PermissionNode]] = {}
+        # Handler -> whether it must be awaited, classified once at registration
+        self._async_handlers: Dict[PermissionNode, bool] = {}
+        # Namespace -> what its IDs match, for wildcard nodes evaluated without calling their handler
+        self.id_namespaces: Dict[str, str] = {}
+        # Guild ID -> compiled overrides of the latest document version seen
+        self._compiled: Dict[int, CompiledOverrides] = {}
+        # Guild ID -> (version, node, member ID, role fingerprint, channel ID) -> decision
+        self._decisions: Dict[int, Dict[Tuple, bool]] = {}
+
+        # Role permission edits and ownership transfers change Discord permissions for the same role set
+        client.add_listener(self._on_role_change, "on_guild_role_update")
+        client.add_listener(self._on_role_change, "on_guild_role_delete")
+        client.add_listener(self._on_guild_update, "on_guild_update")
+
+    def register_node(self, permission: str, result: PermissionNode, matches: Optional[str] = None):
+        """
+        Registers a permission node handler.
+
+        Args:
+            permission (str): The node, or a wildcard namespace like "Role.*".
+            result (PermissionNode): Sync or async handler deciding the node.
+            matches (Optional[str]): For wildcard namespaces whose handler only compares the node's
+                ID with the member's role IDs, the member's ID or the channel's ID: "roles",
+                "users" or "channels". Such nodes are compiled into ID sets and never call the handler.
+        """
+        if matches is not None and (matches not in ID_TARGETS or not permission.endswith(".*")):
+            self.logger.error(f"Cannot register '{permission}' as an ID-match namespace of '{matches}'.")
+            matches = None
 
-    def register_node(self, permission: str, result: PermissionNode):
         namespaces = permission.split('.')
         current = self.permissions
         last = namespaces.pop() if namespaces else None
@@ -38,24 +100,43 @@ class PermissionsManager:
             current = current[namespace]
 
         current[last] = result
+        self._resolved.clear()
+        self._async_handlers[result] = inspect.iscoroutinefunction(result)
+        namespace = permission[:-2] if permission.endswith(".*") else None
+        if namespace is not None and self.id_namespaces.get(namespace) != matches:
+            if matches is None:
+                del self.id_namespaces[namespace]
+            else:
+                self.id_namespaces[namespace] = matches
+            # Compiled overrides depend on which namespaces are ID matches
+            self._compiled.clear()
+            self._decisions.clear()
 
     def get_node(self, permission: str) -> Optional[PermissionNode]:
-        namespaces = permission.split('.')
+        if permission in self._resolved:
+            return self._resolved[permission]
+
         current = self.permissions
         last_global: Optional[PermissionNode] = None
+        result: Optional[PermissionNode] = None
 
-        for namespace in namespaces:
+        for namespace in split_node(permission):
             if namespace in current:
                 node = current[namespace]
                 if is_end_node(node):
-                    return node
+                    result = node
+                    break
                 current = node
             elif '*' in current:
                 last_global = current['*']
             else:
-                return last_global
+                result = last_global
+                break
+        else:
+            result = current if is_end_node(current) else last_global
 
-        return current if is_end_node(current) else last_global
+        self._resolved[permission] = result
+        return result
 
     async def check_permission_for(self, node: str, member: GuildMember, channel: TextChannel) -> bool:
         permission_node = self.get_node(node)
@@ -64,30 +145,195 @@ class PermissionsManager:
             return False
 
         try:
-            result = await permission_node(self.client, node, member, channel)
+            if self._async_handlers.get(permission_node, False):
+                return await permission_node(self.client, node, member, channel)
+            result = permission_node(self.client, node, member, channel)
+            # Sync callables may still hand back an awaitable (e.g. partials of coroutine functions)
+            if inspect.isawaitable(result):
+                result = await result
             return result
         except Exception as e:
             self.logger.error(f"Error executing permission node '{node}': {e}")
             return False
 
-    async def compute_permissions(self, override: OverrideNode, member: GuildMember, channel: TextChannel) -> Optional[bool]:
-        for allow_perm in override.get('allow', []):
+    def compile_overrides(self, guild_id: int, guild_data: Dict[str, Any]) -> CompiledOverrides:
+        """
+        Returns the guild's compiled overrides, compiling them only when the document version changed.
+
+        Args:
+            guild_id (int): The guild the document belongs to.
+            guild_data (Dict[str, Any]): The guild document.
+
+        Returns:
+            CompiledOverrides: The compiled override tree.
+        """
+        guild_id = int(guild_id)
+        version = guild_data.get("version", 0)
+        compiled = self._compiled.get(guild_id)
+        record_cache_access("permission_overrides", compiled is not None and compiled.version == version)
+        if compiled is not None and compiled.version == version:
+            return compiled
+
+        tree = guild_data.get(OVERRIDES_KEY)
+        if not tree and guild_data.get(LEGACY_OVERRIDES_KEY):
+            # Not migrated yet
+            tree = self._parse_legacy(guild_data[LEGACY_OVERRIDES_KEY])
+        compiled = CompiledOverrides(tree or {}, version, self.id_namespaces)
+        self._compiled[guild_id] = compiled
+        self._decisions.pop(guild_id, None)
+        return compiled
+
+    @staticmethod
+    def _parse_legacy(value: Any) -> Dict[str, Any]:
+        return parse_from_database(value) if isinstance(value, list) else dict(value or {})
+
+    async def migrate_legacy_overrides(self):
+        """
+        Moves overrides stored under the legacy `permissions_overrides` field (list-encoded with
+        parse_to_database) into `permissionsOverrides`, bumping each migrated document's version.
+        Overrides already present under the canonical key win.
+        """
+        try:
+            documents = await self.client.db.find(
+                "guilds", {LEGACY_OVERRIDES_KEY: {"$exists": True}}, {LEGACY_OVERRIDES_KEY: 1, OVERRIDES_KEY: 1}
+            )
+        except Exception as e:
+            self.logger.error(f"Failed to look up legacy permission overrides: {e}")
+            return
+
+        migrated = 0
+        for document in documents:
+            tree = document.get(OVERRIDES_KEY) or self._parse_legacy(document[LEGACY_OVERRIDES_KEY])
+            try:
+                await self.client.db.update_one(
+                    "guilds",
+                    {"_id": document["_id"]},
+                    {"$set": {OVERRIDES_KEY: tree}, "$unset": {LEGACY_OVERRIDES_KEY: ""}, "$inc": {"version": 1}}
+                )
+            except Exception as e:
+                self.logger.error(f"Failed to migrate permission overrides of guild {document['_id']}: {e}")
+                continue
+            self.client.guild_manager.record_write(document["_id"])
+            migrated += 1
+        if migrated:
+            self.logger.info(f"Migrated permission overrides of {migrated} guild(s) to '{OVERRIDES_KEY}'.")
+
+    def context_for(self, member: GuildMember, channel: Optional[TextChannel]) -> PermissionContext:
+        # member.roles includes @everyone, so "Role.<guild id>" matches every member
+        role_ids = frozenset(role.id for role in member.roles)
+        return PermissionContext(member, channel, role_ids, channel.id if channel else None, member.guild_permissions)
+
+    async def compute_permissions(
+        self, override: Union[OverrideNode, CompiledOverride], member: GuildMember, channel: TextChannel,
+        context: Optional[PermissionContext] = None
+    ) -> Optional[bool]:
+        if not isinstance(override, CompiledOverride):
+            override = CompiledOverride(override, self.id_namespaces)
+        context = context or self.context_for(member, channel)
+
+        if override.allow.matches_ids(context.role_ids, member.id, context.channel_id):
+            return True
+        for allow_perm in override.allow.nodes:
             if await self.check_permission_for(allow_perm, member, channel):
                 return True
 
-        for deny_perm in override.get('deny', []):
+        if override.deny.matches_ids(context.role_ids, member.id, context.channel_id):
+            return False
+        for deny_perm in override.deny.nodes:
             if await self.check_permission_for(deny_perm, member, channel):
                 return False
 
         return None
 
-    async def has_permission(self, node: str, member: GuildMember, channel: TextChannel, override: OverrideNode) -> bool:
-        discord_permission = getattr(member.guild_permissions, node.split('.')[-1], False)
-        if discord_permission:
+    async def has_permission(
+        self, node: str, member: GuildMember, channel: TextChannel,
+        override: Union[OverrideNode, CompiledOverrides, None] = None
+    ) -> bool:
+        """
+        Checks a permission node for a member. Discord permissions named like the node's last
+        segment grant it; otherwise the guild's overrides decide, denying by default.
+
+        Args:
+            node (str): The permission node (e.g. "Commands.ban").
+            member (GuildMember): The member to check.
+            channel (TextChannel): The channel the check happens in.
+            override: A single override node, the guild's compiled overrides, or None to
+                load the guild's overrides.
+
+        Returns:
+            bool: Whether the member has the permission.
+        """
+        if override is not None and not isinstance(override, CompiledOverrides):
+            context = self.context_for(member, channel)
+            result = await self._decide(node, context, CompiledOverride(override, self.id_namespaces))
+            return bool(result)
+        return (await self.has_permissions([node], member, channel, override))[node]
+
+    async def has_permissions(
+        self, nodes: Iterable[str], member: GuildMember, channel: TextChannel,
+        overrides: Optional[CompiledOverrides] = None, default: bool = False
+    ) -> Dict[str, bool]:
+        """
+        Checks many permission nodes for the same member and channel at once. The role set, the
+        Discord permission bitfield and the guild's compiled overrides are resolved a single time.
+
+        Args:
+            nodes (Iterable[str]): The permission nodes to check.
+            member (GuildMember): The member to check.
+            channel (TextChannel): The channel the checks happen in.
+            overrides (Optional[CompiledOverrides]): The guild's compiled overrides; loaded if None.
+            default (bool): Decision for nodes that neither Discord permissions nor overrides decide.
+
+        Returns:
+            Dict[str, bool]: Node -> whether the member has it.
+        """
+        if overrides is None:
+            guild = await self.client.guild_manager.fetch_or_create(member.guild.id)
+            overrides = self.compile_overrides(member.guild.id, guild.data)
+
+        context = self.context_for(member, channel)
+        decisions = self._decisions.setdefault(member.guild.id, {})
+        results: Dict[str, bool] = {}
+        for node in nodes:
+            if node in results:
+                continue
+            # Decisions only depend on the document version, the role set and the channel
+            key = (overrides.version, node, member.id, context.role_ids, context.channel_id)
+            result = decisions.get(key, _MISSING)
+            record_cache_access("permission_decision", result is not _MISSING)
+            if result is _MISSING:
+                compiled = overrides.lookup(split_node(node))
+                result = await self._decide(node, context, compiled)
+                if compiled is None or not compiled.dynamic:
+                    if len(decisions) >= DECISION_CACHE_SIZE:
+                        decisions.clear()
+                    decisions[key] = result
+            results[node] = default if result is None else result
+        return results
+
+    async def _decide(self, node: str, context: PermissionContext, override: Optional[CompiledOverride]) -> Optional[bool]:
+        """
+        Returns True if granted by Discord permissions, else the override's decision (None if undecided).
+        """
+        if getattr(context.guild_permissions, split_node(node)[-1], False):
             return True
 
-        override_result = await self.compute_permissions(override, member, channel)
-        if override_result is not None:
-            return override_result
+        if override is None:
+            return None
+        return await self.compute_permissions(override, context.member, context.channel, context)
+
+    def invalidate(self, guild_id: int, overrides: bool = False):
+        """
+        Drops a guild's cached decisions, and its compiled overrides if `overrides` is set
+        (e.g. after they were rewritten without a version bump).
+        """
+        self._decisions.pop(int(guild_id), None)
+        if overrides:
+            self._compiled.pop(int(guild_id), None)
+
+    async def _on_role_change(self, *args: Role):
+        self.invalidate(args[-1].guild.id)
 
-        return False
+    async def _on_guild_update(self, before: DiscordGuild, after: DiscordGuild):
+        if before.owner_id != after.owner_id:
+            self.invalidate(after.id)
@@ -1,7 +1,7 @@
 from discord.ext.commands import Bot
+import copy
 from typing import Dict, Any
-from classes.structs.Permissions import Permissions 
-from utils.parsingRelated import parse_from_database
+from classes.structs.Permissions import CompiledOverrides, Permissions
 from classes.structs.ObjectFlags import ObjectFlags
 from typing import Dict, Any, TYPE_CHECKING
 from shared.types import ExtendedClient
@@ -23,9 +23,27 @@ class Guild:
         self.guild = guild
         self.data = guild_data
         self.settings = settings
-        self.permission_overrides = Permissions(client.logger, parse_from_database(guild_data.get("permissions_overrides", [])))
         self.id = guild.id
         self.flags = ObjectFlags(client, self)
+        self._permission_overrides: Permissions = None
+
+    @property
+    def compiled_overrides(self) -> CompiledOverrides:
+        """
+        The guild's permission overrides, parsed and compiled once per document version and
+        shared by every `Guild` built from that version.
+        """
+        return self.client.permission_manager.compile_overrides(self.id, self.data)
+
+    @property
+    def permission_overrides(self) -> Permissions:
+        """
+        Editable copy of the guild's override tree. The compiled overrides are shared, so edits
+        made here are not used for permission checks until they are saved to the guild.
+        """
+        if self._permission_overrides is None:
+            self._permission_overrides = Permissions(self.client.logger, copy.deepcopy(self.compiled_overrides.tree))
+        return self._permission_overrides
 
     def get_setting(self, setting_id: str) -> "Setting":
         """
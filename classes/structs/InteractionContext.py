@@ -0,0 +1,96 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Optional, TYPE_CHECKING
+from discord import Interaction
+from shared.types import ExtendedClient
+
+if TYPE_CHECKING:
+    from classes.structs.Guild import Guild
+    from classes.structs.Member import Member
+    from settings.Setting import Setting
+
+
+class InteractionContext:
+    """
+    Per-interaction data shared by command middleware and the command itself.
+
+    `guild`, `member`, `settings`, `language` and `translator` are awaitables loaded on first
+    access and memoized for the lifetime of the interaction, so any number of middlewares adds
+    at most one fetch of each kind. Concurrent awaits share the same fetch.
+    """
+
+    EXTRAS_KEY = "context"
+
+    def __init__(self, client: ExtendedClient, interaction: Interaction, module_name: Optional[str] = None):
+        self.client = client
+        self.interaction = interaction
+        self.module_name = module_name
+        self.guild_id: Optional[str] = str(interaction.guild_id) if interaction.guild_id else None
+        self.user_id = str(interaction.user.id)
+        self._tasks: Dict[str, asyncio.Future] = {}
+
+    @classmethod
+    def of(cls, interaction: Interaction, module_name: Optional[str] = None) -> "InteractionContext":
+        """
+        Returns the context attached to an interaction, creating and attaching it on first use.
+        """
+        context = interaction.extras.get(cls.EXTRAS_KEY)
+        if context is None:
+            context = interaction.extras[cls.EXTRAS_KEY] = cls(interaction.client, interaction, module_name)
+        return context
+
+    def _memo(self, name: str, factory: Callable[[], Awaitable[Any]]) -> asyncio.Future:
+        task = self._tasks.get(name)
+        if task is None:
+            task = self._tasks[name] = asyncio.ensure_future(factory())
+        return task
+
+    def is_loaded(self, name: str) -> bool:
+        """
+        Whether a property has already been fetched successfully.
+        """
+        task = self._tasks.get(name)
+        return task is not None and task.done() and not task.cancelled() and task.exception() is None
+
+    def _require_guild(self) -> str:
+        if self.guild_id is None:
+            raise ValueError("This interaction did not happen in a guild.")
+        return self.guild_id
+
+    @property
+    def guild(self) -> Awaitable["Guild"]:
+        return self._memo("guild", lambda: self.client.guild_manager.fetch_or_create(self._require_guild()))
+
+    @property
+    def member(self) -> Awaitable["Member"]:
+        return self._memo(
+            "member", lambda: self.client.member_manager.fetch_or_create(self.user_id, self._require_guild())
+        )
+
+    @property
+    def settings(self) -> Awaitable[Dict[str, "Setting"]]:
+        return self._memo("settings", self._load_settings)
+
+    @property
+    def language(self) -> Awaitable[str]:
+        return self._memo("language", lambda: self.client.translator.get_language(self._require_guild()))
+
+    @property
+    def translator(self) -> Awaitable[Callable[..., str]]:
+        return self.module_translator(self.module_name)
+
+    def module_translator(self, module_name: Optional[str]) -> Awaitable[Callable[..., str]]:
+        """
+        Translator for a specific module's strings, memoized per module.
+        """
+        return self._memo(f"translator:{module_name}", lambda: self._load_translator(module_name))
+
+    async def _load_settings(self) -> Dict[str, "Setting"]:
+        settings = self.client.setting_cache.get(self._require_guild())
+        if settings is None:
+            settings = (await self.guild).settings
+        return settings
+
+    async def _load_translator(self, module_name: Optional[str]) -> Callable[..., str]:
+        # Reuses the memoized language instead of resolving it again
+        language = await self.language if self.guild_id else "en"
+        return self.client.translator.get_translator_sync(language, module_name)
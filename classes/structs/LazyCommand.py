@@ -0,0 +1,93 @@
+import inspect
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Union
+import discord
+from discord import app_commands
+
+# Manifest option types -> annotations understood by app_commands
+OPTION_TYPES: Dict[str, Any] = {
+    "string": str,
+    "integer": int,
+    "number": float,
+    "boolean": bool,
+    "user": discord.User,
+    "member": discord.Member,
+    "role": discord.Role,
+    "channel": discord.abc.GuildChannel,
+    "text_channel": discord.TextChannel,
+    "attachment": discord.Attachment,
+    "mentionable": Union[discord.Member, discord.Role],
+}
+
+
+def build_lazy_command(
+    entry: Dict[str, Any],
+    on_invoke: Callable[[discord.Interaction], Awaitable[Any]],
+    on_autocomplete: Callable[[discord.Interaction, str], Awaitable[List[app_commands.Choice]]],
+) -> app_commands.Command:
+    """
+    Builds a stub slash command from a manifest declaration such as
+
+        {"file": "settings.py", "name": "settings", "description": "...",
+         "options": [{"name": "setting", "type": "string", "description": "...",
+                      "required": true, "autocomplete": true}]}
+
+    The stub produces the same registration payload as the real command; its callback and
+    autocomplete handlers only import the real command and hand the interaction over.
+
+    Args:
+        entry (Dict[str, Any]): The manifest declaration.
+        on_invoke (Callable): Called with the interaction when the stub is invoked.
+        on_autocomplete (Callable): Called with the interaction and the option name on autocomplete.
+    """
+    options = entry.get("options", [])
+    parameters = [inspect.Parameter("interaction", inspect.Parameter.POSITIONAL_OR_KEYWORD, annotation=discord.Interaction)]
+    descriptions, choices, autocompletes = {}, {}, {}
+
+    for option in options:
+        annotation = OPTION_TYPES[option.get("type", "string")]
+        required = option.get("required", True)
+        parameters.append(inspect.Parameter(
+            option["name"],
+            inspect.Parameter.POSITIONAL_OR_KEYWORD,
+            annotation=annotation if required else Optional[annotation],
+            default=inspect.Parameter.empty if required else None,
+        ))
+        if option.get("description"):
+            descriptions[option["name"]] = option["description"]
+        if option.get("choices"):
+            choices[option["name"]] = [
+                app_commands.Choice(name=choice["name"], value=choice["value"]) for choice in option["choices"]
+            ]
+        if option.get("autocomplete"):
+            autocompletes[option["name"]] = _autocomplete_forwarder(option["name"], on_autocomplete)
+
+    async def callback(interaction: discord.Interaction, **kwargs):
+        # Arguments are resolved again by the real command from `interaction.namespace`
+        await on_invoke(interaction)
+
+    callback.__signature__ = inspect.Signature(parameters)
+    callback.__qualname__ = callback.__name__ = entry["name"].replace("-", "_")
+    if descriptions:
+        callback = app_commands.describe(**descriptions)(callback)
+    if choices:
+        callback = app_commands.choices(**choices)(callback)
+    if autocompletes:
+        callback = app_commands.autocomplete(**autocompletes)(callback)
+
+    command = app_commands.Command(
+        name=entry["name"],
+        description=entry.get("description", "…"),
+        callback=callback,
+        nsfw=entry.get("nsfw", False),
+        extras={"lazy": True, "file": entry["file"]},
+    )
+    if entry.get("guild_only"):
+        command.guild_only = True
+    return command
+
+
+def _autocomplete_forwarder(option_name: str, on_autocomplete):
+    async def autocomplete(interaction: discord.Interaction, current: str) -> List[app_commands.Choice]:
+        return await on_autocomplete(interaction, option_name)
+
+    return autocomplete
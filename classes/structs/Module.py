@@ -1,10 +1,11 @@
-from typing import Any, Dict, Optional, Callable, List
+from typing import Any, Dict, Iterable, Optional, Callable, List
 from pathlib import Path
 from discord.ext import commands
-from discord import app_commands, Object
+from discord import app_commands
 from logging import Logger
 from settings.Setting import Setting
 from shared.types import Manifest, ExtendedClient
+from utils.HotReload import Fingerprint
 
 class Module:
     """
@@ -39,6 +40,8 @@ class Module:
         self.settings = settings or []
         self.user_settings = user_settings or []
         self.events: List[Dict[str, Callable]] = []  # Store registered events
+        # Source file (relative to the module folder) -> fingerprint and what it registered
+        self.sources: Dict[str, Dict[str, Any]] = {}
 
     async def unload(self, bot: commands.Bot, sync: Optional[str] = None, guild_id: Optional[str] = None):
         """
@@ -50,7 +53,7 @@ class Module:
             guild_id (Optional[str]): ID da guild para sincronização (se aplicável).
         """
         for command_name, command in self.commands["text"].items():
-            bot.remove_command(command.name)
+            bot.command_handler.unregister_text_command(command_name, command)
             self.logger.info(f"Removed text command '{command_name}' from module '{self.name}'.")
 
         for command_name, command in self.commands["slash"].items():
@@ -59,54 +62,111 @@ class Module:
 
         for event in self.events:
             try:
-                bot.remove_listener(event["func"], event["event"])
+                bot.event_handler.remove_listener(event["event"], event["func"])
                 self.logger.info(f"Removed event listener '{event['event']}' from module '{self.name}'.")
             except Exception as e:
                 self.logger.error(f"Failed to remove event listener '{event['event']}': {e}")
 
+        bot.command_handler.forget_lazy_commands(self.name)
         self.commands = {"text": {}, "slash": {}}
         self.events = []
+        self.sources = {}
 
-        # Sincronização opcional dos comandos
+        # Sincronização opcional dos comandos (apenas se o payload mudou)
         if sync == "global":
-            await bot.tree.sync()
-            self.logger.info("Commands synchronized globally after unload.")
+            await bot.command_syncer.sync(["global"])
         elif sync == "guild" and guild_id:
-            guild = Object(id=int(guild_id))
-            await bot.tree.sync(guild=guild)
-            self.logger.info(f"Commands synchronized for guild ID {guild_id} after unload.")
+            await bot.command_syncer.sync([guild_id])
 
 
-    async def reload(self, bot: commands.Bot, sync: Optional[str] = None, guild_id: Optional[int] = None):
+    async def reload(
+        self, bot: commands.Bot, sync: Optional[str] = None, guild_id: Optional[int] = None, changed_only: bool = False
+    ):
         """
-        Reloads the module by unloading and reloading its commands and events.
+        Reloads the module's command and event files in place. The init file is not run again,
+        so the module's interface and managers keep their state.
 
         Args:
             bot (commands.Bot): A instância do bot.
             sync (Optional[str]): Tipo de sincronização. Pode ser 'none', 'global', ou 'guild'.
             guild_id (Optional[int]): ID da guild para sincronização se `sync` for 'guild'.
+            changed_only (bool): Only re-import files that changed on disk since they were loaded.
         """
-        await self.unload(bot)
-
-        commands_folder = Path(self.path) / self.data.commands_folder
-        base_package = f"modules.{self.name}.commands"
-        await self.bot.command_handler.load_commands_from_folder(commands_folder, base_package, self)
-
-        events_folder = Path(self.path) / self.data.events_folder
-        if events_folder.exists():
-            await self.bot.event_handler.load_events_from_module(self.name, Path(self.path), [events_folder])
+        await bot.module_handler.reload_module(self.name, full=not changed_only)
 
         if sync == "global":
-            await self.bot.tree.sync()
-            self.logger.info(f"Slash commands globally synced after reloading module '{self.name}'.")
+            await bot.command_syncer.sync(["global"])
         elif sync == "guild" and guild_id:
-            guild = Object(id=guild_id)
-            await self.bot.tree.sync(guild=guild)
-            self.logger.info(f"Slash commands synced for guild {guild_id} after reloading module '{self.name}'.")
+            await bot.command_syncer.sync([guild_id])
         elif sync == "none" or sync is None:
             self.logger.info(f"No slash command synchronization performed for module '{self.name}'.")
-            
-        
+
+    def source_key(self, path: Path) -> str:
+        """
+        Key of a source file in `sources`: its path relative to the module folder.
+        """
+        return Path(path).resolve().relative_to(Path(self.path).resolve()).as_posix()
+
+    def track_source(
+        self,
+        path: Path,
+        kind: str,
+        fingerprint: Fingerprint,
+        slash: Iterable[str] = (),
+        text: Iterable[str] = (),
+        events: Iterable[Dict[str, Callable]] = (),
+        cogs: Iterable[str] = (),
+        help_entries: Iterable[str] = (),
+        opaque: bool = False,
+    ):
+        """
+        Records what a source file registered, so a hot reload can swap that file on its own.
+
+        Args:
+            path (Path): The source file.
+            kind (str): 'commands', 'events' or 'core' (manifest and init file).
+            fingerprint (Fingerprint): Fingerprint of the imported content.
+            opaque (bool): The file ran setup code whose effects cannot be undone file by file.
+        """
+        self.sources[self.source_key(path)] = {
+            "kind": kind,
+            "path": Path(path),
+            "fingerprint": fingerprint,
+            "slash": list(slash),
+            "text": list(text),
+            "events": list(events),
+            "cogs": list(cogs),
+            "help": list(help_entries),
+            "opaque": opaque,
+        }
+
+    async def remove_source(self, bot: commands.Bot, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Unregisters everything a source file registered and forgets the file.
+
+        Returns:
+            Optional[Dict[str, Any]]: The removed record, or None if the file was not tracked.
+        """
+        record = self.sources.pop(key, None)
+        if record is None:
+            return None
+
+        for cog_name in record["cogs"]:
+            await bot.remove_cog(cog_name)
+        for name in record["slash"]:
+            if self.commands["slash"].pop(name, None) is not None:
+                bot.tree.remove_command(name)
+        for name in record["text"]:
+            command = self.commands["text"].pop(name, None)
+            if command is not None:
+                bot.command_handler.unregister_text_command(name, command)
+        for event in record["events"]:
+            bot.event_handler.remove_listener(event["event"], event["func"])
+            if event in self.events:
+                self.events.remove(event)
+        for name in record["help"]:
+            bot.detailed_help.pop(name, None)
+        return record
 
     def register_event(self, event: str, func: Callable):
         """
@@ -1,8 +1,4 @@
-from typing import Dict, Union, Optional
-from shared.types import OverrideNode, PermissionOverrideTree
-import logging
-
-from typing import Dict, Union, Optional
+from typing import Any, Dict, FrozenSet, List, Optional, Set, Tuple, Union
 from shared.types import OverrideNode, PermissionOverrideTree
 import logging
 
@@ -12,6 +8,112 @@ def is_end_node(node: Union[OverrideNode, PermissionOverrideTree]) -> bool:
     return not isinstance(node, dict)
 
 
+def is_override_node(node: Union[OverrideNode, PermissionOverrideTree]) -> bool:
+    """
+    Checks if a stored tree value is an override leaf: overrides are saved as plain
+    {"allow": [...], "deny": [...]} dicts, which `is_end_node` sees as namespaces.
+    """
+    return (
+        isinstance(node, dict) and bool(node) and set(node) <= {"allow", "deny"}
+        and all(isinstance(value, list) for value in node.values())
+    )
+
+
+# What an ID-match namespace compares its ID against
+ID_TARGETS = ("roles", "users", "channels")
+
+
+class CompiledRules:
+    """
+    One side (allow or deny) of an override, with the nodes of ID-match namespaces pre-parsed
+    into sets. Other nodes are kept as strings and resolved through their registered handlers.
+    """
+
+    __slots__ = ("roles", "users", "channels", "nodes")
+
+    def __init__(self, entries: List[str], id_namespaces: Dict[str, str]):
+        """
+        Args:
+            entries (List[str]): The nodes of this side (e.g. "Role.123").
+            id_namespaces (Dict[str, str]): Namespace -> what its ID matches ("roles", "users" or "channels").
+        """
+        parsed: Dict[str, Set[int]] = {target: set() for target in ID_TARGETS}
+        nodes = []
+        for entry in entries:
+            namespace, _, target = str(entry).rpartition(".")
+            if namespace in id_namespaces and target.isdigit():
+                parsed[id_namespaces[namespace]].add(int(target))
+            else:
+                nodes.append(str(entry))
+        self.roles: FrozenSet[int] = frozenset(parsed["roles"])
+        self.users: FrozenSet[int] = frozenset(parsed["users"])
+        self.channels: FrozenSet[int] = frozenset(parsed["channels"])
+        self.nodes: Tuple[str, ...] = tuple(nodes)
+
+    def matches_ids(self, role_ids: FrozenSet[int], user_id: int, channel_id: Optional[int]) -> bool:
+        return user_id in self.users or channel_id in self.channels or not self.roles.isdisjoint(role_ids)
+
+
+class CompiledOverride:
+    """An override node compiled for evaluation."""
+
+    __slots__ = ("allow", "deny")
+
+    def __init__(self, override: OverrideNode, id_namespaces: Dict[str, str]):
+        self.allow = CompiledRules(override.get("allow", []), id_namespaces)
+        self.deny = CompiledRules(override.get("deny", []), id_namespaces)
+
+    @property
+    def dynamic(self) -> bool:
+        """Whether evaluating it calls node handlers, whose results cannot be cached."""
+        return bool(self.allow.nodes or self.deny.nodes)
+
+
+class CompiledOverrides:
+    """
+    A guild's override tree compiled once per guild document version: leaves become
+    `CompiledOverride`s, so a lookup is a walk of the node's path and nothing is re-parsed.
+    """
+
+    __slots__ = ("version", "tree", "root")
+
+    def __init__(self, tree: PermissionOverrideTree, version: int = 0, id_namespaces: Optional[Dict[str, str]] = None):
+        self.version = version
+        self.tree = tree or {}  # The parsed tree, shared by the guild's `Permissions` views
+        self.root = self._compile(tree or {}, id_namespaces or {})
+
+    @classmethod
+    def _compile(cls, tree: PermissionOverrideTree, id_namespaces: Dict[str, str]) -> Dict[str, Any]:
+        compiled = {}
+        for key, value in tree.items():
+            if not isinstance(value, dict):
+                continue
+            if is_override_node(value):
+                compiled[key] = CompiledOverride(value, id_namespaces)
+            else:
+                compiled[key] = cls._compile(value, id_namespaces)
+        return compiled
+
+    def lookup(self, path: Tuple[str, ...]) -> Optional[CompiledOverride]:
+        """
+        Finds the override for a split node path, with the same wildcard fallback as `Permissions.get`.
+        """
+        current = self.root
+        last_global: Optional[CompiledOverride] = None
+        for namespace in path:
+            node = current.get(namespace)
+            if node is not None:
+                if isinstance(node, CompiledOverride):
+                    return node
+                current = node
+            elif "*" in current:
+                if isinstance(current["*"], CompiledOverride):
+                    last_global = current["*"]
+            else:
+                return last_global
+        return last_global
+
+
 class Permissions:
     def __init__(self, logger: logging.Logger, permissions: PermissionOverrideTree):
         self.logger = logger
@@ -1,18 +1,66 @@
+import logging
 import os
+import sys
+import time
+from functools import wraps
 from dotenv import load_dotenv
 import motor.motor_asyncio
+from utils.CommandRecorder import record_db_time
+from utils.Metrics import REGISTRY
+from db.profiler import QueryProfiler
+from db.indexes import IndexRegistry
 
 load_dotenv()
 
 MONGODB_TOKEN = os.getenv("MONGODB_TOKEN")
 
+# Operations whose first argument is a filter, as opposed to documents or index keys
+QUERY_OPERATIONS = {"find_one", "find", "update_one", "delete_one", "count_documents"}
+
+ORM_LATENCY = REGISTRY.histogram(
+    "orm_operation_duration_seconds", "MongoDBAsyncORM operation latency.", ["collection", "operation"]
+)
+
+
+def timed_operation(func):
+    """
+    Times a collection operation and attributes it to the running command, if any.
+    """
+    operation = func.__name__
+    filters_by_query = operation in QUERY_OPERATIONS
+
+    @wraps(func)
+    async def wrapper(self, collection_name, *args, **kwargs):
+        caller = sys._getframe(1)
+        start = time.perf_counter()
+        try:
+            return await func(self, collection_name, *args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - start
+            ORM_LATENCY.labels(collection_name, operation).observe(elapsed)
+            record_db_time(elapsed)
+            if filters_by_query:
+                query = args[0] if args else kwargs.get("query")
+                self.profiler.observe(collection_name, operation, query, elapsed, caller)
+
+    return wrapper
+
 class MongoDBAsyncORM:
-    def __init__(self, uri, db_name="database"):
+    def __init__(self, uri, db_name="database", logger=None, slow_query_ms=100):
         """
         Initialize the MongoDBAsyncORM instance.
+
+        Args:
+            uri (str): MongoDB connection string.
+            db_name (str): Name of the database.
+            logger (logging.Logger): Logger used by the slow query profiler.
+            slow_query_ms (float): Operations at or above this duration are logged as slow queries.
         """
         self.client = motor.motor_asyncio.AsyncIOMotorClient(uri)
         self.db = self.client[db_name]
+        self.logger = logger or logging.getLogger("MongoDBAsyncORM")
+        self.profiler = QueryProfiler(self, self.logger.getChild("SlowQueries"), threshold_ms=slow_query_ms)
+        self.indexes = IndexRegistry(self, self.logger.getChild("Indexes"))
 
     def get_collection(self, collection_name):
         """
@@ -20,7 +68,8 @@ class MongoDBAsyncORM:
         """
         return self.db[collection_name]
     
-    async def create_index(self, collection_name, keys, unique=False):
+    @timed_operation
+    async def create_index(self, collection_name, keys, unique=False, **options):
         """
         Create an index on the specified collection.
 
@@ -28,11 +77,13 @@ class MongoDBAsyncORM:
             collection_name (str): The name of the collection.
             keys (list of tuples): List of key-direction pairs for the index (e.g., [("id", 1), ("guildId", 1)]).
             unique (bool): Whether the index should enforce uniqueness.
+            **options: Extra index options, e.g. name, expireAfterSeconds or partialFilterExpression.
         """
         collection = self.get_collection(collection_name)
-        index_name = await collection.create_index(keys, unique=unique)
+        index_name = await collection.create_index(keys, unique=unique, **options)
         return index_name
 
+    @timed_operation
     async def insert_one(self, collection_name, document):
         """
         Insert a single document into a collection.
@@ -41,6 +92,7 @@ class MongoDBAsyncORM:
         result = await collection.insert_one(document)
         return result.inserted_id
 
+    @timed_operation
     async def insert_many(self, collection_name, documents):
         """
         Insert multiple documents into a collection.
@@ -49,6 +101,7 @@ class MongoDBAsyncORM:
         result = await collection.insert_many(documents)
         return result.inserted_ids
 
+    @timed_operation
     async def find_one(self, collection_name, query, projection=None):
         """
         Find a single document in a collection.
@@ -56,6 +109,7 @@ class MongoDBAsyncORM:
         collection = self.get_collection(collection_name)
         return await collection.find_one(query, projection)
 
+    @timed_operation
     async def find(self, collection_name, query, projection=None):
         """
         Find multiple documents in a collection.
@@ -64,6 +118,7 @@ class MongoDBAsyncORM:
         cursor = collection.find(query, projection)
         return await cursor.to_list(length=None)
 
+    @timed_operation
     async def update_one(self, collection_name, query, update, upsert=False):
         """
         Update a single document in a collection.
@@ -78,6 +133,7 @@ class MongoDBAsyncORM:
         return result.modified_count
 
 
+    @timed_operation
     async def delete_one(self, collection_name, query):
         """
         Delete a single document from a collection.
@@ -86,6 +142,7 @@ class MongoDBAsyncORM:
         result = await collection.delete_one(query)
         return result.deleted_count
 
+    @timed_operation
     async def count_documents(self, collection_name, query={}):
         """
         Count the number of documents in a collection.
@@ -0,0 +1,193 @@
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+
+class IndexSpec:
+    """
+    Declaration of a single index on a collection.
+    """
+
+    def __init__(
+        self,
+        collection: str,
+        keys: Sequence[Tuple[str, int]],
+        unique: bool = False,
+        ttl: Optional[int] = None,
+        partial: Optional[Dict[str, Any]] = None,
+        name: Optional[str] = None,
+        source: str = "code",
+    ):
+        """
+        Args:
+            collection (str): Collection the index belongs to.
+            keys (Sequence[Tuple[str, int]]): Key-direction pairs, e.g. [("id", 1), ("guildId", 1)].
+            unique (bool): Whether the index enforces uniqueness.
+            ttl (Optional[int]): Seconds after which documents expire (TTL index on a date field).
+            partial (Optional[Dict[str, Any]]): Partial filter expression.
+            name (Optional[str]): Index name. Defaults to MongoDB's generated name.
+            source (str): Who declared the index, used in reports.
+        """
+        self.collection = collection
+        self.keys = [(field, direction) for field, direction in keys]
+        self.unique = unique
+        self.ttl = ttl
+        self.partial = partial
+        self.name = name or "_".join(f"{field}_{direction}" for field, direction in self.keys)
+        self.source = source
+
+    @classmethod
+    def from_manifest(cls, entry: Dict[str, Any], source: str) -> "IndexSpec":
+        """
+        Builds a spec from a manifest entry such as
+        {"collection": "XP_Global", "keys": [["user_id", 1]], "unique": false, "ttl": null, "partial": null}.
+        """
+        keys = entry["keys"]
+        if isinstance(keys, dict):
+            keys = list(keys.items())
+        return cls(
+            collection=entry["collection"],
+            keys=[tuple(pair) for pair in keys],
+            unique=entry.get("unique", False),
+            ttl=entry.get("ttl"),
+            partial=entry.get("partial"),
+            name=entry.get("name"),
+            source=source,
+        )
+
+    def options(self) -> Dict[str, Any]:
+        options: Dict[str, Any] = {"name": self.name}
+        if self.unique:
+            options["unique"] = True
+        if self.ttl is not None:
+            options["expireAfterSeconds"] = self.ttl
+        if self.partial is not None:
+            options["partialFilterExpression"] = self.partial
+        return options
+
+    def matches(self, info: Dict[str, Any]) -> bool:
+        """
+        Checks whether an existing index (from `index_information`) has the same definition.
+        """
+        return (
+            [tuple(pair) for pair in info.get("key", [])] == [tuple(pair) for pair in self.keys]
+            and bool(info.get("unique", False)) == self.unique
+            and info.get("expireAfterSeconds") == self.ttl
+            and info.get("partialFilterExpression") == self.partial
+        )
+
+    def __repr__(self) -> str:
+        return f"<IndexSpec {self.collection}.{self.name} source={self.source}>"
+
+
+class IndexRegistry:
+    """
+    Collects index declarations from managers and module manifests and reconciles them with the database.
+    """
+
+    def __init__(self, orm: Any, logger: Optional[logging.Logger] = None):
+        self.orm = orm
+        self.logger = logger or logging.getLogger("IndexRegistry")
+        self.specs: Dict[Tuple[str, str], IndexSpec] = {}
+
+    def declare(self, collection: str, keys: Sequence[Tuple[str, int]], source: str = "code", **options) -> IndexSpec:
+        """
+        Declares an index. Declaring the same collection and name twice keeps the last declaration.
+        """
+        spec = IndexSpec(collection, keys, source=source, **options)
+        self.specs[(collection, spec.name)] = spec
+        return spec
+
+    def declare_from_manifest(self, module_name: str, manifest: Dict[str, Any]):
+        """
+        Declares every entry of a manifest's `indexes` list.
+        """
+        for entry in manifest.get("indexes", []):
+            try:
+                spec = IndexSpec.from_manifest(entry, source=f"module:{module_name}")
+            except (KeyError, TypeError, ValueError) as e:
+                self.logger.error(f"Invalid index declaration {entry} in module '{module_name}': {e}")
+                continue
+            self.specs[(spec.collection, spec.name)] = spec
+
+    async def reconcile(self) -> Dict[str, List[str]]:
+        """
+        Creates missing indexes and reports conflicting, undeclared and unused ones.
+        Collections are reconciled concurrently.
+
+        Returns:
+            Dict[str, List[str]]: Index names grouped by 'created', 'present', 'conflicting',
+            'failed', 'undeclared' and 'unused'.
+        """
+        by_collection: Dict[str, List[IndexSpec]] = {}
+        for spec in self.specs.values():
+            by_collection.setdefault(spec.collection, []).append(spec)
+
+        report: Dict[str, List[str]] = {
+            "created": [], "present": [], "conflicting": [], "failed": [], "undeclared": [], "unused": []
+        }
+        await asyncio.gather(
+            *(self._reconcile_collection(name, specs, report) for name, specs in by_collection.items())
+        )
+
+        for status in ("created", "conflicting", "failed", "undeclared", "unused"):
+            if report[status]:
+                log = self.logger.warning if status in ("conflicting", "failed") else self.logger.info
+                log(f"Indexes {status}: {', '.join(sorted(report[status]))}")
+        self.logger.info(f"Index reconciliation done: {len(report['created'])} created, {len(report['present'])} already present.")
+        return report
+
+    async def _reconcile_collection(self, collection_name: str, specs: List[IndexSpec], report: Dict[str, List[str]]):
+        collection = self.orm.get_collection(collection_name)
+        try:
+            existing = await collection.index_information()
+        except Exception as e:
+            self.logger.error(f"Failed to list indexes for '{collection_name}': {e}")
+            existing = {}
+
+        missing = []
+        for spec in specs:
+            info = existing.get(spec.name) or next(
+                (i for i in existing.values() if [tuple(p) for p in i.get("key", [])] == spec.keys), None
+            )
+            if info is None:
+                missing.append(spec)
+            elif spec.matches(info):
+                report["present"].append(f"{collection_name}.{spec.name}")
+            else:
+                report["conflicting"].append(f"{collection_name}.{spec.name} ({spec.source})")
+
+        results = await asyncio.gather(
+            *(self.orm.create_index(collection_name, spec.keys, **spec.options()) for spec in missing),
+            return_exceptions=True,
+        )
+        for spec, result in zip(missing, results):
+            if isinstance(result, Exception):
+                self.logger.error(f"Failed to create index '{spec.name}' on '{collection_name}' ({spec.source}): {result}")
+                report["failed"].append(f"{collection_name}.{spec.name}")
+            else:
+                report["created"].append(f"{collection_name}.{spec.name}")
+
+        declared = {spec.name for spec in specs}
+        for name in existing:
+            if name != "_id_" and name not in declared:
+                report["undeclared"].append(f"{collection_name}.{name}")
+
+        created = {spec.name for spec in missing}
+        unused = await self._unused_indexes(collection_name, collection)
+        report["unused"].extend(name for name in unused if name.split(".", 1)[1] not in created)
+
+    async def _unused_indexes(self, collection_name: str, collection: Any) -> List[str]:
+        """
+        Lists indexes with no recorded accesses since the server started tracking them.
+        """
+        try:
+            stats = await collection.aggregate([{"$indexStats": {}}]).to_list(length=None)
+        except Exception as e:
+            self.logger.debug(f"Index usage stats unavailable for '{collection_name}': {e}")
+            return []
+        return [
+            f"{collection_name}.{entry['name']}"
+            for entry in stats
+            if entry.get("name") != "_id_" and entry.get("accesses", {}).get("ops", 0) == 0
+        ]
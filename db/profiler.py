@@ -0,0 +1,169 @@
+import asyncio
+import json
+import logging
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+# Operators that make a field a range/sort predicate rather than an equality match
+RANGE_OPERATORS = {"$gt", "$gte", "$lt", "$lte", "$ne", "$nin", "$exists", "$regex"}
+
+
+def normalize_query(query: Any) -> Any:
+    """
+    Replaces literal values in a query with placeholders, so queries that differ only
+    in their values share the same shape.
+
+    Example: {"user_id": "123", "xp": {"$gt": 10}} -> {"user_id": "?", "xp": {"$gt": "?"}}
+    """
+    if isinstance(query, dict):
+        return {key: normalize_query(value) for key, value in sorted(query.items())}
+    if isinstance(query, (list, tuple)):
+        # Keep the structure of $and/$or clauses, collapse literal lists like $in
+        if query and all(isinstance(item, dict) for item in query):
+            return [normalize_query(item) for item in query]
+        return ["?"]
+    return "?"
+
+
+def recommend_index(query: Dict[str, Any]) -> List[Tuple[str, int]]:
+    """
+    Suggests an index for a query shape: equality fields first, then range fields.
+    """
+    equality, ranges = [], []
+    for field, value in query.items():
+        if field.startswith("$"):
+            continue
+        if isinstance(value, dict) and any(op in RANGE_OPERATORS for op in value):
+            ranges.append((field, 1))
+        else:
+            equality.append((field, 1))
+    return equality + ranges
+
+
+def _plan_stages(plan: Dict[str, Any]) -> List[str]:
+    stages = [plan.get("stage", "")]
+    for key in ("inputStage", "queryPlan"):
+        if isinstance(plan.get(key), dict):
+            stages.extend(_plan_stages(plan[key]))
+    for child in plan.get("inputStages", []):
+        stages.extend(_plan_stages(child))
+    return stages
+
+
+class SlowQueryStats:
+    """
+    Aggregated statistics for one slow query shape.
+    """
+
+    __slots__ = ("collection", "operation", "shape", "count", "total_ms", "max_ms", "callers", "explained", "plan", "recommendation")
+
+    def __init__(self, collection: str, operation: str, shape: Any):
+        self.collection = collection
+        self.operation = operation
+        self.shape = shape
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.callers: Dict[str, int] = {}
+        self.explained = False
+        self.plan: Optional[List[str]] = None
+        self.recommendation: Optional[List[Tuple[str, int]]] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "collection": self.collection,
+            "operation": self.operation,
+            "shape": self.shape,
+            "count": self.count,
+            "avg_ms": round(self.total_ms / self.count, 2) if self.count else 0.0,
+            "max_ms": round(self.max_ms, 2),
+            "callers": self.callers,
+            "plan": self.plan,
+            "recommendation": self.recommendation,
+        }
+
+
+class QueryProfiler:
+    """
+    Logs ORM operations slower than a threshold and explains repeated slow shapes once.
+    """
+
+    def __init__(self, orm: Any, logger: Optional[logging.Logger] = None, threshold_ms: float = 100.0, explain_after: int = 3):
+        """
+        Args:
+            orm (MongoDBAsyncORM): The ORM whose database is used to run `explain`.
+            logger (Optional[logging.Logger]): Logger for slow query reports.
+            threshold_ms (float): Operations at or above this duration are considered slow.
+            explain_after (int): Number of slow occurrences of a shape before it is explained.
+        """
+        self.orm = orm
+        self.logger = logger or logging.getLogger("QueryProfiler")
+        self.threshold = threshold_ms / 1000
+        self.explain_after = explain_after
+        self.slow_queries: Dict[Tuple[str, str, str], SlowQueryStats] = {}
+
+    def observe(self, collection: str, operation: str, query: Any, elapsed: float, caller_frame: Any = None):
+        """
+        Records an operation. Anything under the threshold returns immediately.
+        """
+        if elapsed < self.threshold:
+            return
+
+        shape = normalize_query(query or {})
+        key = (collection, operation, json.dumps(shape, sort_keys=True))
+        stats = self.slow_queries.get(key)
+        if stats is None:
+            stats = self.slow_queries[key] = SlowQueryStats(collection, operation, shape)
+
+        elapsed_ms = elapsed * 1000
+        caller = self._describe_caller(caller_frame)
+        stats.count += 1
+        stats.total_ms += elapsed_ms
+        stats.max_ms = max(stats.max_ms, elapsed_ms)
+        stats.callers[caller] = stats.callers.get(caller, 0) + 1
+
+        self.logger.warning(
+            f"Slow query ({elapsed_ms:.1f}ms) on '{collection}.{operation}' shape={key[2]} caller={caller}"
+        )
+
+        if not stats.explained and stats.count >= self.explain_after and isinstance(query, dict):
+            stats.explained = True
+            asyncio.create_task(self._explain(stats, query))
+
+    @staticmethod
+    def _describe_caller(frame: Any) -> str:
+        if frame is None:
+            return "unknown"
+        code = frame.f_code
+        return f"{os.path.relpath(code.co_filename)}:{frame.f_lineno} in {code.co_name}"
+
+    async def _explain(self, stats: SlowQueryStats, query: Dict[str, Any]):
+        """
+        Explains the filter of a slow shape and logs a recommended index when it scans the collection.
+        Writes use the same filter as a find, so the find plan is representative for them too.
+        """
+        try:
+            result = await self.orm.db.command(
+                "explain", {"find": stats.collection, "filter": query}, verbosity="queryPlanner"
+            )
+        except Exception as e:
+            self.logger.error(f"Failed to explain slow query on '{stats.collection}': {e}")
+            return
+
+        winning_plan = result.get("queryPlanner", {}).get("winningPlan", {})
+        stats.plan = [stage for stage in _plan_stages(winning_plan) if stage]
+        self.logger.warning(f"Plan for slow shape on '{stats.collection}' {stats.shape}: {' <- '.join(stats.plan)}")
+
+        if "COLLSCAN" in stats.plan:
+            stats.recommendation = recommend_index(stats.shape)
+            if stats.recommendation:
+                self.logger.warning(
+                    f"Missing index: '{stats.collection}' is scanned for {stats.shape}. "
+                    f"Recommended index: {stats.recommendation}"
+                )
+
+    def report(self) -> List[Dict[str, Any]]:
+        """
+        Returns every slow shape seen so far, slowest total time first.
+        """
+        return [stats.to_dict() for stats in sorted(self.slow_queries.values(), key=lambda s: s.total_ms, reverse=True)]
@@ -1,14 +1,18 @@
 from discord.ext import commands
-from discord import app_commands
+from discord import app_commands, Interaction, Message
 from pathlib import Path
-from typing import Any
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+import asyncio
 import importlib.util
 import sys
+import time
 from logging import Logger
 from inspect import isclass, iscoroutinefunction
 from classes.structs.Subcommand import Subcommand
 from classes.structs.CommandHelp import CommandHelp
 from classes.structs.Module import Module
+from classes.structs.LazyCommand import build_lazy_command
+from utils.HotReload import ImportedFile, carry_state, fingerprint
 
 
 class CommandHandler:
@@ -21,49 +25,200 @@ class CommandHandler:
         self.logger = logger
         self.pending_subcommands = []  # Queue for subcommands waiting for parent groups
         self.detailed_help = {}  # Store detailed help information
+        # Text command names and aliases -> command, checked before any context is built
+        self.text_commands: Dict[str, Any] = {}
+        # Command files declared in manifests for lazy import: (module name, file) -> import state
+        self.lazy_files: Dict[Tuple[str, str], Dict[str, Any]] = {}
 
     async def load_commands_from_folder(self, folder: Path, base_package: str, module: Module):
         """
         Dynamically load all commands from a folder and its subfolders,
         associating them with the given module.
         """
+        for command_file, imported in self.import_commands_from_folder(folder, base_package, module.name).items():
+            await self.register_file(command_file, imported, module)
+
+    async def register_exports(self, exports: List[Any], module: Module):
+        """
+        Registers exports collected by `import_commands_from_folder`. Must run on the event loop.
+        """
+        for item in exports:
+            await self.process_export(item, module)
+
+    async def register_file(self, command_file: Path, imported: ImportedFile, module: Module):
+        """
+        Registers the exports of one command file and records on the module what the file
+        registered, so a hot reload can later swap it on its own.
+        """
+        slash_before, text_before = set(module.commands["slash"]), set(module.commands["text"])
+        await self.register_exports(imported.exports, module)
+        module.track_source(
+            command_file,
+            "commands",
+            imported.fingerprint,
+            slash=[name for name in module.commands["slash"] if name not in slash_before],
+            text=[name for name in module.commands["text"] if name not in text_before],
+            cogs=[
+                export.__cog_name__ for export in imported.exports
+                if isinstance(export, commands.Cog)
+                or (isclass(export) and issubclass(export, commands.Cog) and not hasattr(export, "setup"))
+            ],
+            help_entries=[export.name for export in imported.exports if isinstance(export, CommandHelp)],
+            # What a `setup` class does to the bot is unknown, so it cannot be undone file by file
+            opaque=any(isclass(export) and hasattr(export, "setup") for export in imported.exports),
+        )
+
+    def import_commands_from_folder(
+        self, folder: Path, base_package: str, module_name: str, skip: Optional[Set[str]] = None
+    ) -> Dict[Path, ImportedFile]:
+        """
+        Imports every command file of a folder and returns their exports, per file, without
+        registering them. Does not touch the bot, so it can run in a worker thread.
+
+        Args:
+            folder (Path): The commands folder.
+            base_package (str): Import package of the folder, e.g. 'modules.Defaults.commands'.
+            module_name (str): Name of the owning module, for log messages.
+            skip (Optional[Set[str]]): Files (relative to the folder) to leave for lazy import.
+        """
+        collected: Dict[Path, ImportedFile] = {}
         if not folder.exists():
-            self.logger.warning(f"Commands folder '{folder}' does not exist for module '{module.name}'.")
-            return
+            self.logger.warning(f"Commands folder '{folder}' does not exist for module '{module_name}'.")
+            return collected
 
         for command_file in folder.rglob("*.py"):
             if "__pycache__" in command_file.parts:
                 continue
             if command_file.stem.startswith("_"):
                 continue
+            if skip and command_file.relative_to(folder).as_posix() in skip:
+                continue
 
-            # Determine the module name based on the relative path
-            relative_path = command_file.relative_to(folder).with_suffix("")  # Remove .py
-            module_name = f"{base_package}.{'.'.join(relative_path.parts)}"
+            imported = self._import_command_file(command_file, folder, base_package, module_name)
+            if imported is not None:
+                collected[command_file] = imported
+        return collected
 
-            # Load the module
-            spec = importlib.util.spec_from_file_location(module_name, command_file)
-            if spec is None:
-                self.logger.error(f"Failed to load command module: {command_file} for module '{module.name}'.")
-                continue
+    def _import_command_file(self, command_file: Path, folder: Path, base_package: str, module_name: str) -> Optional[ImportedFile]:
+        """
+        Imports one command file. If the import fails, a previous import of the file stays in place.
+        """
+        # Determine the module name based on the relative path
+        relative_path = command_file.relative_to(folder).with_suffix("")  # Remove .py
+        import_name = f"{base_package}.{'.'.join(relative_path.parts)}"
 
-            module_obj = importlib.util.module_from_spec(spec)
-            sys.modules[module_name] = module_obj
-            loader = spec.loader
-            if loader is None:
-                self.logger.error(f"Loader not found for command module: {command_file} in module '{module.name}'.")
-                continue
+        # Load the module
+        spec = importlib.util.spec_from_file_location(import_name, command_file)
+        if spec is None:
+            self.logger.error(f"Failed to load command module: {command_file} for module '{module_name}'.")
+            return None
 
+        module_obj = importlib.util.module_from_spec(spec)
+        loader = spec.loader
+        if loader is None:
+            self.logger.error(f"Loader not found for command module: {command_file} in module '{module_name}'.")
+            return None
+
+        previous = sys.modules.get(import_name)
+        sys.modules[import_name] = module_obj
+        try:
+            file_fingerprint = fingerprint(command_file)
+            loader.exec_module(module_obj)
+        except Exception as e:
+            self.logger.error(f"Error executing module '{import_name}': {e}")
+            if previous is not None:
+                sys.modules[import_name] = previous
+            else:
+                sys.modules.pop(import_name, None)
+            return None
+
+        carry_state(previous, module_obj)
+        return ImportedFile(list(getattr(module_obj, "exports", [])), file_fingerprint)
+
+    def register_lazy_commands(self, entries: List[Dict[str, Any]], folder: Path, base_package: str, module: Module):
+        """
+        Registers stub slash commands declared in a module's manifest (`lazyCommands`).
+        The file behind a stub is imported on the first invocation or autocomplete of any of its commands.
+        """
+        for entry in entries:
             try:
-                loader.exec_module(module_obj)
-            except Exception as e:
-                self.logger.error(f"Error executing module '{module_name}': {e}")
+                key = (module.name, entry["file"])
+                state = self.lazy_files.setdefault(key, {
+                    "folder": folder,
+                    "base_package": base_package,
+                    "module": module,
+                    "stubs": [],
+                    "loaded": False,
+                    "lock": asyncio.Lock(),
+                })
+                stub = build_lazy_command(
+                    entry,
+                    lambda interaction, key=key, name=entry["name"]: self._invoke_lazy(key, name, interaction),
+                    lambda interaction, option, key=key, name=entry["name"]: self._autocomplete_lazy(key, name, option, interaction),
+                )
+            except (KeyError, TypeError, ValueError) as e:
+                self.logger.error(f"Invalid lazy command declaration {entry} in module '{module.name}': {e}")
                 continue
 
-            # Process the exported items in the module
-            exports = getattr(module_obj, "exports", [])
-            for item in exports:
-                await self.process_export(item, module)
+            state["stubs"].append(stub.name)
+            self.register_slash_command(stub, module)
+
+    def forget_lazy_commands(self, module_name: str):
+        """
+        Drops the lazy import state of a module, e.g. when it is unloaded.
+        """
+        for key in [key for key in self.lazy_files if key[0] == module_name]:
+            del self.lazy_files[key]
+
+    async def _materialize(self, key: Tuple[str, str]) -> bool:
+        """
+        Imports a lazily declared command file and replaces its stubs with the real commands.
+        """
+        state = self.lazy_files.get(key)
+        if state is None:
+            return False
+
+        async with state["lock"]:
+            if state["loaded"]:
+                return True
+
+            start = time.perf_counter()
+            folder: Path = state["folder"]
+            imported = await asyncio.to_thread(
+                self._import_command_file, folder / key[1], folder, state["base_package"], key[0]
+            )
+            if imported is None:
+                return False
+
+            module: Module = state["module"]
+            for name in state["stubs"]:
+                self.bot.tree.remove_command(name)
+                module.commands["slash"].pop(name, None)
+            await self.register_file(folder / key[1], imported, module)
+            state["loaded"] = True
+            self.logger.info(
+                f"Lazily loaded '{key[1]}' for module '{key[0]}' in {(time.perf_counter() - start) * 1000:.0f}ms."
+            )
+            return True
+
+    def _real_command(self, key: Tuple[str, str], name: str) -> app_commands.Command:
+        command = self.bot.tree.get_command(name)
+        if command is None or command.extras.get("lazy"):
+            raise RuntimeError(f"Command '{name}' is declared in the manifest of '{key[0]}' but not exported by '{key[1]}'.")
+        return command
+
+    async def _invoke_lazy(self, key: Tuple[str, str], name: str, interaction: Interaction):
+        if not await self._materialize(key):
+            raise RuntimeError(f"Failed to import '{key[1]}' for command '{name}'.")
+        # Checks, argument conversion and the cog binding are handled by the real command
+        await self._real_command(key, name)._invoke_with_namespace(interaction, interaction.namespace)
+
+    async def _autocomplete_lazy(self, key: Tuple[str, str], name: str, option: str, interaction: Interaction) -> list:
+        if not await self._materialize(key):
+            return []
+        # The real command answers the interaction itself; the stub's empty result is then ignored
+        await self._real_command(key, name)._invoke_autocomplete(interaction, option, interaction.namespace)
+        return []
 
     async def process_export(self, export: Any, module: Module):
         """
@@ -122,6 +277,94 @@ class CommandHandler:
         self.bot.add_command(command)
         self.logger.info(f"Registered regular command '{command.name}' in module '{module.name}'.")
         module.commands["text"][command.name] = command
+        self._index_text_command(command.name, command, command.aliases)
+
+    def register_custom_command(self, name: str, func: Callable, module: Module, aliases: Iterable[str] = ()):
+        """
+        Registers a plain coroutine as a text command.
+
+        The function is called with `client`, `message`, `args`, `profile`, `logger`, `guild`,
+        `interfacer` and `used_name`. `profile` and `guild` are only fetched when the function sets
+        `needs_profile` / `needs_guild` to True; otherwise they are None.
+        """
+        module.commands["text"][name] = func
+        self._index_text_command(name, func, aliases)
+        self.logger.info(f"Registered custom command '{name}' in module '{module.name}'.")
+
+    def unregister_text_command(self, name: str, command: Any):
+        """
+        Removes a text command (and its aliases) from the bot and the dispatch index.
+        """
+        if isinstance(command, commands.Command):
+            self.bot.remove_command(command.name)
+        for key in [key for key, value in self.text_commands.items() if value is command]:
+            del self.text_commands[key]
+
+    def _index_text_command(self, name: str, command: Any, aliases: Iterable[str] = ()):
+        for key in (name, *aliases):
+            existing = self.text_commands.get(key)
+            if existing is not None and existing is not command:
+                self.logger.warning(f"Text command name '{key}' is already taken; it now points to the latest registration.")
+            self.text_commands[key] = command
+
+    def get_prefix(self, message: Message) -> str:
+        """
+        Returns the text command prefix for a message.
+        """
+        prefix = self.bot.command_prefix
+        return prefix(self.bot, message) if callable(prefix) else prefix
+
+    async def dispatch_text(self, message: Message):
+        """
+        Dispatches a prefixed text command.
+
+        Non-commands are rejected with one prefix check and one dict lookup; the context is only
+        built, and profile/guild data only fetched, once a command has matched.
+        """
+        if message.author.bot:
+            return
+
+        content = message.content
+        prefix = self.get_prefix(message)
+        if not content.startswith(prefix):
+            return
+
+        args = content[len(prefix):].split()
+        if not args:
+            return
+        used_name = args.pop(0)
+        command = self.text_commands.get(used_name)
+        if command is None:
+            return
+
+        if isinstance(command, commands.Command):
+            ctx = await self.bot.get_context(message)
+            await self.bot.invoke(ctx)
+        elif message.guild is not None:
+            await self._run_custom_command(command, message, args, used_name)
+
+    async def _run_custom_command(self, command: Callable, message: Message, args: list, used_name: str):
+        try:
+            profile: Optional[Any] = None
+            guild: Optional[Any] = None
+            if getattr(command, "needs_profile", False):
+                profile = await self.bot.member_manager.fetch_or_create(str(message.author.id), str(message.guild.id))
+            if getattr(command, "needs_guild", False):
+                guild = await self.bot.guild_manager.fetch_or_create(str(message.guild.id))
+
+            await command(
+                client=self.bot,
+                message=message,
+                args=args,
+                profile=profile,
+                logger=getattr(command, "logger", self.logger),
+                guild=guild,
+                interfacer=None,
+                used_name=used_name,
+            )
+        except Exception as e:
+            self.logger.error(f"Error executing command '{used_name}': {e}")
+            await message.reply("An error occurred while executing the command.")
 
     def register_subcommand(self, subcommand: Subcommand, module: Module):
         """
@@ -179,6 +422,7 @@ class CommandHandler:
             
             for command in text_commands:
                 module.commands["text"][command.name] = command
+                self._index_text_command(command.name, command, command.aliases)
 
             for slash in slash_commands:
                 module.commands["slash"][slash.name] = slash
@@ -1,20 +1,222 @@
 # handlers/eventHandler.py
 
+import asyncio
 import importlib.util
 import sys
+import time
 from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
 from discord.ext import commands
 from logging import Logger
 from classes.structs.Module import Module
+from utils.FairScheduler import Priority, SchedulerOverloaded
+from utils.HotReload import ImportedFile, carry_state, fingerprint
+from utils.Metrics import REGISTRY
+
+LISTENER_DURATION = REGISTRY.histogram(
+    "event_listener_duration_seconds", "Event listener run time.", ["event", "module", "listener"]
+)
+LISTENER_ERRORS = REGISTRY.counter("event_listener_errors_total", "Event listener failures.", ["event", "module", "listener"])
+
+# Filters a listener can declare in its export, e.g. {"guild_only": True, "ignore_bots": True}
+KNOWN_FILTERS = {"guild_only", "ignore_bots", "channel_types", "settings"}
+
+
+class EventListener:
+    """
+    A module listener registered on the event bus, with its pre-filters.
+    """
+
+    def __init__(
+        self,
+        event: str,
+        func: Callable,
+        module_name: str,
+        filters: Optional[Dict[str, Any]] = None,
+        priority: Priority = Priority.NORMAL,
+        max_concurrency: Optional[int] = None,
+    ):
+        self.event = event
+        self.func = func
+        self.module_name = module_name
+        self.name = getattr(func, "__name__", repr(func))
+        filters = filters or {}
+        self.guild_only: bool = bool(filters.get("guild_only", False))
+        self.ignore_bots: bool = bool(filters.get("ignore_bots", False))
+        self.channel_types: Optional[frozenset] = (
+            frozenset(filters["channel_types"]) if filters.get("channel_types") else None
+        )
+        self.settings: Tuple[str, ...] = tuple(filters.get("settings", ()))
+        # Listeners with the same filters share one evaluation per event
+        self.filter_key = (self.guild_only, self.ignore_bots, self.channel_types, self.settings)
+        self.priority = priority
+        self.max_concurrency = max_concurrency
+        self.limit_key = f"listener:{module_name}.{self.name}"
+        self.duration = LISTENER_DURATION.labels(event, module_name, self.name)
+        self.errors = LISTENER_ERRORS.labels(event, module_name, self.name)
+
+
+class _EventFacts:
+    """
+    Lazily extracted facts about one event, shared by every filter evaluated for it.
+    """
+
+    __slots__ = ("subject", "_settings")
+
+    def __init__(self, args: Tuple[Any, ...]):
+        self.subject = args[0] if args else None
+        self._settings: Optional[Dict[str, Any]] = None
+
+    @property
+    def guild(self):
+        return getattr(self.subject, "guild", None)
+
+    @property
+    def is_bot(self) -> bool:
+        author = getattr(self.subject, "author", None) or getattr(self.subject, "user", None) or self.subject
+        return bool(getattr(author, "bot", False))
+
+    @property
+    def channel_type(self) -> Optional[str]:
+        channel = getattr(self.subject, "channel", None)
+        channel_type = getattr(channel, "type", None)
+        return getattr(channel_type, "name", None)
+
+    async def settings(self, bot: commands.Bot) -> Dict[str, Any]:
+        if self._settings is None:
+            guild_id = str(self.guild.id)
+            settings = bot.setting_cache.get(guild_id)
+            if settings is None:
+                settings = (await bot.guild_manager.fetch_or_create(guild_id)).settings
+            self._settings = settings
+        return self._settings
+
 
 class EventHandler:
     """
     Handler to dynamically load and register events from modules.
+
+    Each event gets a single dispatcher registered on the bot; module listeners are kept
+    here and selected by their declared filters, evaluated once per event. Selected listeners
+    run through the bot's fair scheduler, keyed by the event's guild.
     """
 
     def __init__(self, bot: commands.Bot, logger: Logger):
         self.bot = bot
         self.logger = logger
+        self.listeners: Dict[str, List[EventListener]] = {}
+        self._dispatchers: Dict[str, Callable] = {}
+
+    def add_listener(
+        self,
+        event_name: str,
+        func: Callable,
+        module_name: str,
+        filters: Optional[Dict[str, Any]] = None,
+        priority: Priority = Priority.NORMAL,
+        max_concurrency: Optional[int] = None,
+    ) -> EventListener:
+        """
+        Adds a listener to the bus, registering the event's dispatcher on first use.
+        """
+        unknown = set(filters or {}) - KNOWN_FILTERS
+        if unknown:
+            self.logger.warning(f"Unknown filters {sorted(unknown)} on listener '{func.__name__}' from module '{module_name}'.")
+
+        listener = EventListener(event_name, func, module_name, filters, priority, max_concurrency)
+        self.listeners.setdefault(event_name, []).append(listener)
+        if event_name not in self._dispatchers:
+            dispatcher = self._make_dispatcher(event_name)
+            self._dispatchers[event_name] = dispatcher
+            self.bot.add_listener(dispatcher, event_name)
+        return listener
+
+    def remove_listener(self, event_name: str, func: Callable) -> bool:
+        """
+        Removes a listener, and the event's dispatcher once no listeners remain.
+        """
+        listeners = self.listeners.get(event_name, [])
+        remaining = [listener for listener in listeners if listener.func is not func]
+        if len(remaining) == len(listeners):
+            return False
+
+        if remaining:
+            self.listeners[event_name] = remaining
+        else:
+            self.listeners.pop(event_name, None)
+            dispatcher = self._dispatchers.pop(event_name, None)
+            if dispatcher:
+                self.bot.remove_listener(dispatcher, event_name)
+        return True
+
+    def _make_dispatcher(self, event_name: str) -> Callable:
+        async def dispatch(*args, **kwargs):
+            listeners = self.listeners.get(event_name)
+            if not listeners:
+                return
+
+            facts = _EventFacts(args)
+            decisions: Dict[tuple, bool] = {}
+            selected = []
+            for listener in listeners:
+                allowed = decisions.get(listener.filter_key)
+                if allowed is None:
+                    allowed = decisions[listener.filter_key] = await self._passes(listener, facts)
+                if allowed:
+                    selected.append(listener)
+
+            guild = facts.guild
+            guild_id = guild.id if guild is not None else None
+            if len(selected) == 1:
+                await self._run(selected[0], guild_id, args, kwargs)
+            elif selected:
+                await asyncio.gather(*(self._run(listener, guild_id, args, kwargs) for listener in selected))
+
+        dispatch.__name__ = event_name
+        return dispatch
+
+    async def _passes(self, listener: EventListener, facts: _EventFacts) -> bool:
+        if listener.ignore_bots and facts.is_bot:
+            return False
+        if (listener.guild_only or listener.settings) and facts.guild is None:
+            return False
+        if listener.channel_types is not None and facts.channel_type not in listener.channel_types:
+            return False
+        if listener.settings:
+            try:
+                settings = await facts.settings(self.bot)
+            except Exception as e:
+                self.logger.error(f"Failed to load settings for event filters of '{listener.name}': {e}")
+                return False
+            for setting_id in listener.settings:
+                setting = settings.get(setting_id)
+                if setting is None or not setting.value:
+                    return False
+        return True
+
+    async def _run(self, listener: EventListener, guild_id: Optional[int], args: tuple, kwargs: dict):
+        """
+        Runs one listener in a scheduler slot, isolating its errors from the other listeners of the event.
+        """
+        try:
+            async with self.bot.scheduler.slot(
+                guild_id, listener.priority, listener.limit_key, listener.max_concurrency
+            ):
+                await self._call(listener, args, kwargs)
+        except SchedulerOverloaded:
+            pass  # Counted by the scheduler
+
+    async def _call(self, listener: EventListener, args: tuple, kwargs: dict):
+        start = time.perf_counter()
+        try:
+            await listener.func(*args, **kwargs)
+        except Exception as e:
+            listener.errors.inc()
+            self.logger.error(
+                f"Error in listener '{listener.name}' for event '{listener.event}' from module '{listener.module_name}': {e}"
+            )
+        finally:
+            listener.duration.observe(time.perf_counter() - start)
 
     def load_events_from_module(self, module_name: str, events_path: Path, module: Module):
         """
@@ -25,49 +227,96 @@ class EventHandler:
             events_path (Path): Path to the events folder within the module.
             module (Module): The module instance.
         """
+        for event_file, imported in self.import_events(module_name, events_path).items():
+            self.register_file(event_file, imported, module)
+
+    def import_events(self, module_name: str, events_path: Path) -> Dict[Path, ImportedFile]:
+        """
+        Imports every events file of a module and returns their export dicts, per file, without
+        registering them. Does not touch the bot, so it can run in a worker thread.
+
+        Args:
+            module_name (str): Name of the module.
+            events_path (Path): Path to the events folder within the module.
+        """
+        collected: Dict[Path, ImportedFile] = {}
         if not events_path.exists() or not events_path.is_dir():
             self.logger.warning(f"Events folder '{events_path}' not found for module '{module_name}'.")
-            return
+            return collected
 
         # Recursively search for .py files in the events directory
         for event_file in events_path.rglob("*.py"):
             if event_file.stem.startswith("_"):  # Skip special files like __init__.py
                 continue
 
-            # Import the event module
-            
-            event_module_name = f"modules.{module_name}.events.{event_file.stem}"  # Inclui 'modules.'
+            imported = self._import_event_file(event_file, module_name)
+            if imported is not None:
+                collected[event_file] = imported
+        return collected
 
-            spec = importlib.util.spec_from_file_location(event_module_name, event_file)
-            if spec is None:
-                self.logger.error(f"Failed to load event '{event_file}' in module '{module_name}'.")
-                continue
+    def _import_event_file(self, event_file: Path, module_name: str) -> Optional[ImportedFile]:
+        """
+        Imports one events file. If the import fails, a previous import of the file stays in place.
+        """
+        event_module_name = f"modules.{module_name}.events.{event_file.stem}"  # Inclui 'modules.'
 
-            event_module = importlib.util.module_from_spec(spec)
-            sys.modules[event_module_name] = event_module
-            loader = spec.loader
-            if loader is None:
-                self.logger.error(f"Loader not found for event '{event_file}' in module '{module_name}'.")
-                continue
+        spec = importlib.util.spec_from_file_location(event_module_name, event_file)
+        if spec is None:
+            self.logger.error(f"Failed to load event '{event_file}' in module '{module_name}'.")
+            return None
 
-            try:
-                loader.exec_module(event_module)
-            except Exception as e:
-                self.logger.error(f"Error executing event '{event_file}' in module '{module_name}': {e}")
-                continue
+        event_module = importlib.util.module_from_spec(spec)
+        loader = spec.loader
+        if loader is None:
+            self.logger.error(f"Loader not found for event '{event_file}' in module '{module_name}'.")
+            return None
 
-            # Register event listeners
-            if hasattr(event_module, "exports"):
-                exports = getattr(event_module, "exports")
-                if isinstance(exports, list):
-                    for export in exports:
-                        if isinstance(export, dict):
-                            event_name = export.get("event")
-                            func = export.get("func")
-                            if event_name and callable(func):
-                                try:
-                                    self.bot.add_listener(func, event_name)
-                                    module.register_event(event_name, func)  # Register in the module
-                                    self.logger.info(f"Registered event '{event_name}' from module '{module_name}'.")
-                                except Exception as e:
-                                    self.logger.error(f"Error registering event '{event_name}' from module '{module_name}': {e}")
+        previous = sys.modules.get(event_module_name)
+        sys.modules[event_module_name] = event_module
+        try:
+            file_fingerprint = fingerprint(event_file)
+            loader.exec_module(event_module)
+        except Exception as e:
+            self.logger.error(f"Error executing event '{event_file}' in module '{module_name}': {e}")
+            if previous is not None:
+                sys.modules[event_module_name] = previous
+            else:
+                sys.modules.pop(event_module_name, None)
+            return None
+
+        carry_state(previous, event_module)
+        exports = getattr(event_module, "exports", None)
+        if not isinstance(exports, list):
+            exports = []
+        return ImportedFile([export for export in exports if isinstance(export, dict)], file_fingerprint)
+
+    def register_file(self, event_file: Path, imported: ImportedFile, module: Module):
+        """
+        Registers the listeners of one events file and records them on the module, so a hot
+        reload can later swap the file on its own.
+        """
+        before = len(module.events)
+        self.register_events(module.name, imported.exports, module)
+        module.track_source(event_file, "events", imported.fingerprint, events=module.events[before:])
+
+    def register_events(self, module_name: str, exports: List[Dict[str, Any]], module: Module):
+        """
+        Registers event exports collected by `import_events`. Must run on the event loop.
+        """
+        for export in exports:
+            event_name = export.get("event")
+            func = export.get("func")
+            if event_name and callable(func):
+                try:
+                    self.add_listener(
+                        event_name,
+                        func,
+                        module_name,
+                        export.get("filters"),
+                        Priority.parse(export.get("priority", "normal")),
+                        export.get("max_concurrency"),
+                    )
+                    module.register_event(event_name, func)  # Register in the module
+                    self.logger.info(f"Registered event '{event_name}' from module '{module_name}'.")
+                except Exception as e:
+                    self.logger.error(f"Error registering event '{event_name}' from module '{module_name}': {e}")
@@ -1,13 +1,166 @@
+import atexit
+import json
 import logging
 import os
+import queue
+import random
+import threading
+import time
+from logging.handlers import QueueHandler, QueueListener, TimedRotatingFileHandler
+from typing import Dict, List, Optional, Tuple
 
-def setup_logging(name: str, level: int = logging.INFO) -> logging.Logger:
+DEFAULT_FORMAT = "%(asctime)s - %(levelname)s - %(name)s - %(message)s"
+
+# Attributes every LogRecord has; anything else on a record came from `extra=`
+_RECORD_ATTRS = frozenset(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime"}
+
+# Listeners started by setup_logging, stopped by shutdown_logging
+_listeners: List[QueueListener] = []
+
+
+class SizedTimedRotatingFileHandler(TimedRotatingFileHandler):
+    """
+    File handler that rotates on a time schedule and whenever the file grows past `max_bytes`.
+    """
+
+    def __init__(self, filename: str, max_bytes: int = 0, **kwargs):
+        super().__init__(filename, **kwargs)
+        self.max_bytes = max_bytes
+
+    def shouldRollover(self, record: logging.LogRecord) -> int:
+        if super().shouldRollover(record):
+            return 1
+        # Same check RotatingFileHandler does, without formatting the record twice
+        if self.max_bytes > 0 and self.stream is not None and self.stream.tell() >= self.max_bytes:
+            return 1
+        return 0
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    Formats records as one JSON object per line, keeping the fields passed through `extra=`.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": record.created,
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Caps the number of records each logger may emit per window.
+
+    Records at WARNING or above are never dropped. When a window closes after dropping
+    records, the next record that passes is annotated with the number of suppressed lines.
+    """
+
+    def __init__(self, rate: int = 50, per: float = 1.0, overrides: Optional[Dict[str, int]] = None):
+        super().__init__()
+        self.rate = rate
+        self.per = per
+        self.overrides = overrides or {}
+        self._windows: Dict[str, List[float]] = {}  # name -> [window_start, passed, dropped]
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+
+        rate = self.overrides.get(record.name, self.rate)
+        if rate <= 0:
+            return True
+
+        now = time.monotonic()
+        with self._lock:
+            window = self._windows.get(record.name)
+            if window is None or now - window[0] >= self.per:
+                dropped = int(window[2]) if window else 0
+                self._windows[record.name] = [now, 1, 0]
+                if dropped:
+                    record.msg = f"{record.getMessage()} ({dropped} similar lines suppressed)"
+                    record.args = None
+                return True
+
+            if window[1] < rate:
+                window[1] += 1
+                return True
+
+            window[2] += 1
+            return False
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keeps roughly one in `sample_every` DEBUG records per call site.
+
+    Only loggers whose name starts with one of `loggers` are sampled; pass `loggers=None`
+    to sample every DEBUG line.
+    """
+
+    def __init__(self, sample_every: int = 10, loggers: Optional[List[str]] = None):
+        super().__init__()
+        self.sample_every = max(1, sample_every)
+        self.loggers = tuple(loggers) if loggers is not None else None
+        self._counters: Dict[Tuple[str, int], int] = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > logging.DEBUG or self.sample_every == 1:
+            return True
+        if self.loggers is not None and not record.name.startswith(self.loggers):
+            return True
+
+        key = (record.pathname, record.lineno)
+        count = self._counters.get(key)
+        if count is None:
+            # Stagger call sites so they don't all emit on the same tick
+            count = random.randrange(self.sample_every)
+        self._counters[key] = count + 1
+        return count % self.sample_every == 0
+
+
+def setup_logging(
+    name: str,
+    level: int = logging.INFO,
+    *,
+    max_bytes: int = 10 * 1024 * 1024,
+    backup_count: int = 5,
+    when: str = "midnight",
+    rate_limit: int = 50,
+    rate_period: float = 1.0,
+    sample_every: int = 10,
+    sampled_loggers: Optional[List[str]] = None,
+    capture_root: bool = False,
+    json_output: bool = False,
+) -> logging.Logger:
     """
     Set up logging with the specified name and level.
 
+    Loggers only enqueue records; a `QueueListener` thread formats them and writes to
+    `logs/<name>.log` (rotated by size and time) and to the console, so no disk I/O
+    happens on the event loop.
+
     Args:
         name (str): The name of the logger.
         level (int): The logging level (e.g., logging.INFO, logging.DEBUG).
+        max_bytes (int): Rotate the log file once it reaches this size. 0 disables size rotation.
+        backup_count (int): Number of rotated files to keep.
+        when (str): Time-based rotation interval, as accepted by `TimedRotatingFileHandler`.
+        rate_limit (int): Maximum records below WARNING per logger per `rate_period` seconds.
+        rate_period (float): Length of the rate limiting window in seconds.
+        sample_every (int): Keep one in N DEBUG records per call site of sampled loggers.
+        sampled_loggers (Optional[List[str]]): Logger name prefixes that are sampled. Defaults to all.
+        capture_root (bool): Attach the pipeline to the root logger so standalone loggers use it too.
+        json_output (bool): Also write structured records, including `extra=` fields, to `logs/<name>.jsonl`.
 
     Returns:
         logging.Logger: Configured logger instance.
@@ -19,15 +172,58 @@ def setup_logging(name: str, level: int = logging.INFO) -> logging.Logger:
     os.makedirs("logs", exist_ok=True)
 
     # File handler
-    file_handler = logging.FileHandler(f"logs/{name}.log", encoding='utf-8')
+    file_handler = SizedTimedRotatingFileHandler(
+        f"logs/{name}.log", max_bytes=max_bytes, when=when, backupCount=backup_count, encoding="utf-8"
+    )
     file_handler.setLevel(level)
-    file_handler.setFormatter(logging.Formatter("%(asctime)s - %(levelname)s - %(message)s"))
-    logger.addHandler(file_handler)
+    file_handler.setFormatter(logging.Formatter(DEFAULT_FORMAT))
 
     # Stream handler
     stream_handler = logging.StreamHandler()
     stream_handler.setLevel(level)
     stream_handler.setFormatter(logging.Formatter("%(asctime)s - %(message)s"))
-    logger.addHandler(stream_handler)
+
+    # Queue handler: the only handler that runs on the caller's thread
+    log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+    queue_handler = QueueHandler(log_queue)
+    queue_handler.setLevel(level)
+    queue_handler.addFilter(SamplingFilter(sample_every=sample_every, loggers=sampled_loggers))
+    queue_handler.addFilter(RateLimitFilter(rate=rate_limit, per=rate_period))
+
+    handlers: List[logging.Handler] = [file_handler, stream_handler]
+
+    # Structured handler
+    if json_output:
+        json_handler = SizedTimedRotatingFileHandler(
+            f"logs/{name}.jsonl", max_bytes=max_bytes, when=when, backupCount=backup_count, encoding="utf-8"
+        )
+        json_handler.setLevel(level)
+        json_handler.setFormatter(JsonFormatter())
+        handlers.append(json_handler)
+
+    listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    _listeners.append(listener)
+
+    if capture_root:
+        root = logging.getLogger()
+        root.setLevel(level)
+        root.addHandler(queue_handler)
+    else:
+        logger.addHandler(queue_handler)
 
     return logger
+
+
+def shutdown_logging():
+    """
+    Flushes queued records and stops every listener started by `setup_logging`.
+    """
+    while _listeners:
+        listener = _listeners.pop()
+        listener.stop()
+        for handler in listener.handlers:
+            handler.close()
+
+
+atexit.register(shutdown_logging)
@@ -1,11 +1,15 @@
+import asyncio
 import json
 import importlib
+import time
 from pathlib import Path
-from typing import Dict, Any, Optional, List
+from types import ModuleType
+from typing import Dict, Any, Iterable, Optional, List, Tuple
 from logging import Logger
 from discord.ext import commands
 from classes.structs.Module import Module
 from shared.types import ExtendedClient
+from utils.HotReload import fingerprint
 import sys
 
 
@@ -19,6 +23,9 @@ class ModuleHandler:
         self.logger = logger
         self.modules_path = Path("./modules")
         self.loaded_modules: Dict[str, Module] = {}
+        self.timings: Dict[str, Dict[str, float]] = {}  # Load time breakdown per module
+        self._reload_lock = asyncio.Lock()  # Hot reloads (watcher and owner commands) run one at a time
+        self._failed_imports: Dict[Tuple[str, str], str] = {}  # (module, file) -> hash of content that failed to import
         
     def register_permissions(self, module_name: str, permissions: List[str]):
         """
@@ -39,13 +46,47 @@ class ModuleHandler:
     async def load_modules(self, specific_module: Optional[str] = None):
         """
         Dynamically load all modules from the specified path.
+
+        Manifests are read and module files imported in worker threads. Independent modules load
+        concurrently; a module waits only for the modules listed in its manifest's `dependencies`.
+        Registration on the bot (commands, cogs, listeners) stays on the event loop.
+        """
+        start = time.perf_counter()
+        discovered = await asyncio.to_thread(self._discover_modules, specific_module)
+
+        loop = asyncio.get_running_loop()
+        loaded: Dict[str, asyncio.Future] = {name: loop.create_future() for name in discovered}
+        for name in self._find_dependency_cycles(discovered):
+            self.logger.error(f"Module '{name}' is part of a dependency cycle. Skipping module.")
+            loaded[name].set_result(False)
+
+        await asyncio.gather(*(
+            self._load_module(name, folder, manifest, loaded)
+            for name, (folder, manifest) in discovered.items()
+            if not loaded[name].done()
+        ))
+
+        # Keep discovery order (which is also the order settings are listed in) regardless of finish order
+        position = {name: index for index, name in enumerate(discovered)}
+        self.loaded_modules = dict(sorted(self.loaded_modules.items(), key=lambda item: position.get(item[0], -1)))
+        self.bot.modules = self.loaded_modules
+
+        wall = (time.perf_counter() - start) * 1000
+        total = sum(self.timings[name]["total_ms"] for name in discovered if name in self.timings)
+        self.logger.info(f"Loaded {len(discovered)} module(s) in {wall:.0f}ms (sum of module load times: {total:.0f}ms).")
+
+    def _discover_modules(self, specific_module: Optional[str] = None) -> Dict[str, Tuple[Path, Dict[str, Any]]]:
         """
-        modules_path = self.modules_path
+        Finds module folders and reads their manifests. Runs in a worker thread.
 
-        for module_folder in modules_path.iterdir():
+        Returns:
+            Dict[str, Tuple[Path, Dict[str, Any]]]: Module name -> (folder, manifest).
+        """
+        discovered: Dict[str, Tuple[Path, Dict[str, Any]]] = {}
+        for module_folder in sorted(self.modules_path.iterdir()):
             if not module_folder.is_dir():
                 continue
-            
+
             if specific_module and module_folder.name != specific_module:
                 continue
 
@@ -62,8 +103,51 @@ class ModuleHandler:
                 self.logger.error(f"Failed to parse manifest for module {module_folder.name}: {e}")
                 continue
 
+            discovered[manifest.get("name", module_folder.name)] = (module_folder, manifest)
+        return discovered
+
+    @staticmethod
+    def _find_dependency_cycles(discovered: Dict[str, Tuple[Path, Dict[str, Any]]]) -> List[str]:
+        """
+        Returns the modules that are part of a dependency cycle among the discovered modules.
+        """
+        graph = {name: [dep for dep in manifest.get("dependencies", []) if dep in discovered]
+                 for name, (_, manifest) in discovered.items()}
+        in_cycle, state = set(), {}
+
+        def visit(name: str, path: List[str]):
+            state[name] = "visiting"
+            for dep in graph[name]:
+                if state.get(dep) == "visiting":
+                    in_cycle.update(path[path.index(dep):])
+                elif dep not in state:
+                    visit(dep, path + [dep])
+            state[name] = "done"
+
+        for name in graph:
+            if name not in state:
+                visit(name, [name])
+        return sorted(in_cycle)
+
+    async def _load_module(self, name: str, module_folder: Path, manifest: Dict[str, Any], loaded: Dict[str, asyncio.Future]):
+        """
+        Loads one module once its dependencies are loaded, and records its timing report.
+        """
+        timings = {"wait_ms": 0.0, "setup_ms": 0.0, "import_ms": 0.0, "register_ms": 0.0, "total_ms": 0.0}
+        ok = False
+        start = time.perf_counter()
+        try:
+            for dependency in manifest.get("dependencies", []):
+                if dependency in loaded:
+                    if not await loaded[dependency]:
+                        self.logger.error(f"Dependency '{dependency}' of module '{name}' failed to load. Skipping module.")
+                        return
+                elif dependency not in self.loaded_modules:
+                    self.logger.error(f"Dependency '{dependency}' of module '{name}' not found. Skipping module.")
+                    return
+            timings["wait_ms"] = (time.perf_counter() - start) * 1000
+
             # Extract module information
-            name = manifest.get("name", module_folder.name)
             self.logger.info(f"Loading {name} module...")
             description = manifest.get("description", "No description provided.")
             version = manifest.get("version", "1.0.0")
@@ -77,10 +161,13 @@ class ModuleHandler:
             base_package = f"modules.{module_folder.name}.commands"
 
             # Execute the setup function and retrieve interface and settings
-            setup_data = self._execute_setup(setup_file)
+            step = time.perf_counter()
+            init_module = await asyncio.to_thread(self._import_init_file, setup_file, module_folder.name)
+            setup_data = self._run_setup(init_module, setup_file) if init_module else None
+            timings["setup_ms"] = (time.perf_counter() - step) * 1000
             if setup_data is None:
                 self.logger.error(f"Setup failed for module {name}. Skipping module.")
-                continue
+                return
 
             interface = setup_data.get("interface", {})
             settings = setup_data.get("settings", [])
@@ -102,38 +189,78 @@ class ModuleHandler:
                 user_settings=user_settings,
             )
 
-            if self.bot.command_handler:
-                await self.bot.command_handler.load_commands_from_folder(commands_folder, base_package, module)
-            else:
+            if not self.bot.command_handler:
                 self.logger.error("CommandHandler is not initialized.")
+            if not self.bot.event_handler:
+                self.logger.error("EventHandler is not initialized.")
+
+            # Import command and event files off the event loop; files behind lazy stubs are skipped
+            lazy_commands = manifest.get("lazyCommands", [])
+            lazy_files = {entry.get("file") for entry in lazy_commands}
+            core_files = [path for path in (module_folder / "manifest.json", setup_file) if path.exists()]
+            step = time.perf_counter()
+            command_files, event_files, core_fingerprints = await asyncio.gather(
+                asyncio.to_thread(
+                    self.bot.command_handler.import_commands_from_folder, commands_folder, base_package, name, lazy_files
+                )
+                if self.bot.command_handler else asyncio.sleep(0, {}),
+                asyncio.to_thread(self.bot.event_handler.import_events, name, events_folder)
+                if self.bot.event_handler else asyncio.sleep(0, {}),
+                asyncio.to_thread(lambda: [fingerprint(path) for path in core_files]),
+            )
+            timings["import_ms"] = (time.perf_counter() - step) * 1000
+
+            step = time.perf_counter()
+            # Every file's registrations are tracked so it can later be hot-reloaded on its own
+            for path, file_fingerprint in zip(core_files, core_fingerprints):
+                module.track_source(path, "core", file_fingerprint)
+
+            if self.bot.command_handler:
+                for command_file, imported in command_files.items():
+                    await self.bot.command_handler.register_file(command_file, imported, module)
+                self.bot.command_handler.register_lazy_commands(lazy_commands, commands_folder, base_package, module)
 
             # Load events
             if self.bot.event_handler:
-                self.bot.event_handler.load_events_from_module(name, events_folder, module)
-            else:
-                self.logger.error("EventHandler is not initialized.")
+                for event_file, imported in event_files.items():
+                    self.bot.event_handler.register_file(event_file, imported, module)
+
+            # Declare the module's indexes; they are built by the startup reconciliation
+            self.bot.db.indexes.declare_from_manifest(name, manifest)
+            timings["register_ms"] = (time.perf_counter() - step) * 1000
 
             # Store the module in the loaded modules dictionary
             self.loaded_modules[name] = module
-            self.logger.info(f"Successfully loaded module: {name}")
-
-        self.bot.modules = self.loaded_modules
+            ok = True
+        except Exception as e:
+            self.logger.error(f"Failed to load module {name}: {e}")
+        finally:
+            timings["total_ms"] = (time.perf_counter() - start) * 1000
+            self.timings[name] = timings
+            loaded[name].set_result(ok)
+            if ok:
+                self.logger.info(
+                    f"Successfully loaded module: {name} in {timings['total_ms']:.0f}ms "
+                    f"(waited {timings['wait_ms']:.0f}ms, setup {timings['setup_ms']:.0f}ms, "
+                    f"import {timings['import_ms']:.0f}ms, register {timings['register_ms']:.0f}ms)"
+                )
 
-    def _execute_setup(self, setup_file_path: Path) -> Optional[Dict[str, Any]]:
+    def _import_init_file(self, setup_file_path: Path, folder_name: str) -> Optional[ModuleType]:
         """
-        Executes the setup function from the module's init file.
+        Imports the module's init file. Runs in a worker thread.
 
         Args:
             setup_file_path (Path): Path to the init file.
+            folder_name (str): Folder of the module, used to give the init file a unique import name.
 
         Returns:
-            Optional[Dict[str, Any]]: Dictionary containing 'interface', 'settings', and 'managers' if successful.
+            Optional[ModuleType]: The imported init file, or None on failure.
         """
         if not setup_file_path.exists():
             self.logger.warning(f"Init file not found: {setup_file_path}")
             return None
 
-        module_name = f"init_{setup_file_path.stem}"
+        module_name = f"modules.{folder_name}.{setup_file_path.stem}"
         spec = importlib.util.spec_from_file_location(module_name, setup_file_path)
         if spec is None:
             self.logger.error(f"Failed to load init file: {setup_file_path}")
@@ -148,6 +275,23 @@ class ModuleHandler:
 
         try:
             loader.exec_module(module)
+        except Exception as e:
+            self.logger.error(f"Error importing init file {setup_file_path}: {e}")
+            return None
+        return module
+
+    def _run_setup(self, module: ModuleType, setup_file_path: Path) -> Optional[Dict[str, Any]]:
+        """
+        Executes the setup function from the module's init file.
+
+        Args:
+            module (ModuleType): The imported init file.
+            setup_file_path (Path): Path to the init file, for error messages.
+
+        Returns:
+            Optional[Dict[str, Any]]: Dictionary containing 'interface', 'settings', and 'managers' if successful.
+        """
+        try:
             setup_func = getattr(module, "setup", None)
             if callable(setup_func):
                 setup_data = setup_func(self.bot, self.logger)
@@ -175,9 +319,174 @@ class ModuleHandler:
             except Exception as e:
                 self.logger.error(f"Failed to unload module {module_name}: {e}")
 
-    async def reload_modules(self):
+    async def reload_modules(self, sync_scopes: Iterable = ()) -> Dict[str, Dict[str, List[str]]]:
+        """
+        Reloads the changed files of every module. See `reload_changed`.
+        """
+        return await self.reload_changed(sync_scopes=sync_scopes)
+
+    async def reload_changed(
+        self, module_names: Optional[Iterable[str]] = None, sync_scopes: Iterable = ()
+    ) -> Dict[str, Dict[str, List[str]]]:
+        """
+        Hot-reloads the command and event files that changed on disk since they were imported.
+
+        Unchanged files cost one stat each; only changed files are re-imported, in a worker thread,
+        and a file that fails to import keeps its previous version. The exports of each changed file
+        then replace its old ones in place, so the other files, the module's interface and managers
+        are left untouched. Globals a file lists in `__persist__` are carried over to the new import.
+        A changed manifest or init file reloads the whole module instead.
+
+        Args:
+            module_names (Optional[Iterable[str]]): Modules to check. Defaults to every loaded module.
+            sync_scopes (Iterable): Slash command scopes to re-sync if command files changed.
+
+        Returns:
+            Dict[str, Dict[str, List[str]]]: Per changed module, the files 'reloaded', 'added',
+            'removed' and 'failed', or the 'core' files that caused a full module reload.
+        """
+        reports: Dict[str, Dict[str, List[str]]] = {}
+        for name in list(module_names or self.loaded_modules):
+            report = await self.reload_module(name)
+            if any(report.values()):
+                reports[name] = report
+
+        commands_changed = any(
+            report.get(label) for report in reports.values() for label in ("core", "reloaded", "added", "removed")
+        )
+        scopes = [scope for scope in sync_scopes if scope != "none"]
+        if commands_changed and scopes:
+            # The syncer skips scopes whose payload did not change (e.g. only listeners were edited)
+            self.bot.command_syncer.request_sync(*scopes)
+        return reports
+
+    async def reload_module(self, name: str, full: bool = False) -> Dict[str, List[str]]:
+        """
+        Reloads one module's changed command and event files, or all of them with `full`.
+
+        Returns:
+            Dict[str, List[str]]: The files 'reloaded', 'added', 'removed' and 'failed'.
+        """
+        report: Dict[str, List[str]] = {"reloaded": [], "added": [], "removed": [], "failed": []}
+        module = self.loaded_modules.get(name)
+        if module is None:
+            self.logger.warning(f"Cannot reload module '{name}': it is not loaded.")
+            return report
+
+        async with self._reload_lock:
+            start = time.perf_counter()
+            plan = await asyncio.to_thread(self._plan_reload, module, dict(module.sources), full)
+
+            for key, current in plan["touched"].items():
+                if key in module.sources:
+                    module.sources[key]["fingerprint"] = current  # Saved without edits; no need to re-hash next time
+
+            if plan["core"] or plan["opaque"]:
+                reason = plan["core"] or plan["opaque"]
+                self.logger.info(f"{', '.join(reason)} of module '{name}' changed; reloading the whole module.")
+                await self._reload_whole_module(module)
+                return {"core": reason}
+
+            # Swap file by file: the old exports go only once the new import has succeeded
+            for key, (kind, path, imported) in plan["imported"].items():
+                if imported is None:
+                    report["failed"].append(key)
+                    continue
+                existed = await module.remove_source(self.bot, key) is not None
+                if kind == "commands":
+                    await self.bot.command_handler.register_file(path, imported, module)
+                else:
+                    self.bot.event_handler.register_file(path, imported, module)
+                report["reloaded" if existed else "added"].append(key)
+
+            for key in plan["removed"]:
+                await module.remove_source(self.bot, key)
+                report["removed"].append(key)
+
+        if any(report.values()):
+            self.logger.info(
+                f"Hot-reloaded module '{name}' in {(time.perf_counter() - start) * 1000:.0f}ms "
+                f"(checked {plan['checked']} file(s)): "
+                + ", ".join(f"{label} {files}" for label, files in report.items() if files)
+            )
+        return report
+
+    def _plan_reload(self, module: Module, sources: Dict[str, Dict[str, Any]], full: bool) -> Dict[str, Any]:
+        """
+        Finds the module's changed, new and deleted source files and imports the changed and new
+        ones. Runs in a worker thread and does not touch the bot.
+        """
+        plan: Dict[str, Any] = {"core": [], "opaque": [], "touched": {}, "imported": {}, "removed": [], "checked": 0}
+        module_folder = Path(module.path)
+        manifest = module.data
+        commands_folder = module_folder / manifest.get("commandsFolder", "commands")
+        events_folder = module_folder / manifest.get("eventsFolder", "events")
+        base_package = f"modules.{module_folder.name}.commands"
+        lazy_files = {entry.get("file") for entry in manifest.get("lazyCommands", [])}
+
+        candidates: List[Tuple[str, Path]] = []
+        if commands_folder.exists():
+            candidates += [("commands", path) for path in commands_folder.rglob("*.py")
+                           if "__pycache__" not in path.parts and not path.stem.startswith("_")]
+        if events_folder.exists():
+            candidates += [("events", path) for path in events_folder.rglob("*.py") if not path.stem.startswith("_")]
+
+        seen = set()
+        for kind, path in candidates:
+            key = module.source_key(path)
+            record = sources.get(key)
+            if record is None and kind == "commands" and path.relative_to(commands_folder).as_posix() in lazy_files:
+                continue  # Still a lazy stub; imported on first use
+            seen.add(key)
+            plan["checked"] += 1
+
+            try:
+                current = fingerprint(path, record["fingerprint"] if record else None)
+            except OSError:
+                continue  # Deleted while scanning; picked up by the next scan
+            if record is not None and not full and current[2] == record["fingerprint"][2]:
+                if current != record["fingerprint"]:
+                    plan["touched"][key] = current
+                continue
+            if not full and self._failed_imports.get((module.name, key)) == current[2]:
+                continue  # Same broken content as last time; wait for the next edit
+
+            if record is not None and record["opaque"]:
+                plan["opaque"].append(key)
+                continue
+            if kind == "commands":
+                imported = self.bot.command_handler._import_command_file(path, commands_folder, base_package, module.name)
+            else:
+                imported = self.bot.event_handler._import_event_file(path, module.name)
+            plan["imported"][key] = (kind, path, imported)
+            if imported is None:
+                self._failed_imports[(module.name, key)] = current[2]
+            else:
+                self._failed_imports.pop((module.name, key), None)
+
+        for key, record in sources.items():
+            if record["kind"] == "core":
+                plan["checked"] += 1
+                try:
+                    current = fingerprint(record["path"], record["fingerprint"])
+                except OSError:
+                    plan["core"].append(key)
+                    continue
+                if current[2] != record["fingerprint"][2]:
+                    plan["core"].append(key)
+                elif current != record["fingerprint"]:
+                    plan["touched"][key] = current
+            elif key not in seen:
+                if record["opaque"]:
+                    plan["opaque"].append(key)
+                else:
+                    plan["removed"].append(key)
+        return plan
+
+    async def _reload_whole_module(self, module: Module):
         """
-        Reloads all modules dynamically.
+        Unloads a module and loads it again from disk, running its init file again.
         """
-        await self.unload_modules()
-        await self.load_modules()
\ No newline at end of file
+        await module.unload(self.bot)
+        self.loaded_modules.pop(module.name, None)
+        await self.load_modules(specific_module=Path(module.path).name)
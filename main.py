@@ -1,21 +1,39 @@
 # main.py
 
+# Installed before every other import so their cost shows up in the startup report
+from utils.StartupProfiler import StartupProfiler
+startup_profiler = StartupProfiler()
+startup_profiler.install()
+
 import argparse
 import asyncio
 import logging
 import os
+import time
 from pathlib import Path
 from dotenv import load_dotenv
 
 import aiohttp
-from discord import Intents, Activity, ActivityType, Object
+from discord import Intents, Activity, ActivityType
 from shared.types import ExtendedClient
 from handlers.moduleHandler import ModuleHandler
 from handlers.commandHandler import CommandHandler
 from handlers.eventHandler import EventHandler
 from db.db import MongoDBAsyncORM
+from handlers.logger import setup_logging, shutdown_logging
+from utils.AutoDefer import AutoDefer
+from utils.CommandRecorder import CommandRecorder, instrument_http
+from utils.CommandDispatch import DispatchingCommandTree
+from utils.CommandSync import CommandSyncer
+from utils.ComponentRouter import ComponentRouter
+from utils.FairScheduler import FairScheduler
+from utils.HotReload import ModuleWatcher
+from utils.StartupPipeline import StartupPipeline
+from utils.TimerWheel import TimerWheel
+from utils.WarmCache import WarmCache
+from utils.Metrics import REGISTRY, MetricsServer
 from classes.managers.SettingsManager import SettingsManager
-from classes.managers.GuildManager import GuildManager
+from classes.managers.GuildManager import GuildManager, DEFAULT_PREFIX
 from classes.managers.MemberManager import MemberManager
 from classes.managers.PermissionsManager import PermissionsManager
 from utils.Translator import Translator
@@ -36,8 +54,16 @@ def parse_args():
 load_dotenv()
 TOKEN = os.getenv("BOT_TOKEN")
 MONGODB_URI = os.getenv("MONGODB_URI")
+METRICS_PORT = int(os.getenv("METRICS_PORT", "9108"))  # 0 disables the metrics endpoint
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "100"))
+MAX_CONCURRENCY = int(os.getenv("MAX_CONCURRENCY", "64"))  # Events and commands running at once
+GUILD_CONCURRENCY = int(os.getenv("GUILD_CONCURRENCY", "8"))  # Of which a single guild may hold
 OWNER_IDS = [322773637772083201, 840707271385284628, 930644246539665408]
-TEST_GUILD_ID = 1160309121929728111  # Replace with your test guild ID
+# Slash command scopes synced at startup: "global" and/or guild IDs, e.g. "global,1160309121929728111"
+SYNC_SCOPES = [scope.strip() for scope in os.getenv("SYNC_SCOPES", "global").split(",") if scope.strip()]
+HOT_RELOAD_INTERVAL = float(os.getenv("HOT_RELOAD_INTERVAL", "0"))  # Seconds between module file scans; 0 disables
+startup_profiler.import_budget_ms = float(os.getenv("IMPORT_BUDGET_MS", "500"))  # Slower imports are flagged at boot
+startup_profiler.record_phase("imports", time.perf_counter() - startup_profiler.started)
 
 # -----------------------------------------------------------------------------
 # Argument Parsing
@@ -49,123 +75,206 @@ DEBUG_MODE = args.debug
 # Logging Configuration
 # -----------------------------------------------------------------------------
 log_level = logging.DEBUG if DEBUG_MODE else logging.INFO
-logging.basicConfig(level=log_level, format="%(asctime)s - %(levelname)s - %(name)s - %(message)s")
+# Records are written from a background thread; hot-path DEBUG lines are sampled
+logger = setup_logging(
+    "Bot", log_level, sampled_loggers=["Bot.GuildManager", "XPManager"], capture_root=True, json_output=True
+)
 logging.getLogger("discord").setLevel(logging.WARNING)
 logging.getLogger("pymongo").setLevel(logging.WARNING)
-logger = logging.getLogger("Bot")
 logger.info("Logger initialized.")
 
+GATEWAY_EVENTS = REGISTRY.counter("gateway_events_total", "Gateway events received by type.", ["event"])
+
 # -----------------------------------------------------------------------------
 # Bot Initialization
 # -----------------------------------------------------------------------------
+def resolve_prefix(bot: "Bot", message) -> str:
+    """
+    Resolves the text command prefix from the in-memory prefix map: one dict lookup per message.
+    """
+    if message.guild is None or bot.guild_manager is None:
+        return DEFAULT_PREFIX
+    return bot.guild_manager.get_prefix(message.guild.id)
+
 class Bot(ExtendedClient): 
     def __init__(self, logger: logging.Logger):
         intents = Intents.default()
         intents.message_content = True 
 
-        super().__init__(intents=intents, logger=logger, command_prefix="j!", owner_ids=OWNER_IDS, help_command=None)
+        super().__init__(
+            intents=intents, logger=logger, command_prefix=resolve_prefix, owner_ids=OWNER_IDS, help_command=None,
+            tree_cls=DispatchingCommandTree,  # Schedules, records and auto-defers application commands
+        )
 
         self.session: aiohttp.ClientSession = None
         self.db = None
         self.detailed_help = {}
         self.setting_cache = {}
+        self.command_recorder: CommandRecorder = None
+        self.metrics_server: MetricsServer = None
+        self.module_watcher: ModuleWatcher = None
+        self.startup_timings = {}  # Setup stage -> start offset, run time and end offset (ms)
+        self.warm_cache: WarmCache = None
+        # Shared by event listeners and commands so a single busy guild cannot starve the others
+        self.scheduler = FairScheduler(
+            self.get_logger("Scheduler"), max_concurrency=MAX_CONCURRENCY, per_guild_concurrency=GUILD_CONCURRENCY
+        )
+        # Defers commands that are about to miss the 3-second response deadline
+        self.auto_defer = AutoDefer(self.get_logger("AutoDefer"))
+        # One listener per gateway event for every live view, instead of one per view
+        self.component_router = ComponentRouter(self, self.get_logger("ComponentRouter"))
+        # Every view timeout runs from this one heap and task
+        self.timer_wheel = TimerWheel(self.get_logger("TimerWheel"))
         self.ready = False
 
     async def setup_hook(self):
         """
         Initial setup for the bot before it becomes ready.
+
+        Setup runs as a graph of stages: each stage starts once the stages it depends on are done,
+        so independent steps overlap. A failing stage cancels the others and aborts startup with a
+        StageFailed error naming it, instead of leaving a half-initialized bot running.
+        Per-stage timings are kept in `startup_timings` and exported as metrics.
         """
+        pipeline = StartupPipeline(self.get_logger("Startup"))
+        pipeline.stage("database", self._setup_database)
+        pipeline.stage("http_session", self._setup_http_session)
+        pipeline.stage("instrumentation", self._setup_instrumentation)
+        pipeline.stage("handlers", self._setup_handlers)
+        pipeline.stage("emojis", self._setup_emojis)
+        pipeline.stage("translator", self._setup_translator)
+        pipeline.stage("managers", self._setup_managers, after=["database"])
+        pipeline.stage("modules", self._setup_modules, after=["managers", "handlers", "translator"])
+        pipeline.stage("indexes", self._setup_indexes, after=["modules"])
+        pipeline.stage("prefixes", self._setup_prefixes, after=["managers"])
+        pipeline.stage("permission_migration", self._setup_permission_migration, after=["managers"])
+        pipeline.stage("warm_cache", self._setup_warm_cache, after=["modules", "emojis", "translator"])
+        pipeline.stage("translations", self._setup_translations, after=["warm_cache"])
+        pipeline.stage("command_sync", self.sync_slash_commands, after=["modules"])
+        self.startup_timings = await pipeline.run()
+
+        # Phase and import-time report, with per-module load times
+        for name, timing in self.startup_timings.items():
+            startup_profiler.record_phase(name, timing["run_ms"] / 1000)
+        await asyncio.to_thread(
+            startup_profiler.finish, self.get_logger("Startup"), self.module_handler.timings
+        )
+
+    async def _setup_database(self):
         # Initialize MongoDB connection
         self.logger.info("Connecting to MongoDB...")
-        try:
-            self.db = MongoDBAsyncORM(uri=MONGODB_URI, db_name="GigaJoyce-Test")
-            await self.db.create_index("members", [("id", 1), ("guildId", 1)], unique=True)
-            self.db.members = self.db.get_collection("members")
-            self.db.guilds = self.db.get_collection("guilds")
-            self.db.users = self.db.get_collection("users")
-            self.logger.info("Successfully connected to the database and collected data.")
-        except Exception as e:
-            self.logger.error(f"Failed to connect to MongoDB: {e}")
-            return
+        self.db = MongoDBAsyncORM(
+            uri=MONGODB_URI, db_name="GigaJoyce-Test", logger=self.get_logger("Database"), slow_query_ms=SLOW_QUERY_MS
+        )
+        self.db.members = self.db.get_collection("members")
+        self.db.guilds = self.db.get_collection("guilds")
+        self.db.users = self.db.get_collection("users")
+        # The client connects lazily; fail here rather than on the first query
+        await self.db.client.admin.command("ping")
+        self.logger.info("Successfully connected to the database and collected data.")
 
-        # Initialize HTTP session+
+    async def _setup_http_session(self):
+        # Initialize HTTP session
         self.session = aiohttp.ClientSession()
 
-        # Initialize Managers
+    async def _setup_instrumentation(self):
+        # Record per-command timings (queue wait, handler, DB and REST time)
+        self.command_recorder = CommandRecorder(self.get_logger("CommandRecorder"))
+        instrument_http(self.http)
+        self.command_recorder.start()
+
+        # Expose metrics locally
+        if METRICS_PORT:
+            self.metrics_server = MetricsServer(self.get_logger("Metrics"), port=METRICS_PORT)
+            try:
+                await self.metrics_server.start()
+            except OSError as e:
+                self.logger.error(f"Failed to start metrics endpoint on port {METRICS_PORT}: {e}")
+                self.metrics_server = None
+
+    async def _setup_handlers(self):
+        self.logger.info("Initializing Handlers...")
+        self.command_handler = CommandHandler(self, self.logger)
+        self.event_handler = EventHandler(self, self.logger)
+        self.command_syncer = CommandSyncer(self, self.tree, self.get_logger("CommandSync"))
+        self.logger.info("Handlers initialized.")
+
+    async def _setup_emojis(self):
+        self.logger.info("Initializing EmojiManager...")
+        self.emoji_manager = EmojiManager(self, Path("./shared/emojis"), self.logger)
+        await asyncio.to_thread(self.emoji_manager.load_global_emojis)
+        self.logger.info("EmojiManager initialized.")
+
+    async def _setup_translator(self):
+        self.logger.info("Initializing Translator...")
+        self.translator = Translator(self, Path("./shared/translations"), self.logger)
+        self.logger.info("Translator initialized.")
+
+    async def _setup_managers(self):
         self.logger.info("Initializing Managers...")
-        self.guild_manager= GuildManager(self, self.logger)
+        self.guild_manager = GuildManager(self, self.get_logger("GuildManager"))
         self.member_manager = MemberManager(self, self.logger)
         self.settings_manager = SettingsManager(self, self.logger)
         self.permission_manager = PermissionsManager(self, self.logger)
         self.logger.info("Managers initialized.")
 
+        # Legacy collections still read by guild_id + name
+        self.db.indexes.declare("channels", [("guild_id", 1), ("name", 1)], source="legacy")
+        self.db.indexes.declare("roles", [("guild_id", 1), ("name", 1)], source="legacy")
+
         # Register default permission namespaces
         self.logger.info("Registering default permission namespaces...")
-        self.permission_manager.register_node("Role.*", RolesNamespace)
-        self.permission_manager.register_node("User.*", UsersNamespace)
-        self.permission_manager.register_node("Channel.*", ChannelsNamespace)
+        self.permission_manager.register_node("Role.*", RolesNamespace, matches="roles")
+        self.permission_manager.register_node("User.*", UsersNamespace, matches="users")
+        self.permission_manager.register_node("Channel.*", ChannelsNamespace, matches="channels")
         self.logger.info("Default permission namespaces registered.")
 
-        # Initialize EmojiManager
-        self.logger.info("Initializing EmojiManager...")
-        translations_path = Path("./shared/emojis")
-        self.emoji_manager = EmojiManager(self, translations_path, self.logger )
-        self.logger.info("EmojiManager initialized.")
-        
-        # Initialize Translator
-        self.logger.info("Initializing Translator...")
-        translations_path = Path("./shared/translations")
-        self.translator = Translator(self, translations_path, self.logger )
-        self.logger.info("Translator initialized.")
-  
-        # Initialize Handlers
-        self.logger.info("Initializing Handlers...")
-        self.command_handler = CommandHandler(self, self.logger)
-        self.event_handler = EventHandler(self, self.logger)
-        self.logger.info("Handlers initialized.")
-
-        # Initialize and load modules
+    async def _setup_modules(self):
         self.logger.info("Initializing ModuleHandler...")
         self.module_handler = ModuleHandler(self, self.logger)
         await self.module_handler.load_modules()
         self.logger.info("ModuleHandler initialized.")
 
-        # Sync slash commands
-        await self.sync_slash_commands()
+        # Hot-reload changed command and event files during development
+        if HOT_RELOAD_INTERVAL > 0:
+            self.module_watcher = ModuleWatcher(
+                self.module_handler, self.get_logger("HotReload"), HOT_RELOAD_INTERVAL, SYNC_SCOPES
+            )
+            self.module_watcher.start()
+
+    async def _setup_indexes(self):
+        # Build every declared index (managers, modules and legacy collections) concurrently
+        self.logger.info("Reconciling database indexes...")
+        await self.db.indexes.reconcile()
+
+    async def _setup_prefixes(self):
+        # Warm the per-guild prefix map in one query
+        await self.guild_manager.load_prefixes()
+
+    async def _setup_permission_migration(self):
+        # Move overrides still stored under the legacy field to the canonical one
+        await self.permission_manager.migrate_legacy_overrides()
+
+    async def _setup_warm_cache(self):
+        # Serve languages, settings and translations from the last shutdown's snapshot right away
+        self.warm_cache = WarmCache(self, self.get_logger("WarmCache"))
+        await self.warm_cache.load()
+
+    async def _setup_translations(self):
+        # Global and module translation files, with emoji placeholders resolved
+        if not self.warm_cache.translations_loaded:
+            await self.translator.refresh_translation_cache()
 
     async def sync_slash_commands(self):
         """
-        Prompt the user to sync slash commands globally or for specific guilds.
+        Sync slash commands for the configured scopes (SYNC_SCOPES). Scopes whose commands
+        did not change since the last sync are skipped.
         """
-        print("\nChoose a sync option for slash commands:")
-        print("1. Sync globally (all servers)")
-        print("2. Sync to a specific guild")
-        print(f"3. Sync to the test guild (ID: {TEST_GUILD_ID})")
-        print("4. Do not sync (skip this step)")
-        sync_choice = input("Enter your choice (1/2/3/4): ").strip()
-        # sync_choice = ""
+        if "none" in SYNC_SCOPES:
+            self.logger.info("Slash command synchronization skipped.")
+            return
+        await self.command_syncer.sync(SYNC_SCOPES)
 
-        try:
-            if sync_choice == "1":
-                await self.tree.sync()
-                self.logger.info("Slash commands synced globally.")
-            elif sync_choice == "2":
-                guild_ids = input("Enter guild IDs separated by commas: ").strip().split(",")
-                for guild_id in guild_ids:
-                    guild = Object(id=int(guild_id.strip()))
-                    await self.tree.sync(guild=guild)
-                    self.logger.info(f"Slash commands synced to guild {guild_id.strip()}.")
-            elif sync_choice == "3":
-                guild = Object(id=TEST_GUILD_ID)
-                await self.tree.sync(guild=guild)
-                self.logger.info(f"Slash commands synced to test guild {TEST_GUILD_ID}.")
-            elif sync_choice == "4":
-                self.logger.info("Slash command synchronization skipped.")
-            else:
-                print("Invalid choice. No sync performed.")
-        except Exception as e:
-            self.logger.error(f"Failed to sync slash commands: {e}")
-            
     async def _populate_language_cache(self):
         """
         Preload all guild languages into the Translator's cache.
@@ -175,6 +284,8 @@ class Bot(ExtendedClient):
         try:
             for guild in self.guilds:
                 guild_id = str(guild.id)
+                if guild_id in self.translator.language_cache:
+                    continue  # Restored from the warm cache snapshot
                 language = await self.guild_manager.get_language(guild_id)
                 self.translator.language_cache[guild_id] = language
                 self.logger.debug(f"Cached language '{language}' for guild '{guild_id}'")
@@ -195,15 +306,38 @@ class Bot(ExtendedClient):
         if not self.ready:
             self.logger.info(f"Bot connected as {self.user}")
             await self.change_presence(activity=Activity(type=ActivityType.watching, name="TechJoyce"))
+            await self.warm_cache.hydrate_settings()
             await self._populate_language_cache()
-            await self.translator.refresh_translation_cache()
             self.ready = True
 
+    async def process_commands(self, message):
+        """
+        Text commands go through the CommandHandler's dispatcher, which rejects non-commands
+        before a context is built.
+        """
+        if self.command_handler:
+            await self.command_handler.dispatch_text(message)
+
+    async def on_socket_event_type(self, event_type: str):
+        """
+        Counts every gateway event by type.
+        """
+        GATEWAY_EVENTS.labels(event_type).inc()
+
     async def close(self):
         """
         Gracefully close the bot, including HTTP sessions and database connections.
         """
         self.logger.info("Shutting down bot...")
+        if self.module_watcher:
+            await self.module_watcher.stop()
+        await self.timer_wheel.stop()
+        if self.warm_cache and self.ready:
+            await self.warm_cache.save()
+        if self.command_recorder:
+            await self.command_recorder.close()
+        if self.metrics_server:
+            await self.metrics_server.stop()
         if self.session:
             await self.session.close()
         if self.db:
@@ -227,6 +361,7 @@ async def main():
         logger.exception(f"Unexpected exception: {e}")
     finally:
         await bot.close()
+        shutdown_logging()
 
 if __name__ == "__main__":
     asyncio.run(main())
@@ -1,10 +1,11 @@
 # help.py
 
 import asyncio
-from discord import app_commands, Embed, Interaction, ButtonStyle, SelectOption
+from discord import app_commands, Embed, Interaction, ButtonStyle, Member, SelectOption
 from discord.ui import Button, Select
+from utils.AutoDefer import respond
 from utils.InteractionView import InteractionView
-from typing import List, Dict, Optional
+from typing import Any, List, Dict, Optional
 from shared.types import ExtendedClient
 from discord.ext import commands
 
@@ -13,13 +14,16 @@ class HelpCommand(commands.Cog):
     def __init__(self, bot: ExtendedClient):
         self.bot = bot
 
-    @app_commands.command(name="help", description="Shows all commands or information about a specific command.")
+    @app_commands.command(
+        name="help",
+        description="Shows all commands or information about a specific command.",
+        extras={"auto_defer": True, "ephemeral": True},
+    )
     @app_commands.describe(command="Command name to search for.")
     async def help_command(self, interaction: Interaction, command: Optional[str] = None):
         guild_id = interaction.guild.id if interaction.guild else None
         language = await self.bot.translator.get_language(guild_id)
-        translate = self.bot.translator.get_module_translations("Defaults", language)
-        
+        translate = self.bot.translator.get_translator_sync(language, "Defaults")
 
         if command:
             await self._send_command_description(interaction, command, language, translate)
@@ -28,8 +32,12 @@ class HelpCommand(commands.Cog):
 
     async def _send_command_description(self, interaction: Interaction, command_name: str, language: str, translate):
         command = self.bot.get_command(command_name)
+        if command:
+            module_name = self._module_of(command_name)
+            if module_name and not await self._allowed_commands(interaction, module_name, {command_name: command}):
+                command = None
         if not command:
-            await interaction.response.send_message(translate("help.command_not_found"), ephemeral=True)
+            await respond(interaction, translate("help.command_not_found"), ephemeral=True)
             return
 
         embed = Embed(
@@ -39,7 +47,7 @@ class HelpCommand(commands.Cog):
         )
         embed.add_field(name=translate("help.how_to_use"), value=f"`/{command.name}`", inline=False)
 
-        await interaction.response.send_message(embed=embed, ephemeral=True)
+        await respond(interaction, embed=embed, ephemeral=True)
 
     async def _send_modules_overview(self, interaction: Interaction, language: str, translate):
         modules = self.bot.modules
@@ -108,14 +116,15 @@ class HelpCommand(commands.Cog):
         """
         module = self.bot.modules.get(module_name)  # Certifique-se de que 'modules' é um dicionário no bot
         
-        translateModule = self.bot.translator.get_module_translations(module_name, language)
+        translateModule = self.bot.translator.get_translator_sync(language, module_name)
         
         if not module:
             await interaction.response.send_message(translate("help.module_not_found"), ephemeral=True)
             return
 
-        # Combine comandos de texto e comandos slash
+        # Combine comandos de texto e comandos slash, ocultando os que o membro não pode usar
         commands = {**module.commands["text"], **module.commands["slash"]}
+        commands = await self._allowed_commands(interaction, module_name, commands)
 
         self.bot.logger.info(f"Comandos dentro do módulo {module_name}: {commands}")
         embed = Embed(
@@ -162,6 +171,33 @@ class HelpCommand(commands.Cog):
         await view.update(embeds=[embed], components=[back_button])
 
 
+    def _module_of(self, command_name: str) -> Optional[str]:
+        """
+        Retorna o nome do módulo que registrou o comando, se houver.
+        """
+        for module_name, module in self.bot.modules.items():
+            if command_name in module.commands["text"] or command_name in module.commands["slash"]:
+                return module_name
+        return None
+
+    async def _allowed_commands(self, interaction: Interaction, module_name: str, commands: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Filtra os comandos que o membro pode usar, verificando todos os nós `<Módulo>.<comando>`
+        de uma vez. Comandos sem override continuam visíveis.
+
+        :param interaction: A interação do Discord.
+        :param module_name: Nome do módulo dos comandos.
+        :param commands: Comandos por nome.
+        :return: Apenas os comandos permitidos.
+        """
+        if not isinstance(interaction.user, Member):
+            return commands
+        nodes = {f"{module_name}.{command_name}": command_name for command_name in commands}
+        decisions = await self.bot.permission_manager.has_permissions(
+            nodes, interaction.user, interaction.channel, default=True
+        )
+        return {command_name: commands[command_name] for node, command_name in nodes.items() if decisions[node]}
+
     async def _handle_view_end(self, reason: str):
         """
         Método opcional para lidar com o término da view.
@@ -2,23 +2,53 @@ import discord
 from discord import app_commands
 from discord.ext import commands
 from pathlib import Path
+import asyncio
 import yaml
 import aiohttp
 import io
-from typing import Any, Dict, List, Union
-from classes.structs.Permissions import Permissions
+from typing import Any, Dict, List, Optional, Tuple, Union
+from classes.structs.Permissions import Permissions, is_override_node
+from classes.managers.PermissionsManager import OVERRIDES_KEY
 from shared.types import OverrideNode, PermissionOverrideTree, ExtendedClient
+from utils.AutoDefer import respond
+
+# Largest overrides file /permissions set accepts
+MAX_ATTACHMENT_BYTES = 1024 * 1024
+# libyaml's C implementations when available
+YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+YAML_DUMPER = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
 
 class PermissionsCommand(commands.Cog):
     def __init__(self, bot: ExtendedClient):
         self.bot = bot
 
-    async def try_parse_yaml(self, value: str) -> Any:
+    async def try_parse_yaml(self, value: Union[str, bytes]) -> Any:
+        # Parsing is CPU-bound; keep it off the event loop
         try:
-            return yaml.safe_load(value)
+            return await asyncio.to_thread(yaml.load, value, Loader=YAML_LOADER)
         except yaml.YAMLError:
             return None
 
+    async def download_attachment(self, attachment: discord.Attachment, limit: int = MAX_ATTACHMENT_BYTES) -> Optional[bytes]:
+        """
+        Downloads an attachment through the bot's shared HTTP session, giving up as soon as it
+        exceeds `limit` bytes.
+
+        Returns:
+            Optional[bytes]: The content, or None if the download failed or was too large.
+        """
+        if attachment.size > limit:
+            return None
+        async with self.bot.session.get(attachment.url) as resp:
+            if resp.status != 200 or (resp.content_length or 0) > limit:
+                return None
+            data = bytearray()
+            async for chunk in resp.content.iter_chunked(64 * 1024):
+                data.extend(chunk)
+                if len(data) > limit:
+                    return None
+        return bytes(data)
+
     @staticmethod
     def is_end_node(node: Union[OverrideNode, PermissionOverrideTree]) -> bool:
         return not isinstance(node, dict)
@@ -26,67 +56,126 @@ class PermissionsCommand(commands.Cog):
     # Criação de um grupo de comandos
     permissions_group = app_commands.Group(name="permissions", description="Grupo de permissões")
 
-    @permissions_group.command(name="set", description="Definir permissões a partir de um arquivo YAML")
+    @permissions_group.command(
+        name="set", description="Definir permissões a partir de um arquivo YAML",
+        extras={"auto_defer": True, "ephemeral": True}  # O download e o parse podem passar de 3s
+    )
+    @app_commands.describe(file="Arquivo YAML com os overrides")
     @app_commands.default_permissions(administrator=True)
-    async def permissions_set(self, interaction: discord.Interaction):
+    async def permissions_set(self, interaction: discord.Interaction, file: discord.Attachment):
         guild_id = interaction.guild.id if interaction.guild else None
         translate = await self.bot.translator.get_translator(guild_id=guild_id, module_name="Defaults")
 
-        attachment = interaction.data.get("attachments", [])[0] if interaction.data.get("attachments") else None
-        if not attachment or "text/plain" not in attachment.content_type:
-            await interaction.response.send_message(translate("permissions.invalid_attachment"), ephemeral=True)
+        content_type = file.content_type or ""
+        if not (content_type.startswith("text/") or "yaml" in content_type or file.filename.endswith((".yaml", ".yml"))):
+            await respond(interaction, translate("permissions.invalid_attachment"), ephemeral=True)
             return
 
-        async with aiohttp.ClientSession() as session:
-            async with session.get(attachment.url) as resp:
-                if resp.status != 200:
-                    await interaction.response.send_message(translate("permissions.invalid_attachment"), ephemeral=True)
-                    return
-                data = await resp.text()
+        try:
+            data = await self.download_attachment(file)
+        except aiohttp.ClientError as e:
+            self.bot.logger.error(f"Failed to download permissions attachment: {e}")
+            data = None
+        if data is None:
+            await respond(interaction, translate("permissions.invalid_attachment"), ephemeral=True)
+            return
 
         parsed_data = await self.try_parse_yaml(data)
-        if not parsed_data or not isinstance(parsed_data.get("overrides"), list):
-            await interaction.response.send_message(translate("permissions.invalid_permission_data"), ephemeral=True)
+        if not isinstance(parsed_data, dict) or not isinstance(parsed_data.get("overrides"), list):
+            await respond(interaction, translate("permissions.invalid_permission_data"), ephemeral=True)
             return
 
+        tree, logs = await asyncio.to_thread(self.build_tree, parsed_data["overrides"], translate)
+        if logs:
+            await respond(interaction, "\n".join(logs), ephemeral=True)
+            return
+
+        # Bumping the version recompiles the guild's overrides on the next check
+        await self.bot.db.update_one(
+            "guilds",
+            {"_id": str(interaction.guild_id)},
+            {"$set": {OVERRIDES_KEY: tree}, "$inc": {"version": 1}},
+            upsert=True
+        )
+        self.bot.guild_manager.record_write(interaction.guild_id)
+        self.bot.permission_manager.invalidate(interaction.guild_id, overrides=True)
+
+        await respond(interaction, translate("permissions.updated_successfully"), ephemeral=True)
+
+    def build_tree(self, overrides: List[Dict[str, Any]], translate) -> Tuple[PermissionOverrideTree, List[str]]:
+        """
+        Builds the override tree from the YAML's `overrides` list (ID -> nodes to allow/deny).
+
+        Returns:
+            Tuple[PermissionOverrideTree, List[str]]: The tree and the errors found.
+        """
         logs = []
         translated_overrides = Permissions(self.bot.logger, {})
+        nodes: Dict[str, OverrideNode] = {}  # Node path -> its override, so repeated paths are found directly
 
-        for override in parsed_data["overrides"]:
-            allow = override.get("permitir", [])
-            deny = override.get("negar", [])
+        for override in overrides:
+            if not isinstance(override, dict):
+                continue
+            allow = override.get("permitir") or []
+            deny = override.get("negar") or []
             if not allow and not deny:
                 logs.append(translate("permissions.invalid_base_permission").format(id=override.get("id")))
                 continue
 
-            for module in deny:
-                node = translated_overrides.get_end_node(module, strict=True)
-                if not node:
-                    translated_overrides.set(module, {"allow": [], "deny": [override["id"]]})
-                else:
-                    node["deny"].append(override["id"])
-                    translated_overrides.set(module, node)
-
-            for module in allow:
-                node = translated_overrides.get_end_node(module, strict=True)
-                if not node:
-                    translated_overrides.set(module, {"allow": [override["id"]], "deny": []})
-                else:
-                    node["allow"].append(override["id"])
-                    translated_overrides.set(module, node)
+            for side, modules in (("deny", deny), ("allow", allow)):
+                for module in modules:
+                    node = nodes.get(module)
+                    if node is None:
+                        node = nodes[module] = {"allow": [], "deny": []}
+                        translated_overrides.set(module, node)
+                    if override["id"] not in node[side]:
+                        node[side].append(override["id"])
 
-        if logs:
-            await interaction.response.send_message("\n".join(logs), ephemeral=True)
-            return
+        return translated_overrides.permissions, logs
 
-        guild = await self.bot.guild_manager.fetch_or_create(interaction.guild_id)
-        guild_data = guild.data
-        guild_data["permissionsOverrides"] = translated_overrides.permissions
-        await guild_data.save()
+    @staticmethod
+    def aggregate_overrides(permissions_tree: PermissionOverrideTree) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Inverts the override tree into one entry per ID with the nodes it allows and denies.
+        Entries are indexed by ID, so each node is placed in constant time.
+        """
+        index: Dict[str, Dict[str, Dict[str, None]]] = {}
+
+        def recurse_through_tree(permissions, path=""):
+            for branch, value in permissions.items():
+                full_path = f"{path}.{branch}" if path else branch
+                if is_override_node(value):
+                    for side, key in (("allow", "permitir"), ("deny", "negar")):
+                        for target in value.get(side, []):
+                            entry = index.setdefault(target, {"permitir": {}, "negar": {}})
+                            entry[key][full_path] = None  # Dict as an ordered set
+                elif isinstance(value, dict):
+                    recurse_through_tree(value, full_path)
 
-        await interaction.response.send_message(translate("permissions.updated_successfully"), ephemeral=True)
+        recurse_through_tree(permissions_tree)
+        return {
+            "overrides": [
+                {"id": target, "permitir": list(entry["permitir"]), "negar": list(entry["negar"])}
+                for target, entry in index.items()
+            ]
+        }
 
-    @permissions_group.command(name="list", description="Listar as permissões configuradas")
+    @staticmethod
+    def dump_overrides(permissions_tree: PermissionOverrideTree) -> io.BytesIO:
+        """
+        Aggregates the tree and streams its YAML straight into the attachment buffer.
+        """
+        buffer = io.BytesIO()
+        yaml.dump(
+            PermissionsCommand.aggregate_overrides(permissions_tree), buffer,
+            Dumper=YAML_DUMPER, allow_unicode=True, encoding="utf-8"
+        )
+        buffer.seek(0)
+        return buffer
+
+    @permissions_group.command(
+        name="list", description="Listar as permissões configuradas", extras={"auto_defer": True, "ephemeral": True}
+    )
     @app_commands.default_permissions(administrator=True)
     async def permissions_list(self, interaction: discord.Interaction):
 
@@ -95,36 +184,9 @@ class PermissionsCommand(commands.Cog):
         
         guild = await self.bot.guild_manager.fetch_or_create(interaction.guild_id)
         
-        permissions_tree = guild.data.get("permissionsOverrides", {})
-
-        translated_overrides = {"overrides": []}
-
-        def recurse_through_tree(permissions, path=""):
-            for branch, value in permissions.items():
-                full_path = f"{path}.{branch}" if path else branch
-                if self.is_end_node(value):
-                    for allow in value.get("allow", []):
-                        existing = next((o for o in translated_overrides["overrides"] if o["id"] == allow), None)
-                        if not existing:
-                            translated_overrides["overrides"].append({"id": allow, "permitir": [full_path], "negar": []})
-                        elif full_path not in existing["permitir"]:
-                            existing["permitir"].append(full_path)
-
-                    for deny in value.get("deny", []):
-                        existing = next((o for o in translated_overrides["overrides"] if o["id"] == deny), None)
-                        if not existing:
-                            translated_overrides["overrides"].append({"id": deny, "permitir": [], "negar": [full_path]})
-                        elif full_path not in existing["negar"]:
-                            existing["negar"].append(full_path)
-                else:
-                    recurse_through_tree(value, full_path)
-
-        recurse_through_tree(permissions_tree)
-
-        yaml_output = yaml.dump(translated_overrides, allow_unicode=True)
-        buffer = io.BytesIO(yaml_output.encode('utf-8'))
+        buffer = await asyncio.to_thread(self.dump_overrides, guild.compiled_overrides.tree)
         file = discord.File(fp=buffer, filename="overrides.yaml")
 
-        await interaction.response.send_message(translate("permissions.list_success"), file=file, ephemeral=True)
+        await respond(interaction, translate("permissions.list_success"), file=file, ephemeral=True)
 
 exports = [PermissionsCommand]
@@ -1,7 +1,9 @@
 import discord
 from discord import app_commands
 from discord.ext import commands
+from utils.AutoDefer import respond
 from utils.InteractionView import InteractionView
+from classes.structs.InteractionContext import InteractionContext
 from settings.Setting import Setting
 import logging
 from fuzzywuzzy import process
@@ -17,30 +19,34 @@ class SettingsCommand(commands.Cog):
         self.bot: ExtendedClient = bot
         self.logger = logging.getLogger("Settings")
 
-    @app_commands.command(name="settings", description="Shows all server settings")
+    @app_commands.command(
+        name="settings",
+        description="Shows all server settings",
+        extras={"auto_defer": True, "ephemeral": False},
+    )
     @app_commands.checks.has_permissions(administrator=True)
     @app_commands.describe(setting="Name of the setting to search")
     async def settings_command(
         self, interaction: discord.Interaction, setting: str
     ):
-        guild_id = interaction.guild.id if interaction.guild else None
-        translate = await self.bot.translator.get_translator(guild_id=guild_id,module_name="Defaults")
+        context = InteractionContext.of(interaction)
+        translate = await context.module_translator("Defaults")
 
         if not interaction.guild:
-            await interaction.response.send_message(
-                translate('settings.error.guild_only'), ephemeral=True
+            await respond(
+                interaction, translate('settings.error.guild_only'), ephemeral=True
             )
             return
 
-        guild = await self.bot.guild_manager.fetch_or_create(interaction.guild_id)
+        guild = await context.guild
 
         # self.logger.info(f"Guild: {guild}")
         # self.logger.info(f"Guild.settings {guild.settings}")
         
         guild_setting = guild.settings.get(setting)
         if not guild_setting:
-            await interaction.response.send_message(
-                translate("settings.error.not_found"), ephemeral=True
+            await respond(
+                interaction, translate("settings.error.not_found"), ephemeral=True
             )
             return
 
@@ -49,7 +55,7 @@ class SettingsCommand(commands.Cog):
             interaction=interaction,
             channel=interaction.channel,
             client=self.bot,
-            timeout=4 * 60 * 1000,
+            timeout=4 * 60,
             filter_func=lambda i: i.user.id == interaction.user.id,
         )
 
@@ -74,6 +80,8 @@ class SettingsCommand(commands.Cog):
         if guild_setting.id == "language":
             self.bot.logger.info(f"Atualizando Cache Guild: {guild_setting.value}")
             self.bot.translator.update_language_cache(interaction.guild_id, guild_setting.value)
+        elif guild_setting.id == "prefix":
+            self.bot.guild_manager.set_prefix(interaction.guild_id, guild_setting.value)
        
         await interaction.edit_original_response(
             content=translate("settings.success.updated")
@@ -3,6 +3,7 @@ from typing import Dict, Any, Callable
 from logging import Logger
 from discord.ext import commands
 from settings.DefaultTypes.select import SelectSetting
+from settings.DefaultTypes.string import StringSettingFile
 from settings.Setting import Setting
 
 def setup(bot: commands.Bot, logger: Logger):
@@ -24,5 +25,18 @@ def setup(bot: commands.Bot, logger: Logger):
             color="#ffffff",
             module_name="Defaults",
             locales=True
+    ), StringSettingFile(
+            name="settings.prefix.name",
+            description="settings.prefix.description",
+            id="prefix",
+            value="j!",
+            filter={
+                "fn": lambda value: 0 < len(value) <= 5 and not any(c.isspace() for c in value),
+                "error": "The prefix must have 1 to 5 characters and no spaces.",
+                "footer": "1-5 characters, no spaces",
+            },
+            color="#ffffff",
+            module_name="Defaults",
+            locales=True
     )]
     return {"settings": settings}
\ No newline at end of file
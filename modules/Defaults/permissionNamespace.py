@@ -15,11 +15,11 @@ def RolesNamespace(client: ExtendedClient, node: str, member: GuildMember, chann
     Returns:
         bool: True if the member has the specified role, False otherwise.
     """
-    broken = node.split(".")
-    role_id = broken.pop()
-    if not role_id:
+    role_id = node.rpartition(".")[2]
+    if not role_id.isdigit():
         return False
-    return any(role.id == int(role_id) for role in member.roles)
+    # @everyone is not in the member's role list, but every member has it
+    return int(role_id) == member.guild.id or member.get_role(int(role_id)) is not None
 
 def ChannelsNamespace(client: ExtendedClient, node: str, member: GuildMember, channel: Optional[TextChannel]) -> bool:
     """
@@ -34,9 +34,8 @@ def ChannelsNamespace(client: ExtendedClient, node: str, member: GuildMember, ch
     Returns:
         bool: True if the channel matches the specified channel_id, False otherwise.
     """
-    broken = node.split(".")
-    channel_id = broken.pop()
-    if not channel_id or not channel:
+    channel_id = node.rpartition(".")[2]
+    if not channel_id.isdigit() or not channel:
         return False
     return channel.id == int(channel_id)
 
@@ -53,8 +52,7 @@ def UsersNamespace(client: ExtendedClient, node: str, member: GuildMember, chann
     Returns:
         bool: True if the member's ID matches the specified user_id, False otherwise.
     """
-    broken = node.split(".")
-    user_id = broken.pop()
-    if not user_id:
+    user_id = node.rpartition(".")[2]
+    if not user_id.isdigit():
         return False
     return member.id == int(user_id)
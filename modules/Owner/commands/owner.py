@@ -18,7 +18,9 @@ class OwnerCommands(commands.Cog):
         print(f"Owner: {interaction.client.owner_ids}")
         return interaction.user.id in interaction.client.owner_ids
 
-    async def reload_module(self, module_name: str, sync: Optional[str] = None, guild_id: Optional[str] = None):
+    async def reload_module(
+        self, module_name: str, sync: Optional[str] = None, guild_id: Optional[str] = None, changed_only: bool = True
+    ):
         """
         Helper function to reload a module with optional sync and guild ID.
         """
@@ -27,7 +29,7 @@ class OwnerCommands(commands.Cog):
 
         module = self.bot.modules[module_name]
         try:
-            await module.reload(bot=self.bot, sync=sync, guild_id=guild_id)
+            await module.reload(bot=self.bot, sync=sync, guild_id=guild_id, changed_only=changed_only)
             return f"Module '{module_name}' reloaded successfully."
         except Exception as e:
             return f"Failed to reload module '{module_name}': {e}"
@@ -70,13 +72,12 @@ class OwnerCommands(commands.Cog):
         Helper function to sync commands globally or for a specific guild.
         """
         if sync == "global":
-            await self.bot.tree.sync()
-            return "Commands synced globally."
+            results = await self.bot.command_syncer.sync(["global"])
         elif sync == "guild" and guild_id:
-            guild = discord.Object(id=int(guild_id))
-            await self.bot.tree.sync(guild=guild)
-            return f"Commands synced to guild ID {guild_id}."
-        return "No synchronization performed."
+            results = await self.bot.command_syncer.sync([guild_id])
+        else:
+            return "No synchronization performed."
+        return ", ".join(f"{scope}: {status}" for scope, status in results.items())
 
     @app_commands.command(name="module_reload", description="Reload a module (owner only).")
     @app_commands.check(is_owner)
@@ -85,12 +86,13 @@ class OwnerCommands(commands.Cog):
         interaction: discord.Interaction,
         module_name: str,
         sync: Optional[str] = None,
-        guild_id: Optional[str] = None
+        guild_id: Optional[str] = None,
+        changed_only: bool = True
     ):
         """
-        Slash command to reload a module.
+        Slash command to reload a module. By default only files changed on disk are re-imported.
         """
-        result = await self.reload_module(module_name, sync=sync, guild_id=guild_id)
+        result = await self.reload_module(module_name, sync=sync, guild_id=guild_id, changed_only=changed_only)
         await interaction.response.send_message(result, ephemeral=True)
 
     @app_commands.command(name="module_unload", description="Unload a module (owner only).")
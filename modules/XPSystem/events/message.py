@@ -5,14 +5,9 @@ from ..manager.XPManager import XPManager
 async def handle_xp_message(message: Message):
     """
     Event that increments a user's XP whenever they send a message.
+    Bots and DMs are filtered out by the event bus (see `filters` below).
     """
-    if message.author.bot:
-        return  # Ignore messages from bots to prevent loops and spam
-
     guild = message.guild
-    if guild is None:
-        return  # Ignore DMs
-
     guild_id = str(guild.id)
     user_id = str(message.author.id)
     client = message.channel.guild._state._get_client()
@@ -35,6 +30,8 @@ async def handle_xp_message(message: Message):
 exports = [
     {
         "event": "on_message",
-        "func": handle_xp_message
+        "func": handle_xp_message,
+        "filters": {"guild_only": True, "ignore_bots": True},
+        "priority": "low"  # Dropped first when the bot is overloaded
     }
 ]
@@ -39,7 +39,7 @@ class XPManager:
             upsert=True
         )
 
-        self.logger.info(f"Updated global XP for user {user_id}: {total_xp} XP, Level {level}.")
+        self.logger.debug(f"Updated global XP for user {user_id}: {total_xp} XP, Level {level}.")
 
     async def update_local_xp(self, bot, guild_id: str, user_id: str, increment: int):
         """
@@ -69,7 +69,7 @@ class XPManager:
             upsert=True
         )
 
-        self.logger.info(f"Updated local XP for user {user_id} in guild {guild_id}: {xp} XP, Level {level}.")
+        self.logger.debug(f"Updated local XP for user {user_id} in guild {guild_id}: {xp} XP, Level {level}.")
 
     def calculate_level(self, total_xp: int) -> int:
         """
@@ -7,6 +7,7 @@ from discord import (
     TextChannel
 )
 from discord.ui import Select, Button
+from utils.AutoDefer import respond
 from utils.InteractionView import InteractionView
 from typing import Optional, List
 from settings.Setting import Setting
@@ -74,8 +75,8 @@ class ChannelSetting(Setting[GuildChannel]):
             if isinstance(channel, tuple(self.channel_types))
         ]
         if not channel_options:
-            await view.interaction.response.send_message(
-                translate("select_channel.no_channels"), ephemeral=True
+            await respond(
+                view.interaction, translate("select_channel.no_channels"), ephemeral=True
             )
             return None
 
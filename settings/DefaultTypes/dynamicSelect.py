@@ -8,6 +8,7 @@ from discord import (
     SelectMenu,
 )
 from typing import Callable, List, Optional, Dict, Any, Tuple
+from utils.AutoDefer import respond
 from utils.InteractionView import InteractionView
 from settings.Setting import Setting
 from classes.structs.Member import Member
@@ -59,7 +60,7 @@ class DynamicSelectSetting(Setting[List[str]]):
                 title=translate("dynamic_select.no_options"),
                 color=0xFF0000
             )
-            await view.interaction.response.send_message(embed=embed, ephemeral=True)
+            await respond(view.interaction, embed=embed, ephemeral=True)
             return []
 
         if self.style == "StringSelectMenu":
@@ -79,6 +79,16 @@ class Setting(ABC, Generic[T]):
     #     raise NotImplementedError("Must be implemented in derived classes.")
     #     pass
 
+    @staticmethod
+    async def _after_guild_write(client: ExtendedClient, guild_id: str, setting_id: str, value: Any, write: Awaitable[Any]) -> Any:
+        """
+        Awaits a guild settings write, then mirrors it in the guild manager's version stamp and
+        raw settings, which the warm cache snapshot is taken from.
+        """
+        result = await write
+        client.guild_manager.record_setting_write(guild_id, setting_id, value)
+        return result
+
     def save(self, client: ExtendedClient, entity: Union["Guild", "Member"], setting: "Setting[T]") -> Awaitable[bool]:
         """
         Default method to save the value of a setting. This method can be overridden in derived classes.
@@ -94,11 +104,13 @@ class Setting(ABC, Generic[T]):
         query = {f"settings.{setting.id}": value}
 
         if isinstance(entity, Guild):
-            return client.db.update_one(
+            # Every guild write bumps the document version used to revalidate cached copies
+            write = client.db.update_one(
                 "guilds",
                 {"_id": str(entity.id)},
-                {"$set": query},
+                {"$set": query, "$inc": {"version": 1}},
             )
+            return self._after_guild_write(client, str(entity.id), setting.id, value, write)
         elif isinstance(entity, Member):
             return client.db.update_one(
                 "members",
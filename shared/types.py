@@ -29,6 +29,8 @@ if TYPE_CHECKING:
     from utils.EmojiManager import EmojiManager
     from utils.InteractionView import InteractionView
     from utils.MessageView import MessageView
+    from utils.ComponentRouter import ComponentRouter
+    from utils.TimerWheel import TimerWheel
     from db.db import MongoDBAsyncORM
 
 # Estrutura básica de nó de override de permissões
@@ -56,6 +58,33 @@ PermissionNode = Callable[
 Schema = Dict[str, Union[str, int, float, bool, list, dict]] 
     
 
+class IndexDeclaration(TypedDict, total=False):
+    collection: str
+    keys: List[List[Union[str, int]]]  # [["field", 1], ...]
+    unique: bool
+    ttl: Optional[int]  # expireAfterSeconds
+    partial: Optional[Dict[str, Any]]  # partialFilterExpression
+    name: Optional[str]
+
+
+class LazyCommandOption(TypedDict, total=False):
+    name: str
+    type: str  # string, integer, number, boolean, user, member, role, channel, text_channel, attachment, mentionable
+    description: str
+    required: bool
+    autocomplete: bool
+    choices: List[Dict[str, Any]]  # [{"name": ..., "value": ...}]
+
+
+class LazyCommandDeclaration(TypedDict, total=False):
+    file: str  # Relative to the commands folder
+    name: str
+    description: str
+    options: List[LazyCommandOption]
+    guild_only: bool
+    nsfw: bool
+
+
 class RawManifest(TypedDict):
     name: str
     description: str
@@ -68,6 +97,9 @@ class RawManifest(TypedDict):
     translationsFolder: Optional[str]
     emojisFolder: Optional[str]    
     disabled: Optional[bool]
+    indexes: Optional[List[IndexDeclaration]]
+    dependencies: Optional[List[str]]
+    lazyCommands: Optional[List[LazyCommandDeclaration]]
 
 class Manifest(RawManifest):
     data: RawManifest
@@ -93,6 +125,8 @@ class ExtendedClient(Bot):
         self.ready = False
         self.detailed_help = {}
         self.view_registry: Dict[str, InteractionView] = {}
+        self.component_router: "ComponentRouter" = None
+        self.timer_wheel: "TimerWheel" = None
         self.setting_cache = {}
         
         # Logger
@@ -130,6 +164,10 @@ class ExtendedClient(Bot):
     def add_middleware(self, func: Callable[[Dict], Awaitable[bool]]) -> None:
         """
         Adds a middleware function to be called on every command.
+
+        Middleware is called with `client`, `interaction`, `context` (an InteractionContext whose
+        `guild`, `member`, `settings`, `language` and `translator` are awaited lazily), `module`
+        and `command`, and returns False to stop the command.
         """
         self.command_middleware.append(func)
 
@@ -0,0 +1,147 @@
+import asyncio
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from logging import Logger
+from typing import Any, AsyncIterator, Deque, Dict, Optional
+
+from discord import Interaction, utils
+from utils.Metrics import REGISTRY
+
+FIRST_RESPONSE = REGISTRY.histogram(
+    "interaction_first_response_seconds",
+    "Time from interaction creation to its first response.",
+    ["command", "deferred"],
+    buckets=(0.1, 0.25, 0.5, 1.0, 1.5, 2.0, 2.5, 3.0, 5.0, 10.0),
+)
+
+
+RESPONSE_LOCK_KEY = "auto_defer_lock"
+FIRST_RESPONSE_KEY = "auto_defer_first_response"
+
+
+def response_lock(interaction: Interaction) -> asyncio.Lock:
+    """
+    Returns the lock that serializes the automatic defer with the command's own first response.
+    Code answering an interaction outside of `respond` must hold it while checking `is_done()`.
+    """
+    lock = interaction.extras.get(RESPONSE_LOCK_KEY)
+    if lock is None:
+        lock = interaction.extras[RESPONSE_LOCK_KEY] = asyncio.Lock()
+    return lock
+
+
+def observe_first_response(interaction: Interaction, command: str, deferred: bool):
+    """
+    Records the interaction's time to first response; only its first call per interaction counts.
+    """
+    if not interaction.extras.get(FIRST_RESPONSE_KEY):
+        interaction.extras[FIRST_RESPONSE_KEY] = True
+        elapsed = (utils.utcnow() - interaction.created_at).total_seconds()
+        FIRST_RESPONSE.labels(command, "yes" if deferred else "no").observe(elapsed)
+
+
+async def respond(interaction: Interaction, *args, **kwargs):
+    """
+    Sends a command's reply: the initial response, or a followup if the interaction was already
+    answered or deferred (e.g. automatically). Commands that opt into auto-defer reply through this.
+
+    Args:
+        interaction (Interaction): The interaction to answer.
+        *args, **kwargs: Arguments of `InteractionResponse.send_message`.
+    """
+    async with response_lock(interaction):
+        if interaction.response.is_done():
+            kwargs.pop("delete_after", None)  # Not supported by followups
+            return await interaction.followup.send(*args, **kwargs)
+        result = await interaction.response.send_message(*args, **kwargs)
+        command = interaction.command.qualified_name if interaction.command else "unknown"
+        observe_first_response(interaction, command, False)
+        return result
+
+
+class AutoDefer:
+    """
+    Defers slow interactions before Discord's 3-second deadline.
+
+    Opt-in per command with `extras={"auto_defer": True}`; such commands must reply through
+    `respond`, `InteractionView.update` or followups, since a deferred interaction can no longer use `response.send_message`.
+    The deferred response is ephemeral unless the command sets `extras={"ephemeral": False}`, so
+    a command's private replies never become visible to the channel.
+
+    Keeps a rolling window of handler durations per command. A command whose recent p90 is
+    above the threshold is deferred before it runs; any other command is deferred once the
+    interaction's age reaches the threshold without a response.
+    """
+
+    def __init__(self, logger: Logger, threshold: float = 2.0, window: int = 50, min_samples: int = 5):
+        """
+        Args:
+            logger (Logger): Logger for defer failures.
+            threshold (float): Seconds after interaction creation at which to defer.
+            window (int): Number of recent durations kept per command.
+            min_samples (int): Durations needed before predictions are trusted.
+        """
+        self.logger = logger
+        self.threshold = threshold
+        self.window = window
+        self.min_samples = min_samples
+        self.durations: Dict[str, Deque[float]] = {}
+
+    def record(self, command: str, duration: float):
+        samples = self.durations.get(command)
+        if samples is None:
+            samples = self.durations[command] = deque(maxlen=self.window)
+        samples.append(duration)
+
+    def predict(self, command: str) -> Optional[float]:
+        """
+        Returns the recent p90 duration of a command, or None without enough samples.
+        """
+        samples = self.durations.get(command)
+        if not samples or len(samples) < self.min_samples:
+            return None
+        ordered = sorted(samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * 0.9))]
+
+    @asynccontextmanager
+    async def guard(self, interaction: Interaction, command: Any) -> AsyncIterator[None]:
+        """
+        Runs the enclosed command with automatic deferral, if the command opted in.
+        """
+        extras = getattr(command, "extras", {}) or {}
+        if not extras.get("auto_defer", False):
+            yield
+            return
+
+        name = command.qualified_name
+        ephemeral = extras.get("ephemeral", True)
+        age = (utils.utcnow() - interaction.created_at).total_seconds()
+        predicted = self.predict(name)
+        timer: Optional[asyncio.Task] = None
+        if predicted is not None and age + predicted >= self.threshold:
+            await self._defer(interaction, name, ephemeral)
+        else:
+            timer = asyncio.create_task(self._defer_after(interaction, name, ephemeral, self.threshold - age))
+
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            if timer is not None:
+                timer.cancel()
+            self.record(name, time.perf_counter() - start)
+
+    async def _defer_after(self, interaction: Interaction, name: str, ephemeral: bool, delay: float):
+        await asyncio.sleep(max(0.0, delay))
+        await self._defer(interaction, name, ephemeral)
+
+    async def _defer(self, interaction: Interaction, name: str, ephemeral: bool):
+        try:
+            async with response_lock(interaction):
+                if interaction.response.is_done():
+                    return
+                await interaction.response.defer(thinking=True, ephemeral=ephemeral)
+                observe_first_response(interaction, name, True)
+        except Exception as e:
+            self.logger.warning(f"Failed to auto-defer '{name}': {e}")
@@ -0,0 +1,132 @@
+from typing import Any, Optional
+
+from discord import Interaction, InteractionResponseType, InteractionType, app_commands
+
+from classes.structs.InteractionContext import InteractionContext
+from utils.AutoDefer import observe_first_response
+from utils.FairScheduler import Priority, SchedulerOverloaded
+
+DEFERRED_RESPONSES = (InteractionResponseType.deferred_channel_message, InteractionResponseType.deferred_message_update)
+
+
+class DispatchingCommandTree(app_commands.CommandTree):
+    """
+    Command tree that runs every application command through the bot's dispatch pipeline.
+
+    discord.py invokes slash commands, context menus and autocompletes from `CommandTree._call`,
+    so this is the single place where they can be scheduled and measured: commands take a
+    high-priority slot of the fair scheduler (with an optional per-command `max_concurrency` from
+    the command's extras), are recorded by the command recorder and, if they opted in, are
+    auto-deferred; autocompletes take a normal slot.
+
+    Before the command runs, the bot's command middleware is called with the interaction's
+    `InteractionContext`, the same one the command gets from `InteractionContext.of`, so guild,
+    member and settings fetched by a middleware are not fetched again by the command.
+    """
+
+    def module_of(self, command: Any) -> Optional[Any]:
+        """
+        Returns the loaded module that registered a command (or its top-level group).
+        """
+        root = getattr(command, "root_parent", None) or command
+        for module in self.client.modules.values():
+            if module.commands["slash"].get(root.name) is root:
+                return module
+        return None
+
+    async def _call(self, interaction: Interaction):
+        client = self.client
+        if interaction.type is InteractionType.autocomplete:
+            try:
+                async with client.scheduler.slot(interaction.guild_id, Priority.NORMAL):
+                    await super()._call(interaction)
+            except SchedulerOverloaded:
+                pass  # Discord shows no suggestions; nothing else to answer
+            return
+
+        command = interaction.command
+        if command is None:
+            await super()._call(interaction)  # Lets discord.py report the unknown command
+            return
+
+        extras = getattr(command, "extras", {}) or {}
+        try:
+            async with client.scheduler.slot(
+                interaction.guild_id,
+                Priority.HIGH,
+                limit_key=f"command:{command.qualified_name}",
+                limit=extras.get("max_concurrency"),
+            ):
+                await self._run(interaction, command)
+        except SchedulerOverloaded:
+            await interaction.response.send_message(
+                content="The bot is busy right now, please try again in a moment.", ephemeral=True
+            )
+
+    async def _run(self, interaction: Interaction, command: Any):
+        client = self.client
+        module = self.module_of(command)
+        module_name = module.name if module else None
+        context = InteractionContext.of(interaction, module_name)
+        with client.command_recorder.track(command.qualified_name, module_name, interaction) as record:
+            try:
+                # Commands that opt in are deferred before they miss the 3-second deadline
+                async with client.auto_defer.guard(interaction, command):
+                    if not await self._run_middleware(interaction, context, module, command):
+                        record.status = "rejected"
+                        return
+                    await super()._call(interaction)
+            finally:
+                self._observe_response(interaction, command)
+            if interaction.command_failed:
+                record.status = "error"
+
+        client.logger.info(
+            f"Command executed: {command.qualified_name}",
+            extra={
+                "command": {"name": command.qualified_name, "module": module_name, "status": record.status},
+                "guild": {"id": interaction.guild_id},
+                "user": {"name": interaction.user.name, "id": interaction.user.id},
+                "timings": {
+                    "queue_wait_ms": round(record.queue_wait_ms, 2),
+                    "handler_ms": round(record.handler_ms, 2),
+                    "db_ms": round(record.db_ms, 2),
+                    "rest_ms": round(record.rest_ms, 2),
+                },
+            },
+        )
+
+    @staticmethod
+    def _observe_response(interaction: Interaction, command: Any):
+        """
+        Records the time to first response of every command. Replies made through `respond`,
+        `InteractionView.update` or the auto-defer were already recorded when they were sent; for
+        the others only the handler's end is known, which bounds their first response from above.
+        """
+        response_type = interaction.response.type
+        if response_type is not None:
+            observe_first_response(interaction, command.qualified_name, response_type in DEFERRED_RESPONSES)
+
+    async def _run_middleware(self, interaction: Interaction, context: InteractionContext, module: Any, command: Any) -> bool:
+        """
+        Runs the middleware chain; returns False as soon as one rejects the interaction.
+        """
+        for middleware_fn in self.client.command_middleware:
+            try:
+                result = await middleware_fn(
+                    client=self.client,
+                    interaction=interaction,
+                    context=context,
+                    module=module,
+                    command=command,
+                )
+            except Exception as e:
+                self.client.logger.error(f"Command middleware failed for {command.qualified_name}: {e}")
+                if not interaction.response.is_done():
+                    await interaction.response.send_message(
+                        content="There was an error while executing this command!", ephemeral=True
+                    )
+                return False
+            if not result:
+                return False
+        return True
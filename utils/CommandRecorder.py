@@ -0,0 +1,194 @@
+import asyncio
+import json
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Set
+from logging import Logger
+
+from discord import Interaction, utils
+from discord.webhook.async_ import async_context
+from utils.Metrics import REGISTRY
+
+COMMAND_LATENCY = REGISTRY.histogram("command_duration_seconds", "Command handler latency.", ["command", "status"])
+
+# Record of the command running in the current task, if any
+current_record: ContextVar[Optional["CommandRecord"]] = ContextVar("current_command_record", default=None)
+
+
+class CommandRecord:
+    """
+    Timing breakdown of a single command execution.
+    """
+
+    __slots__ = (
+        "command", "module", "guild_id", "user_id", "started_at", "queue_wait_ms",
+        "handler_ms", "db_ms", "db_calls", "rest_ms", "rest_calls", "status", "error",
+    )
+
+    def __init__(self, command: str, module: Optional[str], guild_id: Optional[int], user_id: Optional[int]):
+        self.command = command
+        self.module = module
+        self.guild_id = guild_id
+        self.user_id = user_id
+        self.started_at = time.time()
+        self.queue_wait_ms = 0.0
+        self.handler_ms = 0.0
+        self.db_ms = 0.0
+        self.db_calls = 0
+        self.rest_ms = 0.0
+        self.rest_calls = 0
+        self.status = "ok"
+        self.error: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {slot: getattr(self, slot) for slot in self.__slots__}
+
+
+def record_db_time(elapsed: float):
+    """
+    Adds `elapsed` seconds of database time to the running command, if any.
+    """
+    record = current_record.get()
+    if record is not None:
+        record.db_ms += elapsed * 1000
+        record.db_calls += 1
+
+
+def record_rest_time(elapsed: float):
+    """
+    Adds `elapsed` seconds of Discord REST time to the running command, if any.
+    """
+    record = current_record.get()
+    if record is not None:
+        record.rest_ms += elapsed * 1000
+        record.rest_calls += 1
+
+
+def _timed_request(request):
+    async def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return await request(*args, **kwargs)
+        finally:
+            record_rest_time(time.perf_counter() - start)
+
+    wrapper.__wrapped__ = request
+    return wrapper
+
+
+def instrument_http(http: Any):
+    """
+    Times REST calls made through the bot's HTTP client and the interaction webhook adapter,
+    which is what `interaction.response` and `interaction.followup` use.
+    """
+    for target in (http, async_context.get()):
+        if not hasattr(target.request, "__wrapped__"):
+            target.request = _timed_request(target.request)
+
+
+class CommandRecorder:
+    """
+    Collects command execution records and appends them in batches to an NDJSON file.
+    """
+
+    def __init__(
+        self,
+        logger: Logger,
+        path: str = "logs/commands.ndjson",
+        batch_size: int = 100,
+        flush_interval: float = 5.0,
+    ):
+        self.logger = logger
+        self.path = Path(path)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._buffer: List[Dict[str, Any]] = []
+        self._flush_task: Optional[asyncio.Task] = None
+        self._pending_flushes: Set[asyncio.Task] = set()  # Strong references until each batch is written
+        self._write_lock = asyncio.Lock()
+
+    def start(self):
+        """
+        Starts the periodic flush task.
+        """
+        if self._flush_task is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._flush_task = asyncio.create_task(self._flush_loop())
+
+    @contextmanager
+    def track(self, command: str, module: Optional[str], interaction: Interaction) -> Iterator[CommandRecord]:
+        """
+        Tracks a command execution. DB and REST time spent inside the block is attributed to it.
+
+        Args:
+            command (str): Name of the command.
+            module (Optional[str]): Name of the module that owns the command.
+            interaction (Interaction): The interaction that triggered the command.
+        """
+        record = CommandRecord(
+            command,
+            module,
+            interaction.guild_id,
+            interaction.user.id if interaction.user else None,
+        )
+        record.queue_wait_ms = max(0.0, (utils.utcnow() - interaction.created_at).total_seconds() * 1000)
+        token = current_record.set(record)
+        start = time.perf_counter()
+        try:
+            yield record
+        except Exception as e:
+            record.status = "error"
+            record.error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            record.handler_ms = elapsed * 1000
+            current_record.reset(token)
+            COMMAND_LATENCY.labels(command, record.status).observe(elapsed)
+            self.add(record)
+
+    def add(self, record: CommandRecord):
+        """
+        Queues a finished record for the next batch write.
+        """
+        self._buffer.append(record.to_dict())
+        if len(self._buffer) >= self.batch_size:
+            task = asyncio.create_task(self.flush())
+            self._pending_flushes.add(task)
+            task.add_done_callback(self._pending_flushes.discard)
+
+    async def flush(self):
+        """
+        Writes all buffered records to disk from a worker thread.
+        """
+        if not self._buffer:
+            return
+        batch, self._buffer = self._buffer, []
+        lines = "".join(json.dumps(entry, default=str) + "\n" for entry in batch)
+        async with self._write_lock:
+            try:
+                await asyncio.to_thread(self._write, lines)
+            except OSError as e:
+                self.logger.error(f"Failed to write {len(batch)} command records: {e}")
+
+    def _write(self, lines: str):
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(lines)
+
+    async def _flush_loop(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+
+    async def close(self):
+        """
+        Stops the flush task and writes any remaining records, waiting for batches still being written.
+        """
+        if self._flush_task:
+            self._flush_task.cancel()
+            self._flush_task = None
+        await self.flush()
+        if self._pending_flushes:
+            await asyncio.gather(*self._pending_flushes, return_exceptions=True)
@@ -0,0 +1,169 @@
+import asyncio
+import hashlib
+import json
+import os
+import time
+from logging import Logger
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Union
+
+import discord
+from discord import app_commands
+
+Scope = Union[str, int]  # "global" or a guild ID
+
+
+class CommandSyncer:
+    """
+    Syncs the slash command tree only for scopes whose payload changed.
+
+    Each scope (global, or one guild) is serialized and hashed; the hash of the last successful
+    sync is kept in a local state file per application, so restarts and module reloads that leave
+    a scope untouched do not re-upload it.
+    """
+
+    def __init__(
+        self,
+        bot: discord.Client,
+        tree: app_commands.CommandTree,
+        logger: Logger,
+        state_path: str = "data/command_sync.json",
+        min_interval: float = 1.0,
+        debounce: float = 2.0,
+    ):
+        """
+        Args:
+            bot (discord.Client): The bot, used for its application ID.
+            tree (app_commands.CommandTree): The command tree to sync.
+            logger (Logger): Logger for sync reports.
+            state_path (str): File storing the last synced hash per scope.
+            min_interval (float): Minimum seconds between two sync calls.
+            debounce (float): Seconds `request_sync` waits to coalesce changes.
+        """
+        self.bot = bot
+        self.tree = tree
+        self.logger = logger
+        self.state_path = Path(state_path)
+        self.min_interval = min_interval
+        self.debounce = debounce
+        self._state: Optional[Dict[str, Dict[str, Any]]] = None
+        self._lock = asyncio.Lock()
+        self._last_call = 0.0
+        self._pending: set = set()
+        self._debounce_task: Optional[asyncio.Task] = None
+
+    @staticmethod
+    def _scope_key(scope: Scope) -> str:
+        return "global" if scope in (None, "global") else str(int(scope))
+
+    def serialize(self, scope: Scope) -> List[Dict[str, Any]]:
+        """
+        Returns the payload that `tree.sync` would upload for a scope, in a stable order.
+        """
+        key = self._scope_key(scope)
+        guild = None if key == "global" else discord.Object(id=int(key))
+        payload = [command.to_dict(self.tree) for command in self.tree.get_commands(guild=guild)]
+        return sorted(payload, key=lambda command: (command.get("type", 1), command["name"]))
+
+    def compute_hash(self, scope: Scope) -> str:
+        encoded = json.dumps(self.serialize(scope), sort_keys=True, separators=(",", ":"), default=str)
+        return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+    async def _load_state(self) -> Dict[str, Dict[str, Any]]:
+        if self._state is None:
+            self._state = await asyncio.to_thread(self._read_state)
+        return self._state
+
+    def _read_state(self) -> Dict[str, Dict[str, Any]]:
+        try:
+            with open(self.state_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, json.JSONDecodeError) as e:
+            self.logger.warning(f"Ignoring unreadable command sync state '{self.state_path}': {e}")
+            return {}
+
+    def _write_state(self, state: Dict[str, Dict[str, Any]]):
+        self.state_path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = self.state_path.with_suffix(".tmp")
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(state, f, indent=2)
+        os.replace(temp_path, self.state_path)
+
+    async def sync(self, scopes: Iterable[Scope] = ("global",), force: bool = False) -> Dict[str, str]:
+        """
+        Syncs every scope whose payload hash differs from the last synced one.
+
+        Args:
+            scopes (Iterable[Scope]): "global" and/or guild IDs.
+            force (bool): Sync even if the hash is unchanged.
+
+        Returns:
+            Dict[str, str]: Scope -> 'synced', 'unchanged' or 'failed'.
+        """
+        results: Dict[str, str] = {}
+        async with self._lock:
+            state = await self._load_state()
+            app_state = state.setdefault(str(self.bot.application_id), {})
+
+            for scope in scopes:
+                key = self._scope_key(scope)
+                digest = self.compute_hash(key)
+                if not force and app_state.get(key, {}).get("hash") == digest:
+                    results[key] = "unchanged"
+                    continue
+
+                if await self._sync_scope(key):
+                    app_state[key] = {"hash": digest, "synced_at": int(time.time())}
+                    results[key] = "synced"
+                else:
+                    results[key] = "failed"
+
+            if "synced" in results.values():
+                try:
+                    await asyncio.to_thread(self._write_state, state)
+                except OSError as e:
+                    self.logger.error(f"Failed to save command sync state: {e}")
+
+        self.logger.info(f"Slash command sync: {', '.join(f'{k}={v}' for k, v in results.items()) or 'nothing to do'}")
+        return results
+
+    async def _sync_scope(self, key: str, attempts: int = 3) -> bool:
+        guild = None if key == "global" else discord.Object(id=int(key))
+        for attempt in range(1, attempts + 1):
+            # Space out sync calls; the endpoint has a tight per-application limit
+            wait = self.min_interval - (time.monotonic() - self._last_call)
+            if wait > 0:
+                await asyncio.sleep(wait)
+            self._last_call = time.monotonic()
+            try:
+                await self.tree.sync(guild=guild)
+                return True
+            except discord.RateLimited as e:
+                self.logger.warning(f"Rate limited syncing '{key}', retrying in {e.retry_after:.1f}s.")
+                await asyncio.sleep(e.retry_after)
+            except discord.HTTPException as e:
+                if e.status == 429 and attempt < attempts:
+                    retry_after = float(e.response.headers.get("Retry-After", 5))
+                    self.logger.warning(f"Rate limited syncing '{key}', retrying in {retry_after:.1f}s.")
+                    await asyncio.sleep(retry_after)
+                    continue
+                self.logger.error(f"Failed to sync slash commands for '{key}': {e}")
+                return False
+        self.logger.error(f"Gave up syncing slash commands for '{key}' after {attempts} attempts.")
+        return False
+
+    def request_sync(self, *scopes: Scope):
+        """
+        Schedules a sync of the given scopes, coalescing requests made within the debounce window
+        (e.g. several modules reloaded in a row) into one sync per scope.
+        """
+        self._pending.update(self._scope_key(scope) for scope in (scopes or ("global",)))
+        if self._debounce_task is None or self._debounce_task.done():
+            self._debounce_task = asyncio.create_task(self._debounced_sync())
+
+    async def _debounced_sync(self):
+        await asyncio.sleep(self.debounce)
+        scopes, self._pending = self._pending, set()
+        await self.sync(scopes)
@@ -0,0 +1,104 @@
+from logging import Logger
+from typing import Any, Dict, Iterable, Optional, Set
+
+from discord import Interaction, InteractionType, RawBulkMessageDeleteEvent, RawMessageDeleteEvent
+from discord.ext.commands import Bot
+
+
+class ComponentRouter:
+    """
+    Routes gateway events to live views through one listener per event.
+
+    Views are indexed by their `view_id` (the suffix appended to their components' custom_id)
+    and by the message they are attached to, so a message delete or a component interaction
+    reaches its view with a dict lookup instead of being fanned out to every view. A view is
+    unregistered when it is destroyed, and every view of a deleted message is dropped with it.
+
+    Views must expose `view_id`, `msg_id` and `destroy(reason)`; views that handle their own
+    component callbacks (discord.ui.View) may omit `handle_component(event_id, interaction)`.
+    """
+
+    def __init__(self, client: Bot, logger: Logger):
+        self.client = client
+        self.logger = logger
+        self.views: Dict[str, Any] = {}  # view_id -> view
+        self.messages: Dict[int, Set[str]] = {}  # message ID -> view_ids
+
+        # Raw events also fire for messages that are no longer (or never were) in the message cache
+        client.add_listener(self._on_raw_message_delete, "on_raw_message_delete")
+        client.add_listener(self._on_raw_bulk_message_delete, "on_raw_bulk_message_delete")
+        client.add_listener(self._on_interaction, "on_interaction")
+
+    def register(self, view: Any):
+        """
+        Starts routing events to a view, indexed by its message if it already has one.
+        """
+        self.views[view.view_id] = view
+        if view.msg_id is not None:
+            self.messages.setdefault(int(view.msg_id), set()).add(view.view_id)
+
+    def bind_message(self, view: Any, msg_id: Optional[int]):
+        """
+        Moves a view to another message, e.g. once its first response has been sent.
+        """
+        self._unbind(view)
+        view.msg_id = msg_id
+        if view.view_id in self.views and msg_id is not None:
+            self.messages.setdefault(int(msg_id), set()).add(view.view_id)
+
+    def unregister(self, view: Any):
+        """
+        Stops routing events to a view. Safe to call more than once.
+        """
+        if self.views.get(view.view_id) is view:
+            del self.views[view.view_id]
+        self._unbind(view)
+
+    def _unbind(self, view: Any):
+        if view.msg_id is None:
+            return
+        view_ids = self.messages.get(int(view.msg_id))
+        if view_ids is not None:
+            view_ids.discard(view.view_id)
+            if not view_ids:
+                del self.messages[int(view.msg_id)]
+
+    @staticmethod
+    def split_custom_id(custom_id: str) -> tuple:
+        """
+        Splits "<event>-<view_id>" into its event and view ID (view IDs are UUIDs, which contain dashes).
+        """
+        event_id, _, view_id = custom_id.partition("-")
+        return event_id, view_id
+
+    def _destroy_all(self, message_ids: Iterable[int]):
+        for message_id in message_ids:
+            for view_id in self.messages.pop(message_id, ()):
+                view = self.views.pop(view_id, None)
+                if view is None:
+                    continue
+                self.logger.debug(f"Message {message_id} was deleted, destroying view {view_id}.")
+                try:
+                    view.destroy("deleted")
+                except Exception as e:
+                    self.logger.error(f"Failed to destroy view {view_id}: {e}")
+
+    async def _on_raw_message_delete(self, payload: RawMessageDeleteEvent):
+        if payload.message_id in self.messages:
+            self._destroy_all((payload.message_id,))
+
+    async def _on_raw_bulk_message_delete(self, payload: RawBulkMessageDeleteEvent):
+        self._destroy_all([message_id for message_id in payload.message_ids if message_id in self.messages])
+
+    async def _on_interaction(self, interaction: Interaction):
+        if interaction.type != InteractionType.component or not interaction.data:
+            return
+        event_id, view_id = self.split_custom_id(interaction.data.get("custom_id", ""))
+        view = self.views.get(view_id)
+        handle_component = getattr(view, "handle_component", None)
+        if handle_component is None:
+            return
+        try:
+            await handle_component(event_id, interaction)
+        except Exception as e:
+            self.logger.error(f"Failed to route component '{event_id}' to view {view_id}: {e}")
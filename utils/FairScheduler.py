@@ -0,0 +1,245 @@
+import asyncio
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from enum import IntEnum
+from logging import Logger
+from typing import AsyncIterator, Deque, Dict, Hashable, Optional
+
+from utils.Metrics import REGISTRY
+
+QUEUE_DEPTH = REGISTRY.gauge("scheduler_queue_depth", "Work items waiting for a slot.", ["scheduler", "priority"])
+ACTIVE = REGISTRY.gauge("scheduler_active", "Work items currently running.", ["scheduler"])
+QUEUED_GUILDS = REGISTRY.gauge("scheduler_queued_guilds", "Guilds with work waiting for a slot.", ["scheduler"])
+WAIT_TIME = REGISTRY.histogram("scheduler_wait_seconds", "Time spent waiting for a slot.", ["scheduler", "priority"])
+SHED = REGISTRY.counter("scheduler_shed_total", "Work items rejected under overload.", ["scheduler", "priority", "reason"])
+
+
+class Priority(IntEnum):
+    """
+    Scheduling priority. Lower values are served first.
+    """
+
+    HIGH = 0  # Interactions, which must be answered within seconds
+    NORMAL = 1  # Regular event listeners
+    LOW = 2  # Work that can be dropped under load (XP, analytics)
+
+    @classmethod
+    def parse(cls, value) -> "Priority":
+        if isinstance(value, cls):
+            return value
+        return cls[str(value).upper()]
+
+
+class SchedulerOverloaded(Exception):
+    """
+    Raised when work is shed instead of queued.
+    """
+
+    def __init__(self, reason: str):
+        super().__init__(f"Work shed: {reason}")
+        self.reason = reason
+
+
+class FairScheduler:
+    """
+    Global concurrency cap with per-guild fair queues.
+
+    Waiting work is grouped per guild and served round-robin within each priority, so a guild
+    flooding events only ever competes with its own backlog. Each guild can hold at most
+    `per_guild_concurrency` slots; low-priority work is shed instead of queued while every
+    global slot is busy.
+    """
+
+    def __init__(
+        self,
+        logger: Logger,
+        name: str = "default",
+        max_concurrency: int = 64,
+        per_guild_concurrency: int = 8,
+        max_guild_queue: int = 200,
+    ):
+        """
+        Args:
+            logger (Logger): Logger for overload reports.
+            name (str): Name used in metric labels.
+            max_concurrency (int): Slots shared by all guilds.
+            per_guild_concurrency (int): Slots a single guild may hold at once.
+            max_guild_queue (int): Waiting items per guild before new work from it is shed.
+        """
+        self.logger = logger
+        self.name = name
+        self.max_concurrency = max_concurrency
+        self.per_guild_concurrency = per_guild_concurrency
+        self.max_guild_queue = max_guild_queue
+
+        self._active = 0
+        self._active_by_guild: Dict[Hashable, int] = {}
+        self._queued_by_guild: Dict[Hashable, int] = {}
+        self._queues: Dict[Priority, "OrderedDict[Hashable, Deque[asyncio.Future]]"] = {
+            priority: OrderedDict() for priority in Priority
+        }
+        self._queued = {priority: 0 for priority in Priority}
+        self._limiters: Dict[str, asyncio.Semaphore] = {}
+
+        for priority in Priority:
+            QUEUE_DEPTH.labels(name, priority.name.lower()).set_function(lambda p=priority: self._queued[p])
+        ACTIVE.labels(name).set_function(lambda: self._active)
+        QUEUED_GUILDS.labels(name).set_function(lambda: len(self._queued_by_guild))
+
+    @property
+    def saturated(self) -> bool:
+        return self._active >= self.max_concurrency
+
+    def _shed(self, priority: Priority, reason: str):
+        SHED.labels(self.name, priority.name.lower(), reason).inc()
+        self.logger.debug(f"Shed {priority.name.lower()} work on scheduler '{self.name}': {reason}")
+        raise SchedulerOverloaded(reason)
+
+    def _can_start(self, key: Hashable) -> bool:
+        return not self.saturated and self._active_by_guild.get(key, 0) < self.per_guild_concurrency
+
+    def _start(self, key: Hashable):
+        self._active += 1
+        self._active_by_guild[key] = self._active_by_guild.get(key, 0) + 1
+
+    async def acquire(self, guild_id: Optional[int], priority: Priority = Priority.NORMAL) -> Hashable:
+        """
+        Waits for a slot for the given guild.
+
+        Args:
+            guild_id (Optional[int]): Guild the work belongs to. DMs share one queue.
+            priority (Priority): Priority of the work.
+
+        Returns:
+            Hashable: Key to pass to `release`.
+
+        Raises:
+            SchedulerOverloaded: If the work was shed instead of queued.
+        """
+        key = guild_id or 0
+        # Nothing of this guild is waiting, so starting now does not jump its queue
+        if self._queued_by_guild.get(key, 0) == 0 and self._can_start(key):
+            self._start(key)
+            return key
+
+        if priority is Priority.LOW and self.saturated:
+            self._shed(priority, "saturated")
+        if self._queued_by_guild.get(key, 0) >= self.max_guild_queue:
+            self._shed(priority, "guild_queue_full")
+
+        future = asyncio.get_running_loop().create_future()
+        self._queues[priority].setdefault(key, deque()).append(future)
+        self._queued[priority] += 1
+        self._queued_by_guild[key] = self._queued_by_guild.get(key, 0) + 1
+        start = time.perf_counter()
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # Granted right before the cancellation landed
+                self.release(key)
+            else:
+                self._discard(priority, key, future)
+            raise
+        WAIT_TIME.labels(self.name, priority.name.lower()).observe(time.perf_counter() - start)
+        return key
+
+    def release(self, key: Hashable):
+        """
+        Frees a slot and hands free slots to the next waiting guilds.
+        """
+        self._active -= 1
+        remaining = self._active_by_guild.get(key, 1) - 1
+        if remaining:
+            self._active_by_guild[key] = remaining
+        else:
+            self._active_by_guild.pop(key, None)
+        self._wake()
+
+    def _wake(self):
+        while not self.saturated:
+            granted = self._grant_next()
+            if not granted:
+                return
+
+    def _grant_next(self) -> bool:
+        for priority in Priority:
+            ring = self._queues[priority]
+            for key in list(ring):
+                if self._active_by_guild.get(key, 0) >= self.per_guild_concurrency:
+                    continue
+                waiters = ring[key]
+                future = waiters.popleft()
+                self._dequeued(priority, key)
+                if future.done():
+                    # Cancelled while waiting: dropped here, so `_discard` has nothing left to remove
+                    if not waiters:
+                        del ring[key]
+                    return True
+                if waiters:
+                    ring.move_to_end(key)  # Round-robin: the guild goes to the back of the line
+                else:
+                    del ring[key]
+                self._start(key)
+                future.set_result(None)
+                return True
+        return False
+
+    def _dequeued(self, priority: Priority, key: Hashable):
+        self._queued[priority] -= 1
+        remaining = self._queued_by_guild[key] - 1
+        if remaining:
+            self._queued_by_guild[key] = remaining
+        else:
+            del self._queued_by_guild[key]
+
+    def _discard(self, priority: Priority, key: Hashable, future: asyncio.Future):
+        waiters = self._queues[priority].get(key)
+        if waiters is None or future not in waiters:
+            return
+        waiters.remove(future)
+        if not waiters:
+            del self._queues[priority][key]
+        self._dequeued(priority, key)
+
+    def _limiter(self, limit_key: str, limit: int) -> asyncio.Semaphore:
+        limiter = self._limiters.get(limit_key)
+        if limiter is None:
+            limiter = self._limiters[limit_key] = asyncio.Semaphore(limit)
+        return limiter
+
+    @asynccontextmanager
+    async def slot(
+        self,
+        guild_id: Optional[int],
+        priority: Priority = Priority.NORMAL,
+        limit_key: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> AsyncIterator[None]:
+        """
+        Runs the enclosed block in a scheduler slot.
+
+        Args:
+            guild_id (Optional[int]): Guild the work belongs to.
+            priority (Priority): Priority of the work.
+            limit_key (Optional[str]): Name of a per-listener or per-command limit, e.g. "command:ping".
+            limit (Optional[int]): Maximum concurrent runs for `limit_key`. Waiting on it does not hold a slot.
+
+        Raises:
+            SchedulerOverloaded: If the work was shed.
+        """
+        limiter = self._limiter(limit_key, limit) if limit_key and limit else None
+        if limiter is not None:
+            if priority is Priority.LOW and limiter.locked():
+                self._shed(priority, "limit_reached")
+            await limiter.acquire()
+        try:
+            key = await self.acquire(guild_id, priority)
+            try:
+                yield
+            finally:
+                self.release(key)
+        finally:
+            if limiter is not None:
+                limiter.release()
@@ -0,0 +1,84 @@
+import asyncio
+import hashlib
+from logging import Logger
+from pathlib import Path
+from types import ModuleType
+from typing import Any, Iterable, List, NamedTuple, Optional, Tuple
+
+Fingerprint = Tuple[int, int, str]  # (mtime_ns, size, sha256 of the content)
+
+
+class ImportedFile(NamedTuple):
+    """
+    The exports of one imported source file, with the fingerprint of the content that was executed.
+    """
+
+    exports: List[Any]
+    fingerprint: Fingerprint
+
+
+def fingerprint(path: Path, previous: Optional[Fingerprint] = None) -> Fingerprint:
+    """
+    Returns a file's fingerprint. The file is only read and hashed when its mtime or size
+    differ from `previous`, so checking an unchanged file costs a single stat.
+    """
+    stat = path.stat()
+    if previous is not None and (stat.st_mtime_ns, stat.st_size) == previous[:2]:
+        return previous
+    with open(path, "rb") as f:
+        digest = hashlib.sha256(f.read()).hexdigest()
+    return stat.st_mtime_ns, stat.st_size, digest
+
+
+def carry_state(previous: Optional[ModuleType], current: ModuleType):
+    """
+    Copies the globals a source file lists in `__persist__` (e.g. `__persist__ = ["cache"]`) from
+    its previous import into the new one, so caches and accumulators survive a hot reload.
+    """
+    if previous is None:
+        return
+    for name in getattr(current, "__persist__", ()):
+        if hasattr(previous, name):
+            setattr(current, name, getattr(previous, name))
+
+
+class ModuleWatcher:
+    """
+    Polls loaded modules for changed source files and hot-reloads them.
+    """
+
+    def __init__(self, module_handler: Any, logger: Logger, interval: float = 2.0, sync_scopes: Iterable = ()):
+        """
+        Args:
+            module_handler (ModuleHandler): Handler whose modules are watched.
+            logger (Logger): Logger for watcher failures.
+            interval (float): Seconds between two scans.
+            sync_scopes (Iterable): Slash command scopes to re-sync after a reload.
+        """
+        self.module_handler = module_handler
+        self.logger = logger
+        self.interval = interval
+        self.sync_scopes = list(sync_scopes)
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+            self.logger.info(f"Watching module files for changes every {self.interval:g}s.")
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.module_handler.reload_changed(sync_scopes=self.sync_scopes)
+            except Exception as e:
+                self.logger.error(f"Hot reload scan failed: {e}")
@@ -4,7 +4,8 @@ from discord.ui import View, Button, Select
 from discord.ext.commands import Bot
 from shared.types import ExtendedClient
 from pyee.asyncio import AsyncIOEventEmitter
-import asyncio
+from utils.AutoDefer import observe_first_response, response_lock
+from utils.TimerWheel import TimerHandle, sanitize_timeout
 import uuid
 
 
@@ -30,8 +31,8 @@ class InteractionView(View, AsyncIOEventEmitter):
         :param timeout: Tempo limite para a view expirar.
         :param parent: Referência para a view pai, se for um clone.
         """
-        # Inicializa as classes pai
-        View.__init__(self, timeout=timeout)
+        # Inicializa as classes pai; o timeout roda na roda de timers do bot, não numa task do discord.py por view
+        View.__init__(self, timeout=None)
         AsyncIOEventEmitter.__init__(self)
 
         self.interaction = interaction
@@ -44,14 +45,15 @@ class InteractionView(View, AsyncIOEventEmitter):
         self.msg_id: Optional[str] = interaction.message.id if interaction.message else None
         self.view_id: str = self._generate_random_id()
 
-        # Inicializa o atributo _timeout_task
-        self._timeout_task: Optional[asyncio.Task] = None
+        # Timeout em segundos (valores em milissegundos são convertidos com um aviso)
+        self.view_timeout: Optional[float] = sanitize_timeout(timeout, client.logger, "InteractionView")
+        self._timeout_handle: Optional[TimerHandle] = None
 
-        # Registra o listener para exclusão de mensagens
-        self.client.add_listener(self._handle_message_delete, "on_message_delete")
+        # Exclusões de mensagem chegam pelo roteador central, indexadas pelo ID da mensagem
+        self.client.component_router.register(self)
 
         # Inicia o timeout da view
-        if self.timeout is not None and self.timeout > 0:
+        if self.view_timeout:
             self.start_timeout()
 
         # Debugging logs
@@ -75,33 +77,25 @@ class InteractionView(View, AsyncIOEventEmitter):
         self.emit("end", "timeout")
         self.destroy("timeout")
 
-    async def _handle_message_delete(self, message: Message):
-        """
-        Método chamado quando uma mensagem é deletada.
-        Emite o evento 'end' com a razão 'deleted' se a mensagem for a da view.
-
-        :param message: Mensagem que foi deletada.
-        """
-        if message.id == self.msg_id:
-            self.client.logger.debug(f"Message with ID {self.msg_id} was deleted, triggering view destruction.")
-            self.emit("end", "deleted")
-            self.destroy("deleted")
-
     def start_timeout(self):
         """
         Inicia ou reinicia o timeout da view.
         """
-        if self._timeout_task:
-            self._timeout_task.cancel()
+        if not self.view_timeout:
+            return
         self.client.logger.debug(f"Starting timeout for view with view_id: {self.view_id}")
-        self._timeout_task = asyncio.create_task(self._timeout_handler())
+        if self._timeout_handle is not None and not self._timeout_handle.cancelled:
+            self._timeout_handle.reschedule(self.view_timeout)
+        else:
+            self._timeout_handle = self.client.timer_wheel.schedule(self.view_timeout, self.on_timeout)
 
-    async def _timeout_handler(self):
+    async def interaction_check(self, interaction: Interaction) -> bool:
         """
-        Handler para gerenciar o timeout da view.
+        Como no timeout do discord.py, cada interação com a view reinicia a contagem.
         """
-        await asyncio.sleep(self.timeout)
-        await self.on_timeout()
+        if self._timeout_handle is not None and not self._timeout_handle.cancelled:
+            self._timeout_handle.reschedule(self.view_timeout)
+        return True
 
     async def update(self, **kwargs) -> bool:
         """
@@ -119,11 +113,19 @@ class InteractionView(View, AsyncIOEventEmitter):
                 component = self._add_custom_id(component)
                 self.add_item(component)
 
-            # Atualiza ou envia uma mensagem dependendo do estado da interação
-            if self.interaction.response.is_done():
-                await self.interaction.edit_original_response(view=self, **kwargs)
-            else:
-                await self.interaction.response.send_message(view=self, **kwargs, ephemeral=self.ephemeral)
+            # Atualiza ou envia uma mensagem dependendo do estado da interação; se ela já foi
+            # respondida ou adiada (ex.: pelo auto-defer), edita a resposta original
+            async with response_lock(self.interaction):
+                if self.interaction.response.is_done():
+                    message = await self.interaction.edit_original_response(view=self, **kwargs)
+                    if self.msg_id is None and message is not None:
+                        self.set_msg_id(message.id)
+                else:
+                    response = await self.interaction.response.send_message(view=self, **kwargs, ephemeral=self.ephemeral)
+                    if self.msg_id is None and getattr(response, "message_id", None):
+                        self.set_msg_id(response.message_id)
+                    if self.interaction.command is not None:
+                        observe_first_response(self.interaction, self.interaction.command.qualified_name, False)
             self.client.logger.debug("View updated successfully.")
             return True
         except Exception as e:
@@ -163,7 +165,7 @@ class InteractionView(View, AsyncIOEventEmitter):
             client=self.client,
             ephemeral=self.ephemeral,
             filter_func=self.filter_func,
-            timeout=self.timeout,
+            timeout=self.view_timeout,
             parent=self
         )
         cloned_view.set_msg_id(self.msg_id)
@@ -175,7 +177,7 @@ class InteractionView(View, AsyncIOEventEmitter):
 
         :param msg_id: ID da mensagem.
         """
-        self.msg_id = msg_id
+        self.client.component_router.bind_message(self, msg_id)
         self.client.logger.debug(f"Message ID set for view: {msg_id}")
 
     def destroy(self, reason: Optional[str] = None):
@@ -184,9 +186,9 @@ class InteractionView(View, AsyncIOEventEmitter):
 
         :param reason: Razão para destruir a view.
         """
-        if self._timeout_task:
-            self._timeout_task.cancel()
-            self._timeout_task = None
+        if self._timeout_handle:
+            self._timeout_handle.cancel()
+            self._timeout_handle = None
 
         # Remove a view do registro, se existir
         if self.client.view_registry and self.msg_id in self.client.view_registry:
@@ -195,9 +197,7 @@ class InteractionView(View, AsyncIOEventEmitter):
         self.emit("end", reason or "destroy")
         self.clear_items()  # Remove todos os componentes
 
-        # Verifica se o evento foi registrado antes de tentar removê-lo
-        if "on_message_delete" in self._events:
-            self.client.remove_listener("on_message_delete", self._handle_message_delete)
+        self.client.component_router.unregister(self)
 
         self.stop()  # Para o timeout da view
         self.client.logger.debug(f"InteractionView with view_id {self.view_id}, {reason}.")
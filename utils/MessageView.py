@@ -1,9 +1,9 @@
-import asyncio
 import uuid
 from typing import Optional, Callable, Any, Dict, List, Union
 from discord import Message, Interaction, TextChannel
 from pyee.asyncio import AsyncIOEventEmitter
 from shared.types import ExtendedClient, MessageViewUpdate
+from utils.TimerWheel import TimerHandle, sanitize_timeout
 
 
 class MessageView(AsyncIOEventEmitter):
@@ -17,6 +17,7 @@ class MessageView(AsyncIOEventEmitter):
     ):
         """
         MessageView is a utility for managing interactive views tied to messages in a Discord bot.
+        `timeout` is in milliseconds.
         """
         super().__init__()
         self.message = message
@@ -26,38 +27,30 @@ class MessageView(AsyncIOEventEmitter):
         self.filter_func = filter_func or (lambda _: True)
         self.timeout = timeout
         self.view_id = str(uuid.uuid4())
-        self._timeout_task: Optional[asyncio.Task] = None
+        self._timeout_handle: Optional[TimerHandle] = None
 
-        # Register event listeners
-        self.client.on("interaction_create", self._handle_interaction)
-        self.client.on("message_delete", self._handle_message_delete)
+        # Component interactions and message deletes are routed here by the central router
+        self.client.component_router.register(self)
 
-        # Start timeout task if needed
-        if self.timeout > 0:
-            self._start_timeout()
+        # Start the timeout on the bot's shared timer wheel if needed
+        self._start_timeout()
 
     def _start_timeout(self):
-        if self._timeout_task:
-            self._timeout_task.cancel()
-        self._timeout_task = asyncio.create_task(self._timeout_handler())
-
-    async def _timeout_handler(self):
-        await asyncio.sleep(self.timeout / 1000)
-        self.destroy("timeout")
-
-    async def _handle_interaction(self, interaction: Interaction):
-        if interaction.message and interaction.message.id == self.msg_id:
-            split_id = interaction.custom_id.split("-")
-            event_id = split_id.pop(0)
-            view_id = split_id.pop(-1)
-
-            if view_id == self.view_id and self.filter_func(interaction):
-                self.emit(event_id, interaction)
-                self.emit("any", interaction)
-
-    async def _handle_message_delete(self, message: Message):
-        if message.id == self.msg_id:
-            self.destroy("deleted")
+        seconds = sanitize_timeout(self.timeout, self.client.logger, "MessageView", unit="ms")
+        if seconds is None:
+            return
+        if self._timeout_handle is not None and not self._timeout_handle.cancelled:
+            self._timeout_handle.reschedule(seconds)
+        else:
+            self._timeout_handle = self.client.timer_wheel.schedule(seconds, self.destroy, "timeout")
+
+    async def handle_component(self, event_id: str, interaction: Interaction):
+        """
+        Called by the component router for interactions on components carrying this view's ID.
+        """
+        if self.filter_func(interaction):
+            self.emit(event_id, interaction)
+            self.emit("any", interaction)
 
     async def update(self, view: MessageViewUpdate) -> bool:
         """
@@ -88,16 +81,14 @@ class MessageView(AsyncIOEventEmitter):
         """
         Destroy this view and clean up listeners.
         """
-        if self._timeout_task:
-            self._timeout_task.cancel()
-            self._timeout_task = None
+        if self._timeout_handle:
+            self._timeout_handle.cancel()
+            self._timeout_handle = None
 
+        self.client.component_router.unregister(self)
         self.emit("end", reason or "destroy")
         self.remove_all_listeners()
 
-        self.client.off("interaction_create", self._handle_interaction)
-        self.client.off("message_delete", self._handle_message_delete)
-
     def _add_random_id_to_buttons(self, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """
         Adds a random ID to buttons for unique identification.
@@ -105,8 +96,7 @@ class MessageView(AsyncIOEventEmitter):
         for row in rows:
             for component in row.get("components", []):
                 custom_id = component.get("custom_id", "")
-                split_id = custom_id.split("-")
-                if split_id[-1] != self.view_id:
+                if custom_id and not custom_id.endswith(f"-{self.view_id}"):
                     component["custom_id"] = f"{custom_id}-{self.view_id}"
         return rows
 
@@ -0,0 +1,129 @@
+import asyncio
+import time
+from logging import Logger
+from typing import Awaitable, Callable, Dict, Iterable, Tuple
+
+from utils.Metrics import REGISTRY
+
+STAGE_SECONDS = REGISTRY.gauge("startup_stage_seconds", "Run time of each startup stage.", ["stage"])
+STAGE_START = REGISTRY.gauge("startup_stage_start_seconds", "Offset from the start of setup at which each stage started.", ["stage"])
+
+
+class StageFailed(Exception):
+    """
+    Raised when a startup stage fails; the other stages are cancelled.
+    """
+
+    def __init__(self, stage: str, error: BaseException):
+        super().__init__(f"Startup stage '{stage}' failed: {type(error).__name__}: {error}")
+        self.stage = stage
+        self.error = error
+
+
+class StartupPipeline:
+    """
+    Runs startup as a graph of async stages.
+
+    Every stage starts as soon as the stages it depends on have finished, so independent work
+    (database, HTTP session, files, module imports) overlaps. The first failure cancels every
+    stage still running or waiting and is raised as `StageFailed`.
+    """
+
+    def __init__(self, logger: Logger):
+        self.logger = logger
+        self.stages: Dict[str, Tuple[Callable[[], Awaitable[None]], Tuple[str, ...]]] = {}
+        self.timings: Dict[str, Dict[str, float]] = {}  # Stage -> start offset, run time and end offset (ms)
+
+    def stage(self, name: str, func: Callable[[], Awaitable[None]], after: Iterable[str] = ()):
+        """
+        Adds a stage.
+
+        Args:
+            name (str): Name of the stage, used in timings and errors.
+            func (Callable[[], Awaitable[None]]): Coroutine function running the stage.
+            after (Iterable[str]): Stages that must finish before this one starts.
+        """
+        self.stages[name] = (func, tuple(after))
+
+    def _validate(self):
+        for name, (_, after) in self.stages.items():
+            unknown = [dependency for dependency in after if dependency not in self.stages]
+            if unknown:
+                raise ValueError(f"Startup stage '{name}' depends on unknown stage(s) {unknown}.")
+
+        state: Dict[str, str] = {}
+
+        def visit(name: str, path: Tuple[str, ...]):
+            state[name] = "visiting"
+            for dependency in self.stages[name][1]:
+                if state.get(dependency) == "visiting":
+                    cycle = path[path.index(dependency):] + (dependency,)
+                    raise ValueError(f"Startup stages form a cycle: {' -> '.join(cycle)}")
+                if dependency not in state:
+                    visit(dependency, path + (dependency,))
+            state[name] = "done"
+
+        for name in self.stages:
+            if name not in state:
+                visit(name, (name,))
+
+    async def run(self) -> Dict[str, Dict[str, float]]:
+        """
+        Runs every stage.
+
+        Returns:
+            Dict[str, Dict[str, float]]: Per stage, 'start_ms' and 'end_ms' (offsets from the
+            start of the pipeline) and 'run_ms'.
+
+        Raises:
+            StageFailed: If a stage raised. The error names the stage that failed first.
+        """
+        self._validate()
+        start = time.perf_counter()
+        tasks: Dict[str, asyncio.Task] = {}
+
+        async def run_stage(name: str):
+            func, after = self.stages[name]
+            if after:
+                # A failed dependency re-raises its own StageFailed here, so the root cause is kept
+                await asyncio.gather(*(tasks[dependency] for dependency in after))
+            began = time.perf_counter()
+            try:
+                await func()
+            except Exception as e:
+                raise StageFailed(name, e) from e
+            ended = time.perf_counter()
+            self.timings[name] = {
+                "start_ms": (began - start) * 1000,
+                "run_ms": (ended - began) * 1000,
+                "end_ms": (ended - start) * 1000,
+            }
+            STAGE_START.labels(name).set(began - start)
+            STAGE_SECONDS.labels(name).set(ended - began)
+
+        tasks.update({name: asyncio.create_task(run_stage(name), name=f"startup:{name}") for name in self.stages})
+        try:
+            done, pending = await asyncio.wait(tasks.values(), return_when=asyncio.FIRST_EXCEPTION)
+        except asyncio.CancelledError:
+            for task in tasks.values():
+                task.cancel()
+            raise
+
+        errors = [task.exception() for task in done if not task.cancelled() and task.exception() is not None]
+        if errors:
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+            failure = errors[0]
+            if not isinstance(failure, StageFailed):
+                failure = StageFailed("pipeline", failure)
+            self.logger.error(f"{failure}. Cancelled {len(pending)} pending stage(s).")
+            raise failure
+
+        wall = (time.perf_counter() - start) * 1000
+        total = sum(timing["run_ms"] for timing in self.timings.values())
+        self.logger.info(
+            f"Setup finished in {wall:.0f}ms (sum of stage run times: {total:.0f}ms): "
+            + ", ".join(f"{name} {timing['run_ms']:.0f}ms" for name, timing in self.timings.items())
+        )
+        return self.timings
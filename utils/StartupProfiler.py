@@ -0,0 +1,226 @@
+import importlib.abc
+import importlib.machinery
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from logging import Logger
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+# Loaders created per module, whose exec_module can be timed on the instance without affecting other modules
+_TIMED_LOADERS = (
+    importlib.machinery.SourceFileLoader,
+    importlib.machinery.SourcelessFileLoader,
+    importlib.machinery.ExtensionFileLoader,
+)
+
+
+class ImportNode:
+    """
+    One timed import, with the imports it triggered while executing.
+    """
+
+    __slots__ = ("name", "thread", "cumulative", "children")
+
+    def __init__(self, name: str, thread: str):
+        self.name = name
+        self.thread = thread
+        self.cumulative = 0.0
+        self.children: List["ImportNode"] = []
+
+    @property
+    def self_time(self) -> float:
+        return max(0.0, self.cumulative - sum(child.cumulative for child in self.children))
+
+
+class _ImportTimer(importlib.abc.MetaPathFinder):
+    """
+    Meta path finder that lets the regular finders resolve every import, then times the
+    execution of the module it found, like `python -X importtime`.
+    """
+
+    def __init__(self, profiler: "StartupProfiler"):
+        self.profiler = profiler
+
+    def find_spec(self, fullname: str, path=None, target=None):
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, "find_spec"):
+                continue
+            spec = finder.find_spec(fullname, path, target)
+            if spec is not None:
+                if isinstance(spec.loader, _TIMED_LOADERS):
+                    self._wrap(spec.loader, fullname)
+                return spec
+        return None
+
+    def _wrap(self, loader, fullname: str):
+        exec_module = loader.exec_module
+        profiler = self.profiler
+
+        def timed_exec_module(module):
+            del loader.exec_module  # Later reloads use the loader's own method again
+            node = profiler._enter(fullname)
+            start = time.perf_counter()
+            try:
+                exec_module(module)
+            finally:
+                profiler._exit(node, time.perf_counter() - start)
+
+        loader.exec_module = timed_exec_module
+
+
+class StartupProfiler:
+    """
+    Records where startup time goes: wall time per named phase, and an import-time tree of
+    every module imported while installed. `finish` writes a report and flags imports over budget.
+
+    Install it before the imports to measure, e.g. at the top of main.py.
+    """
+
+    def __init__(self, report_path: str = "logs/startup_report.txt", import_budget_ms: float = 500.0):
+        """
+        Args:
+            report_path (str): File the report is written to on every boot.
+            import_budget_ms (float): Imports whose cumulative time exceeds this are flagged.
+        """
+        self.report_path = Path(report_path)
+        self.import_budget_ms = import_budget_ms
+        self.started = time.perf_counter()
+        self.phases: Dict[str, float] = {}  # Phase -> seconds, in the order they finished
+        self.roots: List[ImportNode] = []
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._timer: Optional[_ImportTimer] = None
+
+    def install(self):
+        if self._timer is None:
+            self._timer = _ImportTimer(self)
+            sys.meta_path.insert(0, self._timer)
+
+    def uninstall(self):
+        if self._timer is not None:
+            if self._timer in sys.meta_path:
+                sys.meta_path.remove(self._timer)
+            self._timer = None
+
+    def _enter(self, name: str) -> ImportNode:
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        node = ImportNode(name, threading.current_thread().name)
+        if stack:
+            stack[-1].children.append(node)
+        else:
+            with self._lock:
+                self.roots.append(node)
+        stack.append(node)
+        return node
+
+    def _exit(self, node: ImportNode, elapsed: float):
+        node.cumulative = elapsed
+        self._local.stack.pop()
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """
+        Times the enclosed block as a startup phase. Works around awaits as well.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record_phase(name, time.perf_counter() - start)
+
+    def record_phase(self, name: str, seconds: float):
+        self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+    def over_budget(self) -> List[ImportNode]:
+        """
+        Returns the smallest import subtrees over budget: an import is flagged when its cumulative
+        time exceeds the budget but none of its own imports does, so `torch` is reported rather
+        than every module that happens to import it.
+        """
+        budget = self.import_budget_ms / 1000
+        flagged: List[ImportNode] = []
+
+        def visit(node: ImportNode) -> bool:
+            if node.cumulative <= budget:
+                return False
+            heavy_child = False
+            for child in node.children:
+                heavy_child = visit(child) or heavy_child
+            if not heavy_child:
+                flagged.append(node)
+            return True
+
+        for root in list(self.roots):
+            visit(root)
+        return sorted(flagged, key=lambda node: node.cumulative, reverse=True)
+
+    def render(self, module_timings: Optional[Dict[str, Dict[str, float]]] = None, top: int = 25, min_ms: float = 5.0) -> str:
+        """
+        Renders the report: phases, per-module load times, flagged imports and the import tree
+        of the heaviest top-level imports (children under `min_ms` are folded).
+        """
+        total = time.perf_counter() - self.started
+        lines = [f"Startup report ({time.strftime('%Y-%m-%d %H:%M:%S')}, pid {os.getpid()})", ""]
+        lines.append(f"Total: {total * 1000:.0f}ms")
+        lines.append("")
+        lines.append("Phases:")
+        for name, seconds in self.phases.items():
+            lines.append(f"  {seconds * 1000:>9.1f}ms  {name}")
+
+        if module_timings:
+            lines.append("")
+            lines.append("Modules (total / wait / setup / import / register, ms):")
+            for name, timing in sorted(module_timings.items(), key=lambda item: item[1].get("total_ms", 0), reverse=True):
+                lines.append(
+                    f"  {timing.get('total_ms', 0):>9.1f}  {timing.get('wait_ms', 0):>7.1f}  {timing.get('setup_ms', 0):>7.1f}"
+                    f"  {timing.get('import_ms', 0):>7.1f}  {timing.get('register_ms', 0):>7.1f}  {name}"
+                )
+
+        flagged = self.over_budget()
+        lines.append("")
+        lines.append(f"Imports over budget ({self.import_budget_ms:.0f}ms): {len(flagged) or 'none'}")
+        for node in flagged:
+            lines.append(f"  {node.cumulative * 1000:>9.1f}ms  {node.name}")
+
+        roots = sorted(self.roots, key=lambda node: node.cumulative, reverse=True)[:top]
+        lines.append("")
+        lines.append(f"Heaviest imports (cumulative | self | name), {len(self.roots)} top-level import(s):")
+
+        def render_node(node: ImportNode, depth: int):
+            lines.append(f"  {node.cumulative * 1000:>9.1f} | {node.self_time * 1000:>8.1f} | {'  ' * depth}{node.name}")
+            for child in sorted(node.children, key=lambda child: child.cumulative, reverse=True):
+                if child.cumulative * 1000 >= min_ms:
+                    render_node(child, depth + 1)
+
+        for root in roots:
+            render_node(root, 0)
+        return "\n".join(lines) + "\n"
+
+    def finish(self, logger: Logger, module_timings: Optional[Dict[str, Dict[str, float]]] = None) -> str:
+        """
+        Stops timing imports, writes the report and logs imports over budget.
+
+        Returns:
+            str: The rendered report.
+        """
+        self.uninstall()
+        report = self.render(module_timings)
+        try:
+            self.report_path.parent.mkdir(parents=True, exist_ok=True)
+            self.report_path.write_text(report, encoding="utf-8")
+        except OSError as e:
+            logger.error(f"Failed to write startup report '{self.report_path}': {e}")
+
+        for node in self.over_budget():
+            logger.warning(
+                f"Import '{node.name}' took {node.cumulative * 1000:.0f}ms, over the {self.import_budget_ms:.0f}ms budget."
+            )
+        logger.info(
+            f"Startup took {(time.perf_counter() - self.started) * 1000:.0f}ms; report written to '{self.report_path}'."
+        )
+        return report
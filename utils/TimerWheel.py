@@ -0,0 +1,169 @@
+import asyncio
+import heapq
+import inspect
+import itertools
+import time
+from logging import Logger
+from typing import Any, Callable, List, Optional, Tuple
+
+# Interaction tokens expire after 15 minutes, so no interaction-bound timeout can be longer
+MAX_TIMEOUT_SECONDS = 15 * 60
+
+
+def sanitize_timeout(value: Optional[float], logger: Logger, owner: str, unit: str = "s") -> Optional[float]:
+    """
+    Converts a timeout to seconds, catching values given in the wrong unit.
+
+    Args:
+        value (Optional[float]): The timeout as given; None or <= 0 means no timeout.
+        logger (Logger): Logger for the unit warning.
+        owner (str): What the timeout belongs to, for the warning.
+        unit (str): "s" for APIs taking seconds (values above 15 minutes are taken as
+            milliseconds), "ms" for APIs taking milliseconds (values under a second are
+            taken as seconds).
+
+    Returns:
+        Optional[float]: The timeout in seconds, or None.
+    """
+    if value is None or value <= 0:
+        return None
+    if unit == "ms":
+        if value < 1000:
+            logger.warning(f"{owner} timeout of {value}ms looks like seconds; using {value}s.")
+            return float(value)
+        return value / 1000
+    if value > MAX_TIMEOUT_SECONDS:
+        logger.warning(f"{owner} timeout of {value}s is over {MAX_TIMEOUT_SECONDS}s; treating it as {value / 1000:g}s (milliseconds).")
+        return value / 1000
+    return float(value)
+
+
+class TimerHandle:
+    """
+    A scheduled callback. Extending its deadline is O(1); only moving it earlier touches the heap.
+    """
+
+    __slots__ = ("deadline", "callback", "args", "cancelled", "_wheel", "_queued")
+
+    def __init__(self, wheel: "TimerWheel", deadline: float, callback: Callable[..., Any], args: Tuple[Any, ...]):
+        self._wheel = wheel
+        self.deadline = deadline
+        self.callback = callback
+        self.args = args
+        self.cancelled = False
+        self._queued = deadline  # Deadline of this handle's live heap entry
+
+    def reschedule(self, delay: float):
+        """
+        Moves the deadline to `delay` seconds from now.
+        """
+        if self.cancelled:
+            return
+        self.deadline = time.monotonic() + delay
+        if self.deadline < self._queued:
+            self._wheel._push(self)
+
+    def cancel(self):
+        if not self.cancelled:
+            self.cancelled = True
+            self._wheel._stale += 1
+
+    def remaining(self) -> float:
+        return max(0.0, self.deadline - time.monotonic())
+
+
+class TimerWheel:
+    """
+    Runs every view and collector timeout from one heap and one task.
+
+    Entries are removed lazily: cancelling only flags the handle, and a handle whose deadline was
+    pushed back is re-queued when its old entry comes up, so refreshing a timeout on every
+    interaction does not grow the heap. Callbacks may be sync or async; async ones run as tasks.
+    """
+
+    def __init__(self, logger: Logger):
+        self.logger = logger
+        self._heap: List[Tuple[float, int, TimerHandle]] = []
+        self._counter = itertools.count()
+        self._stale = 0
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def __len__(self) -> int:
+        return len(self._heap) - self._stale
+
+    def schedule(self, delay: float, callback: Callable[..., Any], *args: Any) -> TimerHandle:
+        """
+        Calls `callback(*args)` after `delay` seconds. Must be called from the event loop.
+
+        Returns:
+            TimerHandle: Handle to cancel or reschedule the timer.
+        """
+        handle = TimerHandle(self, time.monotonic() + delay, callback, args)
+        self._push(handle)
+        if self._task is None or self._task.done():
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self._run(), name="timer-wheel")
+        return handle
+
+    def _push(self, handle: TimerHandle):
+        if self._heap and handle._queued != handle.deadline:
+            self._stale += 1  # The previous entry of a handle moved earlier is now dead
+        handle._queued = handle.deadline
+        wake = not self._heap or handle.deadline < self._heap[0][0]
+        heapq.heappush(self._heap, (handle.deadline, next(self._counter), handle))
+        if wake and self._wakeup is not None:
+            self._wakeup.set()
+        if self._stale > 64 and self._stale > len(self._heap) // 2:
+            self._compact()
+
+    def _compact(self):
+        self._heap = [entry for entry in self._heap if not entry[2].cancelled and entry[2]._queued == entry[0]]
+        heapq.heapify(self._heap)
+        self._stale = 0
+
+    async def _run(self):
+        while True:
+            now = time.monotonic()
+            while self._heap and self._heap[0][0] <= now:
+                deadline, _, handle = heapq.heappop(self._heap)
+                if handle.cancelled or handle._queued != deadline:
+                    self._stale = max(0, self._stale - 1)
+                    continue
+                if handle.deadline > now:
+                    # Pushed back since it was queued: re-queue at the new deadline
+                    handle._queued = handle.deadline
+                    heapq.heappush(self._heap, (handle.deadline, next(self._counter), handle))
+                    continue
+                handle.cancelled = True
+                self._fire(handle)
+
+            self._wakeup.clear()
+            timeout = self._heap[0][0] - time.monotonic() if self._heap else None
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    def _fire(self, handle: TimerHandle):
+        try:
+            result = handle.callback(*handle.args)
+            if inspect.isawaitable(result):
+                asyncio.ensure_future(result).add_done_callback(self._report)
+        except Exception as e:
+            self.logger.error(f"Timer callback {getattr(handle.callback, '__qualname__', handle.callback)} failed: {e}")
+
+    def _report(self, task: asyncio.Future):
+        if not task.cancelled() and task.exception() is not None:
+            self.logger.error(f"Timer callback failed: {task.exception()}")
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self._heap.clear()
+        self._stale = 0
@@ -4,6 +4,7 @@ from typing import Dict, Any, Callable, Optional
 
 import aiofiles
 from shared.types import ExtendedClient
+from utils.Metrics import record_cache_access
 from collections import defaultdict
 import logging
 from pathlib import Path
@@ -196,7 +197,9 @@ class Translator:
         """
         guild_id = str(guild_id)
         if guild_id in self.language_cache:
+            record_cache_access("language", True)
             return self.language_cache[guild_id]
+        record_cache_access("language", False)
 
         guild = await self.bot.guild_manager.fetch_or_create(guild_id)
         language = guild.data.get("language", "en")
@@ -319,10 +322,13 @@ class Translator:
             str: Tradução processada.
         """
         translations = (
-            self.module_translation_cache.get(f"{module_name}:{language}", {})
+            self.module_translation_cache.get(f"{module_name}:{language}")
             if module_name
-            else self.global_translations_cache.get(language, {})
+            else self.global_translations_cache.get(language)
         )
+        record_cache_access("translator", translations is not None)
+        if translations is None:
+            translations = {}
 
         keys = key.split(".")
         for k in keys:
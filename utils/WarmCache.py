@@ -0,0 +1,214 @@
+import asyncio
+import json
+import os
+import time
+from logging import Logger
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from shared.types import ExtendedClient
+
+# Bump when the layout of the snapshot changes; snapshots of another schema are ignored
+SNAPSHOT_SCHEMA = 1
+
+
+class WarmCache:
+    """
+    Persists the bot's warm caches across restarts.
+
+    On a graceful shutdown the language cache, the raw settings of every cached guild and the
+    translation bundles are written to a local snapshot. Guild entries are stamped with the
+    guild document's `version` (incremented on every guild write) and translation bundles with
+    the mtime and size of their source files. On boot the snapshot is served at once; guild
+    stamps are then checked against the database in the background and stale entries dropped,
+    so they are reloaded the usual way on next use.
+    """
+
+    def __init__(self, bot: ExtendedClient, logger: Logger, path: str = "data/warm_cache.json"):
+        """
+        Args:
+            bot (ExtendedClient): The bot whose caches are persisted.
+            logger (Logger): Logger for snapshot reports.
+            path (str): Snapshot file.
+        """
+        self.bot = bot
+        self.logger = logger
+        self.path = Path(path)
+        self.translations_loaded = False
+        # Guild ID -> (document version, raw settings) waiting for the guild to be available
+        self.pending_settings: Dict[str, Tuple[int, Dict[str, Any]]] = {}
+        self._revalidation: Optional[asyncio.Task] = None
+
+    def _translation_sources(self) -> List[Path]:
+        """
+        Files the translation bundles are built from, emoji files included since their
+        placeholders are resolved into the bundles.
+        """
+        sources = list(Path(self.bot.translator.global_path).glob("*.json"))
+        sources.append(Path(self.bot.emoji_manager.global_path) / "emojis.json")
+        for module in self.bot.modules.values():
+            sources.extend((Path(module.path) / module.data.get("translationsFolder", "translations")).glob("*.json"))
+            sources.append(Path(module.path) / "emojis.json")
+        return sorted(sources)
+
+    @staticmethod
+    def _stamp_files(paths: List[Path]) -> Dict[str, List[int]]:
+        stamps = {}
+        for path in paths:
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            stamps[path.as_posix()] = [stat.st_mtime_ns, stat.st_size]
+        return stamps
+
+    def collect(self) -> Dict[str, Any]:
+        """
+        Builds the snapshot from the current caches. Must run on the event loop.
+        """
+        guild_manager = self.bot.guild_manager
+        language_cache = self.bot.translator.language_cache
+        guilds: Dict[str, Dict[str, Any]] = {}
+        for guild_id, version in guild_manager.versions.items():
+            entry: Dict[str, Any] = {"version": version}
+            if guild_id in language_cache:
+                entry["language"] = language_cache[guild_id]
+            if guild_id in self.bot.setting_cache and guild_id in guild_manager.raw_settings:
+                entry["settings"] = guild_manager.raw_settings[guild_id]
+            if len(entry) > 1:
+                guilds[guild_id] = entry
+
+        return {
+            "schema": SNAPSHOT_SCHEMA,
+            "application_id": self.bot.application_id,
+            "created_at": int(time.time()),
+            "guilds": guilds,
+            "translations": {
+                "global": self.bot.translator.global_translations_cache,
+                "modules": self.bot.translator.module_translation_cache,
+            },
+        }
+
+    async def save(self):
+        """
+        Writes the snapshot atomically. Called on graceful shutdown.
+        """
+        start = time.perf_counter()
+        snapshot = self.collect()
+        try:
+            await asyncio.to_thread(self._write, snapshot, self._translation_sources())
+        except (OSError, TypeError, ValueError) as e:
+            self.logger.error(f"Failed to write warm cache snapshot '{self.path}': {e}")
+            return
+        self.logger.info(
+            f"Saved warm cache snapshot of {len(snapshot['guilds'])} guild(s) in {(time.perf_counter() - start) * 1000:.0f}ms."
+        )
+
+    def _write(self, snapshot: Dict[str, Any], sources: List[Path]):
+        snapshot["translations"]["files"] = self._stamp_files(sources)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = self.path.with_suffix(".tmp")
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(snapshot, f, separators=(",", ":"), default=str)
+        os.replace(temp_path, self.path)
+
+    def _read(self, sources: List[Path]) -> Tuple[Optional[Dict[str, Any]], bool]:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                snapshot = json.load(f)
+        except FileNotFoundError:
+            return None, False
+        except (OSError, json.JSONDecodeError) as e:
+            self.logger.warning(f"Ignoring unreadable warm cache snapshot '{self.path}': {e}")
+            return None, False
+        translations = snapshot.get("translations", {})
+        return snapshot, translations.get("files") == self._stamp_files(sources)
+
+    async def load(self) -> bool:
+        """
+        Loads the snapshot into the caches and starts revalidating it in the background.
+        Translation bundles are only used if none of their source files changed.
+
+        Returns:
+            bool: Whether a snapshot was loaded.
+        """
+        start = time.perf_counter()
+        snapshot, translations_fresh = await asyncio.to_thread(self._read, self._translation_sources())
+        if snapshot is None:
+            return False
+        if snapshot.get("schema") != SNAPSHOT_SCHEMA:
+            self.logger.info(f"Ignoring warm cache snapshot of schema {snapshot.get('schema')} (expected {SNAPSHOT_SCHEMA}).")
+            return False
+        if snapshot.get("application_id") != self.bot.application_id:
+            self.logger.info("Ignoring warm cache snapshot written by another application.")
+            return False
+
+        if translations_fresh:
+            translator = self.bot.translator
+            translator.global_translations_cache = snapshot["translations"].get("global", {})
+            translator.module_translation_cache = snapshot["translations"].get("modules", {})
+            self.translations_loaded = True
+
+        guilds: Dict[str, Dict[str, Any]] = snapshot.get("guilds", {})
+        for guild_id, entry in guilds.items():
+            self.bot.guild_manager.versions[guild_id] = entry["version"]
+            if "language" in entry:
+                self.bot.translator.language_cache.setdefault(guild_id, entry["language"])
+            if "settings" in entry:
+                self.pending_settings[guild_id] = (entry["version"], entry["settings"])
+
+        age = int(time.time()) - snapshot.get("created_at", 0)
+        self.logger.info(
+            f"Loaded warm cache snapshot ({age}s old) of {len(guilds)} guild(s) in "
+            f"{(time.perf_counter() - start) * 1000:.0f}ms; translations {'reused' if translations_fresh else 'stale'}."
+        )
+        if guilds:
+            self._revalidation = asyncio.create_task(self.revalidate(list(guilds)))
+        return True
+
+    async def revalidate(self, guild_ids: List[str]):
+        """
+        Compares the snapshot's guild versions with the database in a single query and drops
+        the cached entries of guilds that changed (or no longer exist) since the snapshot.
+        """
+        try:
+            documents = await self.bot.db.find("guilds", {"_id": {"$in": guild_ids}}, {"version": 1})
+        except Exception as e:
+            self.logger.error(f"Failed to revalidate warm cache snapshot; dropping it: {e}")
+            documents = []
+
+        current = {str(document["_id"]): document.get("version", 0) for document in documents}
+        stale = [guild_id for guild_id in guild_ids if current.get(guild_id) != self.bot.guild_manager.versions.get(guild_id)]
+        for guild_id in stale:
+            self.invalidate(guild_id)
+        self.logger.info(f"Revalidated warm cache: {len(guild_ids) - len(stale)} guild(s) fresh, {len(stale)} stale.")
+
+    def invalidate(self, guild_id: str):
+        self.pending_settings.pop(guild_id, None)
+        self.bot.translator.language_cache.pop(guild_id, None)
+        self.bot.guild_manager.forget(guild_id)
+
+    async def hydrate_settings(self):
+        """
+        Builds the settings cache of snapshotted guilds from their raw settings, without
+        querying the database. Needs the guilds to be available, so it runs once ready.
+        """
+        start = time.perf_counter()
+        hydrated = 0
+        for guild_id, (_, raw_settings) in list(self.pending_settings.items()):
+            guild = self.bot.get_guild(int(guild_id))
+            if guild is None or guild_id in self.bot.setting_cache:
+                continue
+            guild_data = {"_id": guild_id, "settings": dict(raw_settings)}
+            try:
+                settings = await self.bot.guild_manager._get_all_settings(guild_data, guild)
+            except Exception as e:
+                self.logger.error(f"Failed to hydrate settings of guild {guild_id} from the snapshot: {e}")
+                continue
+            # A revalidation may have dropped the guild meanwhile
+            if self.pending_settings.pop(guild_id, None) is not None:
+                self.bot.setting_cache[guild_id] = settings
+                self.bot.guild_manager.raw_settings[guild_id] = guild_data["settings"]
+                hydrated += 1
+        self.pending_settings.clear()
+        self.logger.info(f"Hydrated settings of {hydrated} guild(s) from the snapshot in {(time.perf_counter() - start) * 1000:.0f}ms.")